@@ -21,15 +21,14 @@ class BarChartGenerator:
                 logger.warning(f"Coluna {column} não encontrada no DataFrame")
                 return None
             
-            # Limpar e padronizar dados
-            df_clean = self.df.copy()
-            
             # Garantir que estamos trabalhando com strings limpas
-            if df_clean[column].dtype == 'object':
-                df_clean[column] = df_clean[column].astype(str).str.strip()
+            # (apenas a coluna usada, sem copiar o DataFrame inteiro)
+            values = self.df[column]
+            if values.dtype == 'object':
+                values = values.astype(str).str.strip()
             
             # Contar valores únicos na coluna
-            value_counts = df_clean[column].value_counts().reset_index()
+            value_counts = values.value_counts().reset_index()
             value_counts.columns = [column, 'Contagem']
             
             # Ordenar por contagem (decrescente)
@@ -96,6 +96,21 @@ class DataStandardizer:
         # Verificar no mapeamento
         return self.period_mapping.get(period, period.title())
     
+    def apply_unique(self, series, func):
+        """
+        Aplica func uma única vez por valor distinto da coluna
+
+        A coluna é fatorada (códigos inteiros + valores únicos), func é aplicada
+        apenas aos valores únicos e o resultado é mapeado de volta pelos códigos.
+        O resultado é idêntico a series.apply(func), mas o custo depende do número
+        de valores distintos e não do número de linhas.
+        """
+        codes, uniques = pd.factorize(series, use_na_sentinel=False)
+        mapped = pd.Series(uniques).apply(func).take(codes)
+        mapped.index = series.index
+        mapped.name = series.name
+        return mapped
+
     def standardize_dataframe(self, df):
         """Padroniza todos os dados relevantes no DataFrame"""
         logger.info(f"Iniciando padronização do DataFrame com {len(df)} linhas")
@@ -107,7 +122,7 @@ class DataStandardizer:
         city_columns = ['Em qual cidade você reside?']
         for col in city_columns:
             if col in df_standardized.columns:
-                df_standardized[col] = df_standardized[col].apply(self.standardize_city)
+                df_standardized[col] = self.apply_unique(df_standardized[col], self.standardize_city)
                 unique_vals = df_standardized[col].unique()
                 logger.info(f"Valores únicos para {col} após padronização: {unique_vals}")
         
@@ -115,13 +130,13 @@ class DataStandardizer:
         course_columns = ['Qual o seu curso?']
         for col in course_columns:
             if col in df_standardized.columns:
-                df_standardized[col] = df_standardized[col].apply(self.standardize_course)
+                df_standardized[col] = self.apply_unique(df_standardized[col], self.standardize_course)
         
         # Padronizar períodos
         period_columns = ['Qual o período que cursa?', 'Qual o período que cursa?*']
         for col in period_columns:
             if col in df_standardized.columns:
-                df_standardized[col] = df_standardized[col].apply(self.standardize_period)
+                df_standardized[col] = self.apply_unique(df_standardized[col], self.standardize_period)
         
         return df_standardized
     
\ No newline at end of file
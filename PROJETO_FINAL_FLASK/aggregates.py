@@ -0,0 +1,267 @@
+import os
+import sys
+import json
+import logging
+
+import numpy as np
+import pandas as pd
+
+from bitmap_index import FILTER_COLUMNS
+from fatec_comum.schema import question_column
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Arquivo com o cubo de contagens gravado dentro de cada snapshot da base
+CUBE_FILE = 'cube.json'
+
+# Dimensões do cubo (nomes dos filtros do dashboard, ver bitmap_index.FILTER_COLUMNS)
+CUBE_DIMENSIONS = ('curso', 'periodo', 'genero')
+
+
+def cube_dimensions(columns, names=CUBE_DIMENSIONS):
+    """
+    Resolve the cube dimensions against a header
+
+    Returns:
+        dict: Dimension name -> column name, for the dimensions found
+    """
+    columns = list(columns)
+    dimensions = {}
+    for name in names:
+        column = question_column(columns, FILTER_COLUMNS[name])
+        if column is not None:
+            dimensions[name] = column
+    return dimensions
+
+
+def _labels(series):
+    """Stripped answers of a column, with '' for missing or blank ones"""
+    codes, uniques = pd.factorize(series)
+    stripped = np.array([str(value).strip() for value in uniques] + [''], dtype=object)
+    return stripped[codes]
+
+
+class CountCube:
+    """
+    Mergeable cube of answer counts of the closed-answer questions
+
+    For every question the cube counts the rows of each (answer, course,
+    period, gender) cell. Counts of a question alone, or restricted to some
+    courses, periods or genders, are sums over cells, so charts over the
+    whole dataset or filtered by these dimensions never scan the rows.
+
+    Answers follow the categorical columns built by load_data: they are
+    stripped, blank answers are ignored and each question keeps its answers
+    in category order (declared options first, then other answers as they
+    first appear). Dimension values are stripped too, with '' for rows that
+    did not answer. Cubes can be updated row by row (add, remove) and
+    summed (merge), e.g. across uploads or campuses.
+    """
+
+    def __init__(self, categories, dimensions=None, values=None, cells=None):
+        """
+        Args:
+            categories (dict): Question -> declared options (see declared_categories)
+            dimensions (dict): Dimension name -> column name (see cube_dimensions)
+            values (dict): Question -> answers in category order
+            cells (dict): Question -> {(answer, *dimension values): count}
+        """
+        self.dimensions = dict(dimensions or {})
+        self.values = {}
+        self.cells = {}
+        for question, options in categories.items():
+            self.values[question] = dict.fromkeys(options)
+            self.values[question].update(dict.fromkeys((values or {}).get(question, ())))
+            self.cells[question] = dict((cells or {}).get(question, {}))
+
+    @property
+    def categories(self):
+        """Question -> answers in category order"""
+        return {question: list(values) for question, values in self.values.items()}
+
+    @property
+    def nbytes(self):
+        """Approximate memory of the cells (dictionary entries, key tuples and counts)"""
+        size = 0
+        for question, cells in self.cells.items():
+            size += sys.getsizeof(cells) + sys.getsizeof(self.values[question])
+            if cells:
+                size += len(cells) * (sys.getsizeof(next(iter(cells))) + sys.getsizeof(0))
+        return size
+
+    @property
+    def columns(self):
+        """Columns a batch needs for add/remove (questions and dimensions)"""
+        return list(dict.fromkeys(list(self.cells) + list(self.dimensions.values())))
+
+    def add(self, df, sign=1):
+        """
+        Add the contribution of a batch of rows
+
+        Args:
+            df (pd.DataFrame): Rows with (some of) the cube columns
+            sign (int): 1 to add the rows, -1 to remove them
+        """
+        if df.empty:
+            return
+
+        # Rows are grouped by dimension cell once; every question reuses the groups
+        dimension_labels = [
+            _labels(df[column]) if column in df.columns else np.full(len(df), '', dtype=object)
+            for column in self.dimensions.values()
+        ]
+        group = np.zeros(len(df), dtype=np.int64)
+        for labels in dimension_labels:
+            codes, uniques = pd.factorize(labels)
+            group = group * len(uniques) + codes
+        group, group_uniques = pd.factorize(group)
+        first_rows = np.unique(group, return_index=True)[1]
+        group_labels = list(zip(*(labels[first_rows] for labels in dimension_labels))) or [()]
+
+        for question, cells in self.cells.items():
+            if question not in df.columns:
+                continue
+            codes, uniques = pd.factorize(df[question])
+            if not len(uniques):
+                continue
+            valid = codes >= 0
+            combined = codes[valid].astype(np.int64) * len(group_uniques) + group[valid]
+            occurrences = np.bincount(combined, minlength=len(uniques) * len(group_uniques))
+            values = self.values[question]
+            for cell in np.flatnonzero(occurrences):
+                value = str(uniques[cell // len(group_uniques)]).strip()
+                if not value:
+                    continue
+                values.setdefault(value)
+                key = (value,) + tuple(group_labels[cell % len(group_uniques)])
+                count = cells.get(key, 0) + sign * int(occurrences[cell])
+                if count:
+                    cells[key] = count
+                else:
+                    cells.pop(key, None)
+
+    def remove(self, df):
+        """Remove the contribution of rows that were replaced or deleted"""
+        self.add(df, sign=-1)
+
+    def merge(self, other):
+        """
+        Return a cube with the counts of this cube and another one
+
+        Both cubes must have the same dimensions. Answers only the other
+        cube has are placed after this cube's answers.
+        """
+        if list(self.dimensions) != list(other.dimensions):
+            raise ValueError(f"Cubes with different dimensions: {list(self.dimensions)} and {list(other.dimensions)}")
+        merged = CountCube(self.categories, self.dimensions, cells=self.cells)
+        for question, values in other.values.items():
+            merged.values.setdefault(question, {}).update(dict.fromkeys(values))
+            cells = merged.cells.setdefault(question, {})
+            for key, count in other.cells[question].items():
+                cells[key] = cells.get(key, 0) + count
+        return merged
+
+    def series(self, question, filters=None):
+        """
+        Return the counts of a question as count_values would
+
+        Args:
+            question (str): Column name
+            filters (dict): Dimension name -> accepted values (all rows if None)
+
+        Returns:
+            pd.Series: Counts of the answers that occur, most frequent first
+            (ties in category order), or None if the question is not counted
+            or a filter is not a dimension of the cube
+        """
+        cells = self.cells.get(question)
+        if cells is None:
+            return None
+        positions = []
+        for name, accepted in (filters or {}).items():
+            if name not in self.dimensions:
+                return None
+            positions.append((list(self.dimensions).index(name) + 1, set(accepted)))
+
+        totals = dict.fromkeys(self.values[question], 0)
+        for key, count in cells.items():
+            if all(key[position] in accepted for position, accepted in positions):
+                totals[key[0]] += count
+
+        totals = {value: count for value, count in totals.items() if count > 0}
+        result = pd.Series(
+            list(totals.values()),
+            index=pd.Index(list(totals), dtype=object, name=question),
+            dtype='int64',
+            name='count'
+        )
+        return result.sort_values(ascending=False, kind='stable')
+
+    def view(self, filters=None):
+        """Return the cube restricted to some dimension values (see CubeView)"""
+        return CubeView(self, filters)
+
+    def save(self, folder):
+        """Write the cube to CUBE_FILE inside a snapshot folder"""
+        dimension_values = {name: {} for name in self.dimensions}
+        cells = {}
+        for question, question_cells in self.cells.items():
+            values = {value: i for i, value in enumerate(self.values[question])}
+            rows = []
+            for key, count in question_cells.items():
+                row = [values[key[0]]]
+                for name, label in zip(self.dimensions, key[1:]):
+                    row.append(dimension_values[name].setdefault(label, len(dimension_values[name])))
+                rows.append(row + [count])
+            cells[question] = rows
+
+        data = {
+            'dimensions': self.dimensions,
+            'dimension_values': {name: list(labels) for name, labels in dimension_values.items()},
+            'values': self.categories,
+            'cells': cells
+        }
+        with open(os.path.join(folder, CUBE_FILE), 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+
+    @classmethod
+    def load(cls, folder):
+        """
+        Read the cube stored in a snapshot folder
+
+        Returns:
+            CountCube: Stored cube, or None if the snapshot has none
+        """
+        try:
+            with open(os.path.join(folder, CUBE_FILE), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+        dimension_values = [data['dimension_values'][name] for name in data['dimensions']]
+        cells = {}
+        for question, rows in data['cells'].items():
+            values = data['values'][question]
+            cells[question] = {
+                (values[row[0]],) + tuple(labels[i] for labels, i in zip(dimension_values, row[1:-1])): row[-1]
+                for row in rows
+            }
+        return cls(data['values'], data['dimensions'], cells=cells)
+
+
+class CubeView:
+    """Counts of a cube restricted to some dimension values"""
+
+    def __init__(self, cube, filters=None):
+        """
+        Args:
+            cube (CountCube): Cube to query
+            filters (dict): Dimension name -> accepted values
+        """
+        self.cube = cube
+        self.filters = filters
+
+    def series(self, question):
+        """Counts of a question within the view (see CountCube.series)"""
+        return self.cube.series(question, self.filters)
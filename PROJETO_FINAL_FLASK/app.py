@@ -1,20 +1,34 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify
+from flask import (
+    Flask, render_template, request, redirect, url_for, flash, session, jsonify, send_file, Response, g,
+    stream_with_context, abort, has_request_context
+)
 import os
 import pandas as pd
 import json
 import uuid
+import time
+import click
 from werkzeug.utils import secure_filename
-from data_processing import process_excel_file, load_data, check_data_ready, create_directories
-from visualization import (
-    generate_visao_geral_charts,
-    generate_perfil_estudantes_charts,
-    generate_socioeconomico_charts,
-    generate_trabalho_formacao_charts,
-    generate_tecnologia_charts,
-    generate_interesses_habitos_charts,
-    generate_motivacoes_expectativas_charts,
-    generate_analise_texto_charts
+from data_processing import (
+    process_excel_file, load_data, check_data_ready, create_directories, ensure_dataset, migrate_standardization,
+    UPSERT_KEYS
+)
+from storage import (
+    DATABASE_FOLDER, read_dataset, read_dataset_rows, delete_dataset, export_legacy_json, dataset_files, snapshot_folder
 )
+from dataset_cache import DatasetPool
+from catalog import DatasetCatalog, DEFAULT_DATASET
+from fatec_comum.schema import get_schema
+from aggregates import CountCube
+from visualization import SECTION_GENERATORS, SharedCounts, count_values, create_trend_chart
+from bitmap_index import BitmapIndex, FilteredFrame, FILTER_COLUMNS
+from multiselect import MultiSelectIndex
+from text_index import TextIndex, TEXT_COLUMN
+from durations import response_durations, duration_stats, duration_bin_counts
+from trends import question_trend
+from chart_cache import precompute_charts, load_section, store_section, serialize_charts, dataset_signature, clear_charts
+from jobs import JobQueue
+from metrics import render_metrics, HTTP_REQUEST_SECONDS, CHART_CACHE_REQUESTS
 from config import config
 import logging
 
@@ -39,14 +53,276 @@ app.config.from_object(config[env])
 # Initialize app with configuration
 config[env].init_app(app)
 
+# Survey editions (campus and term) stored side by side; routes under
+# /datasets/<dataset_id>/ use one of them, the others use the default dataset
+dataset_catalog = DatasetCatalog()
+
+# Loaded datasets shared by all requests, reloaded only when their files change;
+# the least recently used ones leave memory when the budget is exceeded
+dataset_pool = DatasetPool(load_data, dataset_files, app.config['DATASET_MEMORY_MB'] * 1024 * 1024)
+
+# Uploads are processed in background jobs so the request returns right away
+upload_jobs = JobQueue(max_workers=app.config['JOB_WORKERS'])
+
+# Rótulos dos filtros exibidos no dashboard
+FILTER_LABELS = {
+    'curso': 'Curso',
+    'periodo': 'Período',
+    'genero': 'Gênero',
+    'cidade': 'Cidade',
+    'estado_civil': 'Estado civil',
+    'trabalha': 'Trabalha'
+}
+
+# Rotas com escopo de base: cada regra também existe sob /datasets/<dataset_id>
+def dataset_route(rule, **options):
+    """Register a view for rule and for the same rule scoped by dataset id"""
+    def decorator(view):
+        app.route(rule, **options)(view)
+        app.route(f"/datasets/<dataset_id>{rule}", **options)(view)
+        return view
+    return decorator
+
+@app.url_value_preprocessor
+def pull_dataset(endpoint, values):
+    """Resolve the dataset of the URL (404 if it is not in the catalog)"""
+    dataset_id = (values or {}).pop('dataset_id', DEFAULT_DATASET)
+    g.dataset = dataset_catalog.get(dataset_id)
+    if g.dataset is None:
+        abort(404)
+
+@app.url_defaults
+def add_dataset(endpoint, values):
+    """Keep links and redirects inside the dataset of the current request"""
+    dataset = g.get('dataset') if has_request_context() else None
+    if (
+        dataset is not None and dataset['id'] != DEFAULT_DATASET and 'dataset_id' not in values
+        and app.url_map.is_endpoint_expecting(endpoint, 'dataset_id')
+    ):
+        values['dataset_id'] = dataset['id']
+
+# Função para obter a base da requisição atual
+def current_dataset():
+    """Catalog entry of the dataset of the request (the default one outside a request)"""
+    dataset = g.get('dataset') if has_request_context() else None
+    return dataset if dataset is not None else dataset_catalog.get(DEFAULT_DATASET)
+
+# Função para obter o cache em memória de uma base
+def dataset_cache(dataset=None):
+    """
+    Cache of a dataset in the memory-bounded pool (see DatasetPool)
+
+    Args:
+        dataset (dict): Catalog entry (the dataset of the request if None)
+
+    Returns:
+        DatasetCache: Cache of the dataset
+    """
+    dataset = dataset or current_dataset()
+    return dataset_pool.cache(dataset['id'], dataset['path'])
+
+# Função para ler os filtros da query string (ex.: ?curso=ADS&periodo=Noturno)
+def get_filters(ignore=()):
+    """
+    Read the dashboard filters from the request query string
+
+    Args:
+        ignore (tuple): Query parameters that are not filters
+
+    Returns:
+        dict: Filter name -> list of values (empty values are ignored)
+
+    Raises:
+        ValueError: If a parameter is not a known filter
+    """
+    filters = {}
+    for key in request.args:
+        if key in ignore:
+            continue
+        if key not in FILTER_COLUMNS:
+            raise ValueError(f"Filtro desconhecido: {key}")
+        values = [value for value in request.args.getlist(key) if value.strip()]
+        if values:
+            filters[key] = values
+    return filters
+
+# Função para obter a base em cache junto com as estruturas derivadas da mesma carga
+def loaded_dataset(dataset=None):
+    """
+    Cached dataset and the structures built from that same load
+
+    Args:
+        dataset (dict): Catalog entry (the dataset of the request if None)
+
+    Returns:
+        tuple: (DataFrame, dict with its 'bitmap_index', 'multi_select',
+        'text_index' and 'count_cube')
+    """
+    return dataset_cache(dataset).get_with_derived({
+        'bitmap_index': BitmapIndex,
+        'multi_select': MultiSelectIndex,
+        'text_index': stored_text_index,
+        'count_cube': stored_cube
+    })
+
+# Função para aplicar filtros usando o índice de bitmaps do dataset em cache
+def filtered_frame(filters, loaded=None):
+    """
+    Select the rows matching the filters through the bitmap index
+
+    Args:
+        filters (dict): Filter name -> list of values
+        loaded (tuple): (DataFrame, derived structures) from loaded_dataset
+            (loaded here if None)
+
+    Returns:
+        SharedCounts: View of the cached dataset restricted to the matching
+        rows (a FilteredFrame), answering closed-question counts from the
+        count cube when every filter is a cube dimension, multi-select
+        option counts from the multi-select index and word counts from the
+        inverted index of the open-ended answers
+
+    Raises:
+        ValueError: If a filter column does not exist in the dataset
+    """
+    df, derived = loaded or loaded_dataset()
+    index = derived['bitmap_index']
+    missing = [name for name in filters if name not in index.columns]
+    if missing:
+        raise ValueError(f"Filtro indisponível para estes dados: {', '.join(missing)}")
+    frame = FilteredFrame(df, index, index.filter(filters))
+    options = derived['multi_select']
+    text_index = derived['text_index']
+    
+    # Closed-question counts come from the count cube when every filter is one of its dimensions
+    cube = derived['count_cube']
+    if cube is not None and all(name in cube.dimensions for name in filters):
+        values = {
+            name: [value for query in queries for value in index.resolve_values(name, query)]
+            for name, queries in filters.items()
+        }
+        return SharedCounts(frame, cube.view(values), options, text_index)
+    return SharedCounts(frame, options=options, text_index=text_index)
+
+# Request timing (exported on /metrics)
+@app.before_request
+def start_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request_duration(response):
+    start = g.pop('request_start', None)
+    if start is not None:
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - start,
+            endpoint=request.endpoint or 'unknown',
+            method=request.method,
+            status=response.status_code
+        )
+    return response
+
 # Routes
-@app.route('/')
+@dataset_route('/')
 def home():
     # Check if data is already processed
-    data_ready = check_data_ready()
-    return render_template('upload.html', data_ready=data_ready)
+    data_ready = check_data_ready(current_dataset()['path'])
+    return render_template('upload.html', data_ready=data_ready, dataset=current_dataset())
+
+# Função para ler o cubo de contagens gravado com a versão carregada da base
+def stored_cube(df):
+    """
+    Return the count cube stored with the snapshot a DataFrame was loaded from
+    
+    Returns:
+        CountCube: Stored cube, or None if the snapshot has none
+    """
+    snapshot = df.attrs.get('snapshot')
+    folder = df.attrs.get('database_folder', DATABASE_FOLDER)
+    return CountCube.load(snapshot_folder(folder, version=snapshot)) if snapshot else None
+
+# Função para ler o índice invertido das respostas abertas da versão carregada da base
+def stored_text_index(df):
+    """
+    Return the inverted index stored with the snapshot a DataFrame was loaded from
+    
+    Snapshots written before the index existed are indexed from the DataFrame.
+    
+    Returns:
+        TextIndex: Index of the open-ended answers
+    """
+    snapshot = df.attrs.get('snapshot')
+    folder = df.attrs.get('database_folder', DATABASE_FOLDER)
+    text_index = TextIndex.load(snapshot_folder(folder, version=snapshot)) if snapshot else None
+    return text_index if text_index is not None else TextIndex.build(df)
+
+# Função para montar a visão completa da base usada na geração dos gráficos
+def dataset_frame(dataset=None):
+    """Cached dataset wrapped with its stored count cube and indexes (see SharedCounts)"""
+    df, derived = loaded_dataset(dataset)
+    cube = derived['count_cube']
+    return SharedCounts(df, cube.view() if cube is not None else None, derived['multi_select'], derived['text_index'])
 
-@app.route('/upload', methods=['POST'])
+# Função que processa um upload dentro de um job em segundo plano
+def process_upload(job, upload_path, mode='replace', key='ID', dataset=None):
+    """
+    Ingest an uploaded workbook and precompute the dashboard charts
+    
+    The job owns the saved workbook and removes it when it finishes,
+    whether the import succeeds or fails.
+    Once the snapshot is published the import has succeeded: errors while
+    updating the catalog or precomputing the charts are recorded as job
+    warnings, and /get_charts builds the charts on demand.
+    
+    Args:
+        job (Job): Job that receives the progress of each stage
+        upload_path (str): Path of the saved workbook
+        mode (str): 'replace' or 'upsert' (see process_excel_file)
+        key (str): Column that identifies a response in upsert mode
+        dataset (dict): Catalog entry of the dataset that receives the
+            responses (jobs run outside the request, so it is passed along)
+    
+    Returns:
+        tuple: (success, message)
+    """
+    dataset = dataset or dataset_catalog.get(DEFAULT_DATASET)
+    
+    try:
+        # The new data is written to its own snapshot and published at the end,
+        # so dashboard requests keep reading the previous version meanwhile
+        success, message = process_excel_file(
+            upload_path, progress=job.update, mode=mode, key=key, database_folder=dataset['path']
+        )
+        
+        if not success:
+            return success, message
+        
+        # The snapshot is already published: the steps below cannot fail the import
+        try:
+            dataset_catalog.update(
+                dataset['id'], rows=read_dataset_rows(dataset['path']), schema_version=get_schema().version
+            )
+        except Exception as e:
+            logger.error(f"Error updating the catalog entry of {dataset['id']}: {str(e)}")
+            job.warn("Os dados foram importados, mas o catálogo de bases não foi atualizado")
+        
+        # Render every section once so /get_charts can serve stored payloads;
+        # closed-question counts come from the ones stored at ingest
+        try:
+            precompute_charts(
+                dataset_frame(dataset), SECTION_GENERATORS, database_folder=dataset['path'],
+                progress=lambda done, total: job.update('precompute', done, total)
+            )
+        except Exception as e:
+            logger.error(f"Error precomputing charts of {dataset['id']}: {str(e)}")
+            job.warn("Os gráficos não foram pré-calculados; eles serão gerados ao abrir o dashboard")
+        return success, message
+    finally:
+        try:
+            os.remove(upload_path)
+        except OSError as e:
+            logger.warning(f"Could not remove uploaded file {upload_path}: {str(e)}")
+
+@dataset_route('/upload', methods=['POST'])
 def upload_file():
     if 'file' not in request.files:
         flash('Nenhum arquivo selecionado', 'danger')
@@ -60,34 +336,64 @@ def upload_file():
     
     if file and (file.filename.endswith('.xlsx') or file.filename.endswith('.xls')):
         filename = secure_filename(file.filename)
-        upload_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(upload_path)
+        # Replace the stored responses or merge the new ones into them
+        mode = request.form.get('mode', 'replace')
+        key = request.form.get('key', 'ID')
+        if mode not in ('replace', 'upsert') or key not in UPSERT_KEYS:
+            flash('Modo de importação inválido', 'danger')
+            return redirect(url_for('home'))
         
-        # Process the file
-        logger.info(f"Processing uploaded file: {filename}")
-        success, message = process_excel_file(upload_path)
+        # Queued uploads must not overwrite each other before they are processed
+        upload_path = os.path.join(app.config['UPLOAD_FOLDER'], f"{uuid.uuid4().hex[:8]}_{filename}")
+        file.save(upload_path)
         
-        if success:
-            flash(message, 'success')
-            return redirect(url_for('dashboard', section='visao_geral'))
-        else:
-            flash(f'Erro: {message}', 'danger')
-            return redirect(url_for('home'))
+        # Process the file in the background and follow its progress
+        job = upload_jobs.submit(filename, process_upload, upload_path, mode, key, dataset=current_dataset())
+        logger.info(f"Processing uploaded file {filename} in job {job.id}")
+        return redirect(url_for('upload_status', job_id=job.id))
     else:
         flash('Arquivo deve ser do tipo Excel (.xlsx ou .xls)', 'danger')
         return redirect(url_for('home'))
 
-@app.route('/dashboard')
-@app.route('/dashboard/<section>')
+@dataset_route('/upload/<job_id>')
+def upload_status(job_id):
+    """Progress page of an upload; redirects once the job is finished"""
+    job = upload_jobs.get(job_id)
+    if job is None:
+        flash('Processamento não encontrado', 'warning')
+        return redirect(url_for('home'))
+    
+    if job.status == 'done':
+        flash(job.message, 'success')
+        for warning in job.warnings:
+            flash(warning, 'warning')
+        return redirect(url_for('dashboard', section='visao_geral'))
+    if job.status == 'failed':
+        flash(f'Erro: {job.message}', 'danger')
+        return redirect(url_for('home'))
+    
+    return render_template('processing.html', job=job.to_dict())
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    """API with the state and stage progress of a background job"""
+    job = upload_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job.to_dict())
+
+@dataset_route('/dashboard')
+@dataset_route('/dashboard/<section>')
 def dashboard(section='visao_geral'):
     # Check if data is ready
-    if not check_data_ready():
+    if not check_data_ready(current_dataset()['path']):
         flash('Nenhum dado processado. Faça o upload de um arquivo primeiro.', 'danger')
         return redirect(url_for('home'))
     
     # Load data
     try:
-        df = load_data()
+        loaded = loaded_dataset()
+        df = loaded[0]
         if df.empty:
             flash('Erro ao carregar dados. O arquivo pode estar vazio ou mal formatado.', 'danger')
             return redirect(url_for('home'))
@@ -96,13 +402,26 @@ def dashboard(section='visao_geral'):
         flash(f'Erro ao carregar dados: {str(e)}', 'danger')
         return redirect(url_for('home'))
     
+    # Apply the drill-down filters, if any
+    try:
+        filters = get_filters()
+        if filters:
+            df = filtered_frame(filters, loaded)
+    except ValueError as e:
+        flash(str(e), 'warning')
+        return redirect(url_for('dashboard', section=section))
+    
     # Basic stats for dashboard header
     stats = {
         'total_records': len(df),
-        'courses': df['Qual o seu curso?'].nunique() if 'Qual o seu curso?' in df.columns else 0,
-        'genders': df['Qual é o seu gênero?'].nunique() if 'Qual é o seu gênero?' in df.columns else 0
+        'courses': len(count_values(df, 'Qual o seu curso?')) if 'Qual o seu curso?' in df.columns else 0,
+        'genders': len(count_values(df, 'Qual é o seu gênero?')) if 'Qual é o seu gênero?' in df.columns else 0
     }
     
+    # Options of the filter form (most frequent first)
+    index = loaded[1]['bitmap_index']
+    filter_options = {name: index.values(name) for name in index.columns}
+    
     # Return the appropriate template based on section
     sections = {
         'visao_geral': 'Visão Geral',
@@ -120,63 +439,221 @@ def dashboard(section='visao_geral'):
         section=section,
         section_title=sections.get(section, 'Dashboard'),
         sections=sections,
-        stats=stats
+        stats=stats,
+        filters=filters,
+        filter_options=filter_options,
+        filter_labels=FILTER_LABELS,
+        dataset=current_dataset()
     )
 
-@app.route('/get_charts/<section>')
+# Função para gerar (ou ler do cache) o payload de várias seções
+def section_payloads(sections, filters, frame=None):
+    """
+    Yield the serialized payload of each section, in order
+    
+    Unfiltered sections come from the payloads precomputed at upload time
+    when they are current. The others are generated over one shared view
+    of the dataset, so counts of columns used by several sections are
+    computed once.
+    
+    Args:
+        sections (list): Section names
+        filters (dict): Filter name -> list of values
+        frame (SharedCounts): Filtered view already built by the caller
+            (built here from filters if None)
+    
+    Yields:
+        tuple: (section, bytes, etag)
+    
+    Raises:
+        ValueError: If a filter cannot be applied
+        LookupError: If the dataset is empty
+    """
+    folder = current_dataset()['path']
+    if frame is None and filters:
+        frame = filtered_frame(filters)
+    for section in sections:
+        if not filters:
+            cached = load_section(section, folder)
+            CHART_CACHE_REQUESTS.inc(result='miss' if cached is None else 'hit')
+            if cached is not None:
+                yield (section,) + cached
+                continue
+            if frame is None:
+                frame = dataset_frame()
+                if frame.empty:
+                    raise LookupError('Empty dataset')
+        else:
+            CHART_CACHE_REQUESTS.inc(result='filtered')
+        
+        # Generate charts for the section; unfiltered payloads are stored for the next requests
+        logger.info(f"Generating charts for section {section} ({len(frame)} rows, filters: {filters or 'none'})")
+        signature = dataset_signature(folder)
+        charts = SECTION_GENERATORS[section](frame)
+        data, etag = serialize_charts(charts, section)
+        if not filters and signature is not None and signature == dataset_signature(folder):
+            store_section(section, data, etag, signature, folder)
+        logger.info(f"Successfully generated {len(charts)} charts for section {section}: {list(charts.keys())}")
+        yield section, data, etag
+
+@dataset_route('/get_charts/<section>')
 def get_charts(section):
     """API to get chart data for a specific section"""
-    if not check_data_ready():
+    if not check_data_ready(current_dataset()['path']):
         return jsonify({'error': 'No data available'}), 404
     
-    try:
-        df = load_data()
-        if df.empty:
-            return jsonify({'error': 'Empty dataset'}), 404
-        
-        # Log section request
-        logger.info(f"Generating charts for section: {section}")
-        
-        # Generate charts for the requested section
-        charts = {}
-        
-        if section == 'visao_geral':
-            charts = generate_visao_geral_charts(df)
-        elif section == 'perfil_estudantes':
-            charts = generate_perfil_estudantes_charts(df)
-        elif section == 'socioeconomico':
-            charts = generate_socioeconomico_charts(df)
-        elif section == 'trabalho_formacao':
-            charts = generate_trabalho_formacao_charts(df)
-        elif section == 'tecnologia':
-            charts = generate_tecnologia_charts(df)
-        elif section == 'interesses_habitos':
-            charts = generate_interesses_habitos_charts(df)
-        elif section == 'motivacoes_expectativas':
-            charts = generate_motivacoes_expectativas_charts(df)
-        elif section == 'analise_texto':
-            charts = generate_analise_texto_charts(df)
-        else:
-            return jsonify({'error': 'Invalid section'}), 400
-        
-        # Log chart generation success
-        chart_keys = list(charts.keys())
-        logger.info(f"Successfully generated {len(chart_keys)} charts for section {section}: {chart_keys}")
-        
-        return jsonify(charts)
+    if section not in SECTION_GENERATORS:
+        return jsonify({'error': 'Invalid section'}), 400
     
+    try:
+        filters = get_filters()
+        _, data, etag = next(section_payloads([section], filters))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except LookupError as e:
+        return jsonify({'error': str(e)}), 404
     except Exception as e:
         logger.error(f"Error generating charts for {section}: {str(e)}")
         return jsonify({'error': str(e)}), 500
+    
+    response = Response(data, mimetype='application/json')
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
+@dataset_route('/get_charts')
+def get_charts_batch():
+    """
+    API to get several sections in one request
+    
+    ?sections=visao_geral,tecnologia (or 'all', the default) returns a JSON
+    object keyed by section. With ?stream=1 each section is sent as one
+    NDJSON line ({"section": ..., "charts": ...}) as soon as it is ready.
+    Dashboard filters are accepted as in /get_charts/<section>.
+    """
+    if not check_data_ready(current_dataset()['path']):
+        return jsonify({'error': 'No data available'}), 404
+    
+    requested = request.args.get('sections', 'all')
+    sections = list(SECTION_GENERATORS) if requested == 'all' else [
+        name.strip() for name in requested.split(',') if name.strip()
+    ]
+    invalid = [name for name in sections if name not in SECTION_GENERATORS]
+    if not sections or invalid:
+        return jsonify({'error': f"Invalid section: {', '.join(invalid)}"}), 400
+    
+    stream = request.args.get('stream', '').lower() in ('1', 'true', 'ndjson')
+    # Filters are applied before the generator starts, so invalid ones get a 400 in both modes
+    try:
+        filters = get_filters(ignore=('sections', 'stream'))
+        frame = filtered_frame(filters) if filters else None
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    payloads = section_payloads(sections, filters, frame)
+    
+    if stream:
+        def generate():
+            section = None
+            try:
+                for section, data, _ in payloads:
+                    yield b'{"section": ' + json.dumps(section).encode('utf-8') + b', "charts": ' + data + b'}\n'
+            except Exception as e:
+                logger.error(f"Error streaming charts after section {section}: {str(e)}")
+                yield json.dumps({'error': str(e)}).encode('utf-8') + b'\n'
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+    
+    try:
+        parts = [json.dumps(section).encode('utf-8') + b': ' + data for section, data, _ in payloads]
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except LookupError as e:
+        return jsonify({'error': str(e)}), 404
+    except Exception as e:
+        logger.error(f"Error generating charts for {sections}: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+    
+    response = Response(b'{' + b', '.join(parts) + b'}', mimetype='application/json')
+    response.add_etag()
+    return response.make_conditional(request)
+
+@dataset_route('/search')
+def search():
+    """
+    API to search the open-ended answers ("história e sonhos")
+    
+    ?q= takes words, prefixes ending with * and phrases between double
+    quotes, all of which must match (see TextIndex.search); ?limit= caps
+    the results (default 20). Dashboard filters are accepted as in
+    /get_charts/<section>.
+    """
+    if not check_data_ready(current_dataset()['path']):
+        return jsonify({'error': 'No data available'}), 404
+    
+    query = request.args.get('q', '')
+    try:
+        limit = max(int(request.args.get('limit', 20)), 0)
+        filters = get_filters(ignore=('q', 'limit'))
+        loaded = loaded_dataset()
+        df, derived = loaded
+        if TEXT_COLUMN not in df.columns:
+            return jsonify({'error': 'Pergunta aberta não encontrada nos dados'}), 404
+        text_index = derived['text_index']
+        # Respondents of the filtered rows (the dataset is indexed by ID)
+        ids = filtered_frame(filters, loaded)[TEXT_COLUMN].index if filters else None
+        results = text_index.search(query, ids=ids)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error searching answers: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+    
+    answers = df[TEXT_COLUMN]
+    return jsonify({
+        'query': query,
+        'total': len(results),
+        'results': [
+            {'id': respondent, 'hits': hits, 'text': answers.get(respondent)}
+            for respondent, hits in results[:limit]
+        ]
+    })
+
+@dataset_route('/durations')
+def durations():
+    """
+    API with the statistics of the time taken to answer the survey
+    
+    Durations are completion minus start time in minutes (see
+    durations.response_durations). Dashboard filters are accepted as in
+    /get_charts/<section>.
+    """
+    if not check_data_ready(current_dataset()['path']):
+        return jsonify({'error': 'No data available'}), 404
+    
+    try:
+        filters = get_filters()
+        df = filtered_frame(filters) if filters else dataset_cache().get()
+        minutes = response_durations(df)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error computing response durations: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+    
+    return jsonify({
+        'stats': duration_stats(minutes),
+        'bins': [{'range': label, 'count': int(count)} for label, count in duration_bin_counts(minutes).items()]
+    })
 
-@app.route('/clear_data', methods=['POST'])
+@dataset_route('/clear_data', methods=['POST'])
 def clear_data():
     """Clear processed data"""
     try:
-        if os.path.exists('./database/colunas.csv'):
-            os.remove('./database/colunas.csv')
-        if os.path.exists('./database/dados.json'):
-            os.remove('./database/dados.json')
+        dataset = current_dataset()
+        cache = dataset_cache(dataset)
+        with cache.lock:
+            delete_dataset(dataset['path'])
+            clear_charts(dataset['path'])
+            cache.invalidate()
+        dataset_catalog.update(dataset['id'], rows=0)
         logger.info("Data cleared successfully")
         flash('Dados limpos com sucesso!', 'success')
     except Exception as e:
@@ -185,14 +662,33 @@ def clear_data():
     
     return redirect(url_for('home'))
 
-@app.route('/debug_data')
+@dataset_route('/export_data')
+def export_data():
+    """Export the processed data in the legacy JSON format (dados.json)"""
+    folder = current_dataset()['path']
+    if not check_data_ready(folder):
+        flash('Nenhum dado processado. Faça o upload de um arquivo primeiro.', 'danger')
+        return redirect(url_for('home'))
+    
+    try:
+        ensure_dataset(folder)
+        df = read_dataset(folder)
+        export_folder = os.path.join(app.config['UPLOAD_FOLDER'], 'export')
+        _, data_path = export_legacy_json(df, export_folder)
+        return send_file(os.path.abspath(data_path), as_attachment=True, download_name='dados.json')
+    except Exception as e:
+        logger.error(f"Error exporting data: {str(e)}")
+        flash(f'Erro ao exportar dados: {str(e)}', 'danger')
+        return redirect(url_for('home'))
+
+@dataset_route('/debug_data')
 def debug_data():
     """Debug endpoint to view raw data (development only)"""
     if not app.debug:
         return "Debug mode is not enabled", 403
     
     try:
-        df = load_data()
+        df = dataset_cache().get()
         # Return the first 50 rows as HTML with additional debug info
         html_output = "<h2>Debug Data</h2>"
         
@@ -216,6 +712,96 @@ def debug_data():
     except Exception as e:
         return f"Error: {str(e)}"
 
+@app.route('/datasets', methods=['GET'])
+def list_datasets():
+    """
+    API with the dataset catalog
+    
+    Each entry has the id, campus, term, storage folder, row count and
+    schema version, plus the memory it uses while resident (0 when it is
+    not loaded).
+    """
+    resident = dataset_pool.residency()
+    return jsonify({
+        'datasets': [dict(entry, resident_bytes=resident.get(entry['id'], 0)) for entry in dataset_catalog.list()],
+        'memory_budget_bytes': dataset_pool.max_bytes
+    })
+
+@app.route('/datasets', methods=['POST'])
+def register_dataset():
+    """API to add a survey edition to the catalog (id, campus and term, as form or JSON fields)"""
+    fields = request.get_json(silent=True) or request.form
+    try:
+        entry = dataset_catalog.register(fields.get('id'), fields.get('campus'), fields.get('term'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(entry), 201
+
+@app.route('/datasets/<dataset_id>', methods=['PATCH'])
+def describe_dataset():
+    """API to set the campus and term of a dataset (e.g. of the default one, for the trends)"""
+    fields = request.get_json(silent=True) or request.form
+    try:
+        entry = dataset_catalog.update(
+            current_dataset()['id'], **{name: fields[name] for name in ('campus', 'term') if name in fields}
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(entry)
+
+@app.route('/datasets/<dataset_id>', methods=['DELETE'])
+def remove_dataset():
+    """API to remove a survey edition, its files and its cached data"""
+    dataset = current_dataset()
+    try:
+        with dataset_cache(dataset).lock:
+            dataset_catalog.remove(dataset['id'])
+            dataset_pool.discard(dataset['id'])
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'removed': dataset['id']})
+
+@app.route('/trends/<question_id>')
+def trends(question_id):
+    """
+    API with the evolution of a closed question over the stored survey editions
+    
+    Reads only the count cube stored with each edition of the catalog (see
+    trends.question_trend), so the time does not depend on the number of
+    responses. ?value= keeps some answers (repeatable, e.g. value=Noturno),
+    ?campus= keeps the editions of one campus and ?counts=1 plots counts
+    instead of shares. The cube filters (curso, periodo, genero) are accepted.
+    """
+    try:
+        filters = get_filters(ignore=('value', 'campus', 'counts'))
+        trend = question_trend(
+            dataset_catalog.list(), question_id, filters, campus=request.args.get('campus') or None
+        )
+    except KeyError:
+        return jsonify({'error': f"Pergunta desconhecida: {question_id}"}), 404
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if trend.index.empty:
+        return jsonify({'error': 'Nenhuma edição com contagens gravadas para esta pergunta'}), 404
+    
+    share = request.args.get('counts', '').lower() not in ('1', 'true')
+    title = get_schema().question(question_id).header.rstrip('*')
+    values = request.args.getlist('value') or None
+    chart = create_trend_chart(trend, title, values=values, share=share)
+    if chart is None and values and not trend.columns.empty:
+        return jsonify({'error': 'Resposta não encontrada nas edições'}), 404
+    return jsonify({
+        'terms': trend.index.tolist(),
+        'counts': {str(answer): [int(count) for count in trend[answer]] for answer in trend.columns},
+        'chart': chart
+    })
+
+@app.route('/metrics')
+def metrics():
+    """Timing, payload size and cache metrics in the Prometheus text format"""
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/version')
 def version():
     """Return app version info"""
@@ -226,6 +812,24 @@ def version():
         'framework': 'Flask'
     })
 
+@app.cli.command('migrate-standardization')
+@click.option('--force', is_flag=True, help='Rewrite the dataset even if it is already current.')
+@click.option('--dataset', 'dataset_ids', multiple=True, help='Dataset id (repeatable; every dataset of the catalog by default).')
+def migrate_standardization_command(force, dataset_ids):
+    """Re-standardize the stored datasets with the current rules"""
+    datasets = [dataset_catalog.get(dataset_id) for dataset_id in dataset_ids] or dataset_catalog.list()
+    for dataset_id, dataset in zip(dataset_ids or [entry['id'] for entry in datasets], datasets):
+        if dataset is None:
+            click.echo(f"{dataset_id}: base não encontrada no catálogo")
+            continue
+        cache = dataset_cache(dataset)
+        with cache.lock:
+            success, message = migrate_standardization(force, dataset['path'])
+            cache.invalidate()
+            if success and check_data_ready(dataset['path']):
+                precompute_charts(dataset_frame(dataset), SECTION_GENERATORS, database_folder=dataset['path'])
+        click.echo(f"{dataset_id}: {message}")
+
 @app.errorhandler(404)
 def page_not_found(e):
     logger.warning(f"404 error: {request.path}")
@@ -0,0 +1,88 @@
+"""
+Benchmark de memória dos construtores de gráficos
+
+Mede com tracemalloc o pico de memória alocada por um gráfico de barras,
+pizza e top N em DataFrames com o mesmo número de linhas e quantidades
+crescentes de colunas. A implementação antiga copiava o DataFrame inteiro
+(df.copy()) para limpar uma única coluna, então o pico crescia com o número
+de colunas; a atual trabalha só com a coluna do gráfico.
+
+Uso (a partir da pasta PROJETO_FINAL_FLASK):
+    python benchmarks/bench_chart_memory.py --rows 100000 --columns 10 100 300
+"""
+import os
+import sys
+import logging
+import argparse
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from visualization import (  # noqa: E402
+    create_bar_chart, create_pie_chart, create_top_n_chart, standardize_series
+)
+
+COLUMN = 'Em qual cidade você reside?'
+CITIES = ['Franca', 'Batatais', 'Ribeirão Preto', 'Restinga', 'Patrocínio Paulista', 'Cristais Paulista']
+ANSWERS = ['Sim', 'Não', 'Nenhum', 'Pouco', 'Intermediário', 'Avançado']
+
+
+def legacy_counts(df, column):
+    """Reference copy of the previous counting step (whole-frame copy)"""
+    df_clean = df.copy()
+    df_clean[column] = standardize_series(df_clean[column])
+    return df_clean[column].value_counts()
+
+
+def make_frame(rows, columns, seed=42):
+    """Build a frame with the chart column plus filler answer columns"""
+    rng = np.random.default_rng(seed)
+    data = {COLUMN: np.array(CITIES, dtype=object)[rng.integers(0, len(CITIES), rows)]}
+    filler = np.array(ANSWERS, dtype=object)
+    for i in range(columns - 1):
+        data[f'Pergunta {i}'] = filler[rng.integers(0, len(filler), rows)]
+    # Object columns, as loaded by pandas 2 (Arrow-backed strings are not seen by tracemalloc)
+    return pd.DataFrame(data).astype(object)
+
+
+def peak_bytes(func, *args):
+    """Peak memory allocated while func runs"""
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def section(df):
+    """A few charts over the same column, as a section request renders"""
+    create_bar_chart(df, COLUMN, 'Cidades')
+    create_pie_chart(df, COLUMN, 'Cidades')
+    create_top_n_chart(df, COLUMN, n=5, title='Top cidades')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000, help='number of rows (default: 100000)')
+    parser.add_argument('--columns', type=int, nargs='+', default=[10, 100, 300],
+                        help='column counts to measure (default: 10 100 300)')
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    print(f"rows: {args.rows}")
+    print(f"{'columns':>8} {'frame MB':>10} {'copy+count MB':>14} {'3 charts MB':>12}")
+    for columns in args.columns:
+        df = make_frame(args.rows, columns)
+        frame_mb = df.memory_usage(deep=True).sum() / 2**20
+        legacy_mb = peak_bytes(legacy_counts, df, COLUMN) / 2**20
+        charts_mb = peak_bytes(section, df) / 2**20
+        print(f"{columns:>8} {frame_mb:>10.1f} {legacy_mb:>14.1f} {charts_mb:>12.2f}")
+
+
+if __name__ == '__main__':
+    main()
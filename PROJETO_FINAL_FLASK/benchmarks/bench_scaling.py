@@ -0,0 +1,196 @@
+"""
+Benchmark de escala: importação, carga e seções do dashboard
+
+Para cada tamanho pedido gera uma planilha sintética (benchmarks/synthetic.py)
+e mede tempo de execução e pico de memória (RSS) de:
+    ingest   process_excel_file (planilha -> dados.parquet)
+    load     load_data (dados.parquet -> DataFrame)
+    <seção>  cada generate_*_charts sobre o DataFrame carregado
+
+Cada etapa roda em um processo separado, para que o pico de RSS de uma não
+contamine a outra (nas seções o pico inclui o DataFrame carregado). Os
+resultados são comparados com benchmarks/baselines.json e o script termina
+com código 1 se alguma etapa piorar além da tolerância.
+
+Uso (a partir da pasta PROJETO_FINAL_FLASK):
+    python benchmarks/bench_scaling.py --rows 1000 10000
+    python benchmarks/bench_scaling.py --rows 1000 10000 --save-baseline
+"""
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import platform
+import tempfile
+import subprocess
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+BENCHMARKS_FOLDER = os.path.dirname(os.path.abspath(__file__))
+PROJECT_FOLDER = os.path.dirname(BENCHMARKS_FOLDER)
+BASELINE_FILE = os.path.join(BENCHMARKS_FOLDER, 'baselines.json')
+WORKBOOK_NAME = 'sintetico.xlsx'
+
+# Diferenças menores que isso são tratadas como ruído de medição
+MIN_SECONDS_DELTA = 0.05
+MIN_RSS_DELTA_MB = 10
+
+
+def peak_rss_mb():
+    """Peak resident memory of the current process in MB (None if unavailable)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 2**10
+
+
+def run_stage(stage):
+    """
+    Run one stage inside the current process (called in a child process)
+
+    The working directory is the temporary folder with the synthetic
+    workbook, so the app writes its database there. Results are printed as
+    JSON lines.
+    """
+    sys.path.insert(0, PROJECT_FOLDER)
+    logging.disable(logging.INFO)
+
+    from data_processing import process_excel_file, load_data
+    from visualization import SECTION_GENERATORS
+
+    def emit(name, seconds):
+        print(json.dumps({'stage': name, 'seconds': round(seconds, 4), 'peak_rss_mb': peak_rss_mb()}))
+
+    if stage == 'ingest':
+        start = time.perf_counter()
+        success, message = process_excel_file(WORKBOOK_NAME)
+        if not success:
+            raise SystemExit(message)
+        emit('ingest', time.perf_counter() - start)
+    elif stage == 'load':
+        start = time.perf_counter()
+        load_data()
+        emit('load', time.perf_counter() - start)
+    elif stage == 'sections':
+        df = load_data()
+        for section, generator in SECTION_GENERATORS.items():
+            start = time.perf_counter()
+            generator(df)
+            emit(section, time.perf_counter() - start)
+    else:
+        raise SystemExit(f"Unknown stage: {stage}")
+
+
+def measure(rows, seed):
+    """
+    Generate a workbook with rows responses and measure every stage
+
+    Returns:
+        dict: Stage -> {'seconds', 'peak_rss_mb'}
+    """
+    sys.path.insert(0, BENCHMARKS_FOLDER)
+    from synthetic import generate_responses, write_excel
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='bench-scaling-') as workdir:
+        write_excel(generate_responses(rows, seed), os.path.join(workdir, WORKBOOK_NAME))
+        for stage in ('ingest', 'load', 'sections'):
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--stage', stage],
+                cwd=workdir, check=True, capture_output=True, text=True
+            ).stdout
+            for line in output.splitlines():
+                if line.startswith('{'):
+                    result = json.loads(line)
+                    results[result.pop('stage')] = result
+    return results
+
+
+def compare(name, result, baseline, tolerance):
+    """Return a list of regression messages for one stage"""
+    regressions = []
+    if baseline is None:
+        return regressions
+
+    seconds, base_seconds = result['seconds'], baseline['seconds']
+    if seconds > base_seconds * (1 + tolerance) and seconds - base_seconds > MIN_SECONDS_DELTA:
+        regressions.append(f"{name}: {seconds:.3f}s (baseline {base_seconds:.3f}s)")
+
+    rss, base_rss = result.get('peak_rss_mb'), baseline.get('peak_rss_mb')
+    if rss is not None and base_rss is not None:
+        if rss > base_rss * (1 + tolerance) and rss - base_rss > MIN_RSS_DELTA_MB:
+            regressions.append(f"{name}: {rss:.0f} MB peak RSS (baseline {base_rss:.0f} MB)")
+    return regressions
+
+
+def load_baselines(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'runs': {}}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000],
+                        help='numbers of responses to measure (default: 1000 10000)')
+    parser.add_argument('--seed', type=int, default=0, help='random seed of the synthetic data (default: 0)')
+    parser.add_argument('--baseline', default=BASELINE_FILE, help='baseline file (default: benchmarks/baselines.json)')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed relative slowdown or memory growth (default: 0.25)')
+    parser.add_argument('--save-baseline', action='store_true', help='store the results as the new baseline')
+    parser.add_argument('--stage', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.stage:
+        run_stage(args.stage)
+        return
+
+    baselines = load_baselines(args.baseline)
+    regressions = []
+    for rows in args.rows:
+        results = measure(rows, args.seed)
+        stored = baselines['runs'].get(str(rows), {})
+
+        print(f"\nrows: {rows}")
+        print(f"{'stage':<26} {'seconds':>9} {'baseline':>9} {'peak RSS MB':>12} {'baseline':>9}")
+        for name, result in results.items():
+            base = stored.get(name, {})
+            rss = result['peak_rss_mb']
+            print(
+                f"{name:<26} {result['seconds']:>9.3f} {base.get('seconds', float('nan')):>9.3f} "
+                f"{rss if rss is not None else float('nan'):>12.1f} {base.get('peak_rss_mb') or float('nan'):>9.1f}"
+            )
+            regressions.extend(f"[{rows} rows] {msg}" for msg in compare(name, result, stored.get(name), args.tolerance))
+
+        if args.save_baseline:
+            baselines['runs'][str(rows)] = results
+
+    if args.save_baseline:
+        baselines['environment'] = {
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'recorded_at': time.strftime('%Y-%m-%d')
+        }
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baselines, f, ensure_ascii=False, indent=4)
+        print(f"\nBaseline saved to {args.baseline}")
+    elif regressions:
+        print("\nRegressions:")
+        for msg in regressions:
+            print(f"  {msg}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""
+Benchmark da padronização de valores (standardize_values e DataStandardizer)
+
+Compara a implementação antiga, que aplicava as transformações linha a
+linha, com a atual, que normaliza apenas os valores distintos de cada
+coluna, e verifica que as duas produzem exatamente o mesmo resultado.
+O mesmo é feito para DataStandardizer.standardize_dataframe
+(NovoProjetoFlask/app/utils/data_standardizer.py).
+
+Uso (a partir da pasta PROJETO_FINAL_FLASK):
+    python benchmarks/bench_standardize.py --rows 1000000
+"""
+import os
+import sys
+import time
+import logging
+import argparse
+
+import numpy as np
+import pandas as pd
+
+PROJECT_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_FOLDER)
+sys.path.insert(0, os.path.join(os.path.dirname(PROJECT_FOLDER), 'NovoProjetoFlask', 'app', 'utils'))
+
+from data_processing import standardize_values, standardize_city_name  # noqa: E402
+from data_standardizer import DataStandardizer  # noqa: E402
+
+CITY_COL = 'Em qual cidade você reside?'
+COURSE_COL = 'Qual o seu curso?'
+PERIOD_COL = 'Qual o período que cursa?'
+
+CITIES = [
+    'Franca', 'FRANCA', 'franca', ' Franca ', 'Ribeirão Preto', 'RIBEIRAO PRETO', 'ribeirao preto',
+    'Batatais', 'BATATAIS', 'Patrocínio Paulista', 'são joaquim da barra', 'Cristais Paulista',
+    'Ituverava', 'Restinga', 'Pedregulho', 'Claraval', 'Ibiraci', 'Capetinga', 'Delfinópolis'
+]
+COURSES = [
+    'Análise e Desenvolvimento de Sistemas (ADS)', 'ADS', 'DSM', 'GPI', 'GESTÃO EMPRESARIAL',
+    'Gestão de Recursos Humanos', 'Desenvolvimento de Software Multiplataforma (DSM)'
+]
+PERIODS = ['Noturno', 'NOTURNO', 'Matutino', 'MATUTINO', 'EAD', 'ead', 'Ead']
+
+
+def standardize_values_rowwise(df):
+    """Reference copy of the previous per-row implementation"""
+    standardization_dict = {
+        CITY_COL: {
+            'FRANCA': 'Franca', 'franca': 'Franca', 'RIBEIRAO PRETO': 'Ribeirão Preto',
+            'RIBEIRAO': 'Ribeirão Preto', 'Ribeirao Preto': 'Ribeirão Preto',
+            'ribeirao preto': 'Ribeirão Preto', 'Ribeirão': 'Ribeirão Preto',
+            'BATATAIS': 'Batatais', 'batatais': 'Batatais'
+        },
+        COURSE_COL: {
+            'ADS': 'Análise e Desenvolvimento de Sistemas',
+            'ANALISE E DESENVOLVIMENTO DE SISTEMAS': 'Análise e Desenvolvimento de Sistemas',
+            'DESENVOLVIMENTO DE SOFTWARE MULTIPLATAFORMA': 'Desenvolvimento de Software Multiplataforma',
+            'DSM': 'Desenvolvimento de Software Multiplataforma',
+            'GESTÃO DE PRODUÇÃO INDUSTRIAL': 'Gestão de Produção Industrial',
+            'GPI': 'Gestão de Produção Industrial',
+            'GESTÃO EMPRESARIAL': 'Gestão Empresarial',
+            'GESTÃO DE RECURSOS HUMANOS': 'Gestão de Recursos Humanos',
+            'GESTÃO RH': 'Gestão de Recursos Humanos'
+        },
+        PERIOD_COL: {'MATUTINO': 'Matutino', 'NOTURNO': 'Noturno', 'Ead': 'EAD', 'ead': 'EAD'}
+    }
+    for col, standard_values in standardization_dict.items():
+        if col in df.columns:
+            df[col] = df[col].astype(str).str.strip().str.title()
+            df[col] = df[col].replace(standard_values)
+    if CITY_COL in df.columns:
+        df[CITY_COL] = df[CITY_COL].apply(lambda x: standardize_city_name(x) if pd.notnull(x) else x)
+    return df
+
+
+class RowwiseDataStandardizer(DataStandardizer):
+    """Reference DataStandardizer that applies each rule row by row, as before apply_unique"""
+
+    def apply_unique(self, series, func):
+        return series.apply(func)
+
+
+def make_frame(rows, seed=42):
+    """Build a frame with messy city, course and period answers (about 1% missing)"""
+    rng = np.random.default_rng(seed)
+    data = {}
+    for col, values in ((CITY_COL, CITIES), (COURSE_COL, COURSES), (PERIOD_COL, PERIODS)):
+        column = np.array(values, dtype=object)[rng.integers(0, len(values), rows)]
+        column[rng.random(rows) < 0.01] = np.nan
+        data[col] = column
+    return pd.DataFrame(data)
+
+
+def timed(func, df):
+    start = time.perf_counter()
+    result = func(df)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000, help='number of rows (default: 1000000)')
+    args = parser.parse_args()
+
+    # The standardization logs unique values and top cities; keep the output readable
+    logging.disable(logging.INFO)
+
+    df = make_frame(args.rows)
+    expected, old_time = timed(standardize_values_rowwise, df.copy())
+    result, new_time = timed(standardize_values, df.copy())
+
+    for col in df.columns:
+        pd.testing.assert_series_equal(result[col], expected[col])
+
+    expected_ds, old_ds_time = timed(RowwiseDataStandardizer().standardize_dataframe, df)
+    result_ds, new_ds_time = timed(DataStandardizer().standardize_dataframe, df)
+
+    for col in df.columns:
+        pd.testing.assert_series_equal(result_ds[col], expected_ds[col])
+
+    print(f"rows:                {args.rows}")
+    print("standardize_values")
+    print(f"  per-row (before):    {old_time:.3f}s")
+    print(f"  unique-values (now): {new_time:.3f}s")
+    print(f"  speedup:             {old_time / new_time:.1f}x (identical output)")
+    print("DataStandardizer.standardize_dataframe")
+    print(f"  per-row (before):    {old_ds_time:.3f}s")
+    print(f"  unique-values (now): {new_ds_time:.3f}s")
+    print(f"  speedup:             {old_ds_time / new_ds_time:.1f}x (identical output)")
+
+
+if __name__ == '__main__':
+    main()
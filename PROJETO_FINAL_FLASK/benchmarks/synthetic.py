@@ -0,0 +1,194 @@
+"""
+Gerador de respostas sintéticas do questionário socioeconômico
+
+Gera qualquer quantidade de respostas com o mesmo cabeçalho do formulário
+(benchmarks/colunas.csv, cópia fixa do cabeçalho da exportação, que não
+depende da base salva em database/) e alternativas sorteadas das listas de
+arquivos_de_trabalho/Perguntas e Alternativas.txt (declaradas em
+schema.json). Cada pergunta recebe uma distribuição própria e uma parte
+das respostas vem com grafia variada (maiúsculas, espaços), como nas
+planilhas reais.
+
+Uso (a partir da pasta PROJETO_FINAL_FLASK):
+    python benchmarks/synthetic.py --rows 10000 --output uploads/sintetico-10k.xlsx
+"""
+import os
+import sys
+import argparse
+import datetime
+
+import numpy as np
+import pandas as pd
+import openpyxl
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fatec_comum.schema import question_categories, get_schema  # noqa: E402
+
+# Cabeçalho da exportação do formulário (database/colunas.csv é apagado junto com a base)
+COLUMNS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'colunas.csv')
+
+# Perguntas de múltipla escolha (respostas separadas por ';', como o formulário exporta)
+MULTI_SELECT = {
+    question.header: question.options
+    for question in get_schema().questions.values()
+    if question.dtype == 'multi_select'
+}
+
+# Colunas com grafia variada nas planilhas reais (exercitam a padronização)
+MESSY_COLUMNS = ['Qual o seu curso?', 'Em qual cidade você reside?']
+
+FIRST_NAMES = [
+    'Ana', 'Bruno', 'Carla', 'Daniel', 'Eduarda', 'Felipe', 'Gabriela', 'Henrique', 'Isabela', 'João',
+    'Larissa', 'Lucas', 'Mariana', 'Matheus', 'Natália', 'Pedro', 'Rafaela', 'Rodrigo', 'Sofia', 'Vinícius'
+]
+LAST_NAMES = [
+    'Silva', 'Souza', 'Oliveira', 'Santos', 'Pereira', 'Costa', 'Rodrigues', 'Almeida', 'Nascimento', 'Lima',
+    'Araújo', 'Fernandes', 'Carvalho', 'Gomes', 'Martins', 'Rocha', 'Ribeiro', 'Alves', 'Monteiro', 'Barbosa'
+]
+COMPANIES = [
+    'Não trabalho', 'Calçados Franca Ltda', 'Prefeitura Municipal', 'Supermercado Central', 'Softpool Sistemas',
+    'Banco do Brasil', 'Magazine Luiza', 'Autônomo', 'Indústria de Couros', 'Escritório Contábil'
+]
+STORY_WORDS = [
+    'sempre', 'sonho', 'trabalhar', 'tecnologia', 'família', 'carreira', 'estudar', 'empresa', 'formar',
+    'desenvolvimento', 'sistemas', 'futuro', 'conquistar', 'profissional', 'faculdade', 'aprender', 'viajar',
+    'crescer', 'área', 'programação', 'meu', 'minha', 'quero', 'ter', 'uma', 'ser', 'em', 'de', 'e', 'para'
+]
+
+
+def load_columns(path=COLUMNS_FILE):
+    """Header of the questionnaire export, in file order"""
+    return pd.read_csv(path, nrows=0).columns.tolist()
+
+
+def _weights(rng, size):
+    """Random skewed distribution over size options"""
+    return rng.dirichlet(np.full(size, 0.8))
+
+
+def _choice(rng, options, rows):
+    options = np.array(options, dtype=object)
+    return options[rng.choice(len(options), size=rows, p=_weights(rng, len(options)))]
+
+
+def _messy(rng, values):
+    """Rewrite a share of the answers in upper/lower case or with extra spaces"""
+    values = values.copy()
+    kind = rng.integers(0, 20, len(values))
+    for code, transform in ((0, str.upper), (1, str.lower), (2, lambda v: f" {v} ")):
+        selected = kind == code
+        values[selected] = [transform(v) for v in values[selected]]
+    return values
+
+
+def _multi_select(rng, options, rows):
+    """Join a random subset of the options for each row ('a;b;')"""
+    chosen = rng.random((rows, len(options))) < rng.uniform(0.1, 0.5, len(options))
+    chosen[~chosen.any(axis=1), 0] = True
+    # Each combination is formatted once and mapped back by its bit code
+    codes = chosen.astype(np.int64) @ (1 << np.arange(len(options), dtype=np.int64))
+    combos, inverse = np.unique(codes, return_inverse=True)
+    labels = np.array([
+        ''.join(f"{option};" for i, option in enumerate(options) if combo >> i & 1) for combo in combos
+    ], dtype=object)
+    return labels[inverse]
+
+
+def _pool(rng, rows, size, make):
+    """Sample rows values from a pool of size generated values"""
+    pool = np.array([make(i) for i in range(size)], dtype=object)
+    return pool[rng.integers(0, size, rows)]
+
+
+def generate_responses(rows, seed=0, columns=None):
+    """
+    Generate synthetic questionnaire responses
+
+    Args:
+        rows (int): Number of responses
+        seed (int): Random seed (same seed, same data)
+        columns (list): Header to fill (benchmarks/colunas.csv if None)
+
+    Returns:
+        pd.DataFrame: Responses with the export header; date columns hold
+        datetimes and every other answer is a string (None when empty)
+    """
+    rng = np.random.default_rng(seed)
+    columns = columns or load_columns()
+    categories = question_categories(columns)
+    data = {}
+
+    start = pd.Timestamp('2025-03-01') + pd.to_timedelta(rng.integers(0, 30 * 24 * 3600, rows), unit='s')
+    birth = pd.Timestamp('1970-01-01') + pd.to_timedelta(rng.integers(0, 37 * 365, rows), unit='D')
+    names = _pool(rng, rows, 4000, lambda i: f"{FIRST_NAMES[i % 20]} {LAST_NAMES[i // 20 % 20]} {LAST_NAMES[i // 400 % 20]}")
+
+    for col in columns:
+        if col == 'ID':
+            values = np.arange(1, rows + 1).astype(str).astype(object)
+        elif col == 'Hora de início':
+            values = start.to_pydatetime()
+        elif col == 'Hora de conclusão':
+            values = (start + pd.to_timedelta(rng.integers(180, 1200, rows), unit='s')).to_pydatetime()
+        elif col == 'Nome':
+            values = np.array([name.upper() for name in names], dtype=object)
+        elif col == 'Email':
+            values = np.array([
+                f"{name.split()[0].lower()}.{name.split()[-1].lower()}{i % 100}@fatec.sp.gov.br"
+                for i, name in enumerate(names)
+            ], dtype=object)
+        elif col == 'Informe o número do seu RA:':
+            values = rng.integers(10**12, 10**13 - 1, rows).astype(str).astype(object)
+        elif col == 'Qual a sua data de nascimento?':
+            values = birth.to_pydatetime()
+        elif col == 'Quantas pessoas, incluindo você, moram no seu domicílio?':
+            values = _choice(rng, [str(i) for i in range(1, 10)], rows)
+        elif col == 'Em qual empresa você está atualmente contratado?':
+            values = _choice(rng, COMPANIES, rows)
+        elif col == 'Escreva algumas linhas sobre sua história e seus sonhos de vida':
+            values = _pool(rng, rows, 2000, lambda i: ' '.join(rng.choice(STORY_WORDS, rng.integers(8, 40))).capitalize())
+        elif col in MULTI_SELECT:
+            values = _multi_select(rng, MULTI_SELECT[col], rows)
+        elif col in categories:
+            values = _choice(rng, categories[col], rows)
+            if col in MESSY_COLUMNS:
+                values = _messy(rng, values)
+        else:
+            # Pontos/Comentários e demais colunas que o formulário exporta vazias
+            values = np.full(rows, None, dtype=object)
+        data[col] = values
+
+    return pd.DataFrame(data, columns=columns, dtype=object)
+
+
+def write_excel(df, path):
+    """
+    Write responses to an .xlsx file with a streaming (write-only) workbook
+
+    Args:
+        df (pd.DataFrame): Responses from generate_responses
+        path (str): Destination path
+    """
+    workbook = openpyxl.Workbook(write_only=True)
+    worksheet = workbook.create_sheet('Sheet1')
+    worksheet.append(list(df.columns))
+    for row in df.itertuples(index=False, name=None):
+        worksheet.append([value if not isinstance(value, datetime.datetime) else value.replace(microsecond=0)
+                          for value in row])
+    workbook.save(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10_000, help='number of responses (default: 10000)')
+    parser.add_argument('--seed', type=int, default=0, help='random seed (default: 0)')
+    parser.add_argument('--output', required=True, help='destination .xlsx file')
+    args = parser.parse_args()
+
+    df = generate_responses(args.rows, args.seed)
+    write_excel(df, args.output)
+    print(f"{len(df)} responses written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
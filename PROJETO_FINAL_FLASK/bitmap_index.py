@@ -0,0 +1,274 @@
+import re
+import logging
+
+import numpy as np
+import pandas as pd
+
+from fatec_comum.schema import question_column
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Colunas que podem ser usadas como filtro no dashboard (parâmetro -> id da pergunta em schema.json)
+FILTER_COLUMNS = {
+    'curso': 'curso',
+    'periodo': 'periodo',
+    'genero': 'genero',
+    'cidade': 'cidade',
+    'estado_civil': 'estado_civil',
+    'trabalha': 'trabalha'
+}
+
+# Número de bits ligados em cada byte, usado para contar linhas de um bitmap
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def popcount(bitmap):
+    """Count the set bits of a packed bitmap"""
+    return int(_POPCOUNT[bitmap].sum(dtype=np.int64))
+
+
+def match_values(values, query):
+    """
+    Match a filter query string against the values of a column
+
+    An exact match wins; otherwise the comparison ignores case and also
+    accepts a word of the value (e.g. 'ADS' matches 'Análise E
+    Desenvolvimento De Sistemas (Ads)').
+
+    Args:
+        values (list): Distinct values of the column
+        query (str): Value typed in the filter
+
+    Returns:
+        list: Matching values (empty if none)
+    """
+    if query in values:
+        return [query]
+    query = query.strip().lower()
+    matches = [v for v in values if str(v).strip().lower() == query]
+    if not matches:
+        matches = [v for v in values if query in re.findall(r'\w+', str(v).lower())]
+    return matches
+
+
+class BitmapIndex:
+    """
+    Bitmap index over the categorical filter columns of the dataset
+
+    For every distinct value of a filter column the index keeps a packed
+    bitmap (one bit per row, np.packbits). A filter such as
+    curso=ADS & periodo=Noturno is resolved with a bitwise OR inside each
+    column and a bitwise AND across columns, and counts come from the
+    number of set bits, without scanning the DataFrame.
+    """
+
+    def __init__(self, df, filter_columns=FILTER_COLUMNS):
+        """
+        Args:
+            df (pd.DataFrame): DataFrame with data
+            filter_columns (dict): Filter name -> question id (see schema.question_column)
+        """
+        self.n_rows = len(df)
+        self.columns = {}
+        self._bitmaps = {}
+        self._codes = {}
+        self._ordered = set()
+
+        for name, question_id in filter_columns.items():
+            column = question_column(df.columns, question_id)
+            if column is None:
+                continue
+            self.columns[name] = column
+            self._bitmaps[column] = self._build_bitmaps(df[column])
+            if isinstance(df[column].dtype, pd.CategoricalDtype):
+                self._ordered.add(column)
+
+        logger.info(f"Bitmap index built for {len(self.columns)} columns and {self.n_rows} rows")
+
+    @staticmethod
+    def _factorize(series):
+        """Codes and values of a column; categoricals keep their category order"""
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            return np.asarray(series.cat.codes), series.cat.categories
+        return pd.factorize(series)
+
+    def _build_bitmaps(self, series):
+        """Build one packed bitmap per distinct (non-missing) value of a column"""
+        codes, uniques = self._factorize(series)
+        bitmaps = {}
+        for code, value in enumerate(uniques):
+            bitmaps[value] = np.packbits(codes == code)
+        return bitmaps
+
+    @property
+    def nbytes(self):
+        """Memory of the value bitmaps and of the column codes kept by value_counts"""
+        bitmaps = sum(bitmap.nbytes for bitmaps in self._bitmaps.values() for bitmap in bitmaps.values())
+        codes = sum(
+            codes.nbytes + int(pd.Index(uniques).memory_usage(deep=True)) for codes, uniques in list(self._codes.values())
+        )
+        return bitmaps + codes
+
+    def all_rows(self):
+        """Bitmap with every row set"""
+        return np.packbits(np.ones(self.n_rows, dtype=bool))
+
+    def values(self, name):
+        """Distinct values of a filter, most frequent first"""
+        bitmaps = self._bitmaps[self.columns[name]]
+        counts = {value: popcount(bitmap) for value, bitmap in bitmaps.items()}
+        return sorted((value for value in counts if counts[value]), key=lambda value: -counts[value])
+
+    def resolve_values(self, name, query):
+        """
+        Match a query string against the values of a filter (see match_values)
+
+        Returns:
+            list: Matching values (empty if none)
+        """
+        return match_values(list(self._bitmaps[self.columns[name]]), query)
+
+    def filter(self, filters):
+        """
+        Intersect the bitmaps selected by a set of filters
+
+        Args:
+            filters (dict): Filter name -> list of query strings (OR within a filter)
+
+        Returns:
+            np.ndarray: Packed bitmap of the matching rows
+        """
+        result = self.all_rows()
+        for name, queries in filters.items():
+            column_bitmaps = self._bitmaps[self.columns[name]]
+            selected = np.zeros_like(result)
+            for query in queries:
+                for value in self.resolve_values(name, query):
+                    selected |= column_bitmaps[value]
+            result &= selected
+        return result
+
+    def row_mask(self, bitmap):
+        """Unpack a bitmap into a boolean mask with one entry per row"""
+        return np.unpackbits(bitmap, count=self.n_rows).astype(bool)
+
+    def is_indexed(self, column):
+        """Check if a column has value bitmaps"""
+        return column in self._bitmaps
+
+    def _first_row(self, bitmap):
+        """Position of the first set bit of a bitmap (n_rows if none)"""
+        nonzero = np.flatnonzero(bitmap)
+        if len(nonzero) == 0:
+            return self.n_rows
+        byte = int(nonzero[0])
+        return byte * 8 + 8 - int(bitmap[byte]).bit_length()
+
+    def _column_codes(self, column, series, strip):
+        """
+        Factorize a non-indexed column once (codes are kept for later calls)
+
+        Returns:
+            tuple: (codes, uniques) with -1 for missing values
+        """
+        key = (column, strip)
+        if key not in self._codes:
+            codes, uniques = self._factorize(series)
+            # Same rule as visualization.standardize_series: only object columns are stripped
+            if strip and series.dtype == object:
+                # Merge values that only differ by whitespace, touching only the distinct values
+                stripped_codes, uniques = pd.factorize(pd.Index(uniques).astype(str).str.strip())
+                codes = np.where(codes >= 0, stripped_codes[codes], -1)
+            self._codes[key] = (codes, uniques)
+        return self._codes[key]
+
+    def value_counts(self, column, bitmap, series=None, strip=True):
+        """
+        Count the values of a column inside a bitmap
+
+        Indexed columns are counted by intersecting each value bitmap with
+        the filter bitmap. Other columns are factorized once and counted
+        with a bincount over the filtered rows. As in Series.value_counts,
+        ties keep the order in which the values first appear (the category
+        order for categorical columns).
+
+        Args:
+            column (str): Column name
+            bitmap (np.ndarray): Packed bitmap of the selected rows
+            series (pd.Series): Column data, needed for non-indexed columns
+            strip (bool): If True, values of object columns that differ only by
+                surrounding whitespace are counted together (non-indexed columns)
+
+        Returns:
+            pd.Series: Counts per value, most frequent first
+        """
+        categorical = series is not None and isinstance(series.dtype, pd.CategoricalDtype)
+        if self.is_indexed(column):
+            values, counts, first = [], [], []
+            for value, value_bitmap in self._bitmaps[column].items():
+                selected = value_bitmap & bitmap
+                values.append(value)
+                counts.append(popcount(selected))
+                first.append(self._first_row(selected))
+            counts = np.array(counts, dtype=np.int64)
+            first = np.array(first, dtype=np.int64)
+        else:
+            codes, values = self._column_codes(column, series, strip)
+            selected = codes[self.row_mask(bitmap) & (codes >= 0)]
+            counts = np.bincount(selected, minlength=len(values))
+            first = np.full(len(values), len(selected), dtype=np.int64)
+            uniques, positions = np.unique(selected, return_index=True)
+            first[uniques] = positions
+
+        if categorical or column in self._ordered:
+            first = np.arange(len(values))
+
+        order = np.lexsort((first, -counts))
+        order = order[counts[order] > 0]
+        result = pd.Series(counts[order], index=pd.Index(np.asarray(values, dtype=object)[order], name=column), name='count')
+        return result
+
+
+class FilteredFrame:
+    """
+    Read-only view of the rows of a DataFrame selected by a bitmap
+
+    Exposes the parts of the DataFrame interface used by the chart
+    generators (columns, len, column access, boolean row selection) plus
+    column_counts(), which the chart builders use to get value counts
+    straight from the bitmap index.
+    """
+
+    def __init__(self, df, index, bitmap):
+        self._df = df
+        self.index = index
+        self.bitmap = bitmap
+        self._mask = None
+
+    @property
+    def columns(self):
+        return self._df.columns
+
+    @property
+    def mask(self):
+        if self._mask is None:
+            self._mask = self.index.row_mask(self.bitmap)
+        return self._mask
+
+    def __len__(self):
+        return popcount(self.bitmap)
+
+    @property
+    def empty(self):
+        return len(self) == 0
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self._df[key][self.mask]
+        # Boolean selection or list of columns: materialize the filtered rows
+        return self._df[self.mask][key]
+
+    def column_counts(self, column, standardize=True):
+        """Value counts of a column restricted to the filtered rows"""
+        return self.index.value_counts(column, self.bitmap, self._df[column], strip=standardize)
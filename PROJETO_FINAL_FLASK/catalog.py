@@ -0,0 +1,167 @@
+import os
+import re
+import json
+import time
+import shutil
+import logging
+import threading
+
+from storage import DATABASE_FOLDER
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Arquivo do catálogo de bases e pasta das bases além da principal
+CATALOG_FILE = 'catalog.json'
+DATASETS_FOLDER = 'datasets'
+
+# Base que ocupa a própria pasta database/ (a única antes do catálogo existir)
+DEFAULT_DATASET = 'default'
+
+# Formato dos ids das bases (usados nas URLs e nos nomes de pasta) e dos semestres (ex.: 2025-1)
+DATASET_ID_PATTERN = re.compile(r'^[a-z0-9][a-z0-9_-]{0,63}$')
+TERM_PATTERN = re.compile(r'^\d{4}-[12]$')
+
+
+def _check_edition(campus, term):
+    """Raise ValueError if the campus is blank or the term is not like 2025-1"""
+    if not TERM_PATTERN.match(term or ''):
+        raise ValueError(f"Semestre inválido (use AAAA-1 ou AAAA-2): {term}")
+    if not (campus or '').strip():
+        raise ValueError("Informe o campus da base")
+
+
+class DatasetCatalog:
+    """
+    Catalog of the stored survey editions (one dataset per campus and term)
+
+    Each entry records the dataset id, campus, term, storage folder, row
+    count and the schema version it was ingested with. The 'default' entry
+    is the dataset in the database folder itself, so trees written before
+    the catalog existed keep working; other datasets get their own folder
+    under database/datasets/<id>, with the same layout (snapshots, cube,
+    chart cache). The catalog file is small and rewritten atomically on
+    every change.
+    """
+
+    def __init__(self, database_folder=DATABASE_FOLDER):
+        """
+        Args:
+            database_folder (str): Folder with the default dataset and the catalog file
+        """
+        self.database_folder = database_folder
+        self.path = os.path.join(database_folder, CATALOG_FILE)
+        self._lock = threading.Lock()
+
+    def _default_entry(self):
+        return {
+            'id': DEFAULT_DATASET, 'campus': None, 'term': None, 'path': self.database_folder,
+            'rows': None, 'schema_version': None, 'created_at': None
+        }
+
+    def _read(self):
+        """Entries by id (only the default entry if the file does not exist)"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                entries = {entry['id']: entry for entry in json.load(f).get('datasets', [])}
+        except FileNotFoundError:
+            entries = {}
+        entries.setdefault(DEFAULT_DATASET, self._default_entry())
+        return entries
+
+    def _write(self, entries):
+        os.makedirs(self.database_folder, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'datasets': list(entries.values())}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def list(self):
+        """
+        Return every dataset of the catalog
+
+        Returns:
+            list: Entries ordered by campus and term (default first)
+        """
+        return sorted(
+            self._read().values(),
+            key=lambda entry: (entry['id'] != DEFAULT_DATASET, entry['campus'] or '', entry['term'] or '', entry['id'])
+        )
+
+    def get(self, dataset_id):
+        """Entry of a dataset, or None if it is not in the catalog"""
+        return self._read().get(dataset_id)
+
+    def register(self, dataset_id, campus, term):
+        """
+        Add a dataset to the catalog
+
+        Args:
+            dataset_id (str): Id used in the URLs (lowercase letters, digits, '-' and '_')
+            campus (str): Campus where the survey was answered
+            term (str): Term of the survey edition (e.g. '2025-1')
+
+        Returns:
+            dict: New entry
+
+        Raises:
+            ValueError: If the id or term is invalid or the id is taken
+        """
+        if not DATASET_ID_PATTERN.match(dataset_id or ''):
+            raise ValueError(f"Id de base inválido: {dataset_id}")
+        _check_edition(campus, term)
+
+        with self._lock:
+            entries = self._read()
+            if dataset_id in entries:
+                raise ValueError(f"Já existe uma base com o id {dataset_id}")
+            entry = {
+                'id': dataset_id, 'campus': campus.strip(), 'term': term,
+                'path': os.path.join(self.database_folder, DATASETS_FOLDER, dataset_id),
+                'rows': 0, 'schema_version': None, 'created_at': time.strftime('%Y-%m-%dT%H:%M:%S')
+            }
+            os.makedirs(entry['path'], exist_ok=True)
+            entries[dataset_id] = entry
+            self._write(entries)
+        logger.info(f"Dataset {dataset_id} registered ({entry['campus']}, {term})")
+        return entry
+
+    def update(self, dataset_id, **fields):
+        """
+        Change fields of an entry (e.g. rows and schema_version after an upload)
+
+        Returns:
+            dict: Updated entry
+
+        Raises:
+            KeyError: If the dataset is not in the catalog
+            ValueError: If a new campus or term is invalid
+        """
+        with self._lock:
+            entries = self._read()
+            entry = entries[dataset_id]
+            if 'campus' in fields or 'term' in fields:
+                fields['campus'] = (fields.get('campus', entry['campus']) or '').strip()
+                _check_edition(fields['campus'], fields.get('term', entry['term']))
+            entry.update({name: value for name, value in fields.items() if name not in ('id', 'path')})
+            self._write(entries)
+        return entry
+
+    def remove(self, dataset_id):
+        """
+        Remove a dataset and its folder from the catalog
+
+        The default dataset cannot be removed (clear its data instead).
+
+        Raises:
+            ValueError: If dataset_id is the default dataset
+            KeyError: If the dataset is not in the catalog
+        """
+        if dataset_id == DEFAULT_DATASET:
+            raise ValueError("A base principal não pode ser removida do catálogo")
+        with self._lock:
+            entries = self._read()
+            entry = entries.pop(dataset_id)
+            self._write(entries)
+        shutil.rmtree(entry['path'], ignore_errors=True)
+        logger.info(f"Dataset {dataset_id} removed")
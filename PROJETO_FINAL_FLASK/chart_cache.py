@@ -0,0 +1,209 @@
+import os
+import json
+import hashlib
+import logging
+import datetime
+import threading
+
+import numpy as np
+import pandas as pd
+
+from storage import DATABASE_FOLDER, dataset_path, current_version
+from metrics import PAYLOAD_BYTES, SERIALIZED_BYTES
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Pasta com os gráficos pré-calculados de cada seção
+CHARTS_FOLDER = 'charts'
+MANIFEST_FILE = 'manifest.json'
+
+# Incrementar quando a estrutura dos gráficos mudar, invalidando os arquivos salvos
+CHARTS_VERSION = 8
+
+_write_lock = threading.Lock()
+
+
+def charts_folder(database_folder=DATABASE_FOLDER):
+    """Return the folder where section payloads are stored"""
+    return os.path.join(database_folder, CHARTS_FOLDER)
+
+
+def json_default(obj):
+    """Convert numpy/pandas values that the json module cannot serialize"""
+    if isinstance(obj, np.integer):
+        return int(obj)
+    if isinstance(obj, np.floating):
+        return None if np.isnan(obj) else float(obj)
+    if isinstance(obj, np.bool_):
+        return bool(obj)
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, (pd.Timestamp, datetime.datetime, datetime.date)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def serialize_charts(charts, section=None):
+    """
+    Serialize a section payload to JSON bytes
+
+    Args:
+        charts (dict): Dictionary with chart configurations
+        section (str): Section name, used to label the size metrics
+
+    Returns:
+        tuple: (bytes, etag) where etag is a hash of the bytes
+    """
+    data = json.dumps(charts, ensure_ascii=False, default=json_default).encode('utf-8')
+    if section is not None:
+        PAYLOAD_BYTES.observe(len(data), section=section)
+        SERIALIZED_BYTES.inc(len(data), section=section)
+    return data, hashlib.sha1(data).hexdigest()
+
+
+def dataset_signature(database_folder=DATABASE_FOLDER):
+    """
+    Return a cheap signature of the stored dataset (snapshot, mtime and size)
+
+    Returns:
+        dict: Signature, or None if there is no dataset
+    """
+    version = current_version(database_folder)
+    try:
+        st = os.stat(dataset_path(database_folder, version))
+    except FileNotFoundError:
+        return None
+    return {'snapshot': version, 'mtime_ns': st.st_mtime_ns, 'size': st.st_size}
+
+
+def _read_manifest(database_folder):
+    path = os.path.join(charts_folder(database_folder), MANIFEST_FILE)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _write_atomic(path, data):
+    """Write bytes to a temporary file and move it over the destination"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _is_current(manifest, signature):
+    return (
+        manifest is not None
+        and signature is not None
+        and manifest.get('version') == CHARTS_VERSION
+        and manifest.get('dataset') == signature
+    )
+
+
+def store_section(section, data, etag, signature, database_folder=DATABASE_FOLDER):
+    """
+    Persist one section payload and register it in the manifest
+
+    Args:
+        section (str): Section name
+        data (bytes): Serialized payload
+        etag (str): Hash of the payload
+        signature (dict): Signature of the dataset the payload was built from
+        database_folder (str): Folder where the dataset is stored
+    """
+    folder = charts_folder(database_folder)
+    with _write_lock:
+        os.makedirs(folder, exist_ok=True)
+        manifest = _read_manifest(database_folder)
+        if not _is_current(manifest, signature):
+            manifest = {
+                'version': CHARTS_VERSION,
+                'dataset': signature,
+                'generated_at': datetime.datetime.now().isoformat(timespec='seconds'),
+                'sections': {}
+            }
+
+        filename = f"{section}.json"
+        _write_atomic(os.path.join(folder, filename), data)
+        manifest['sections'][section] = {'file': filename, 'etag': etag, 'bytes': len(data)}
+        _write_atomic(
+            os.path.join(folder, MANIFEST_FILE),
+            json.dumps(manifest, ensure_ascii=False, indent=4).encode('utf-8')
+        )
+
+
+def precompute_charts(df, generators, database_folder=DATABASE_FOLDER, progress=None):
+    """
+    Render every section once and persist the payloads
+
+    Args:
+        df (pd.DataFrame): DataFrame with data
+        generators (dict): Section name -> chart generator function
+        database_folder (str): Folder where the dataset is stored
+        progress (callable): Optional progress(done, total) callback, called
+            after each section
+
+    Returns:
+        dict: Section name -> etag of the stored payload
+    """
+    signature = dataset_signature(database_folder)
+    if signature is None:
+        logger.warning("No dataset found, skipping chart precomputation")
+        return {}
+    if df.attrs.get('snapshot', signature['snapshot']) != signature['snapshot']:
+        logger.warning("Dataset changed since it was loaded, skipping chart precomputation")
+        return {}
+
+    etags = {}
+    for done, (section, generator) in enumerate(generators.items(), start=1):
+        try:
+            data, etag = serialize_charts(generator(df), section)
+        except Exception as e:
+            logger.error(f"Error precomputing charts for {section}: {str(e)}")
+        else:
+            store_section(section, data, etag, signature, database_folder)
+            etags[section] = etag
+        if progress is not None:
+            progress(done, len(generators))
+
+    logger.info(f"Precomputed charts for {len(etags)} sections")
+    return etags
+
+
+def load_section(section, database_folder=DATABASE_FOLDER):
+    """
+    Return the stored payload of a section if it matches the current dataset
+
+    Args:
+        section (str): Section name
+        database_folder (str): Folder where the dataset is stored
+
+    Returns:
+        tuple: (bytes, etag), or None if the payload is missing or stale
+    """
+    manifest = _read_manifest(database_folder)
+    if not _is_current(manifest, dataset_signature(database_folder)):
+        return None
+
+    entry = manifest['sections'].get(section)
+    if entry is None:
+        return None
+
+    try:
+        with open(os.path.join(charts_folder(database_folder), entry['file']), 'rb') as f:
+            return f.read(), entry['etag']
+    except FileNotFoundError:
+        return None
+
+
+def clear_charts(database_folder=DATABASE_FOLDER):
+    """Remove every stored section payload"""
+    folder = charts_folder(database_folder)
+    with _write_lock:
+        if not os.path.isdir(folder):
+            return
+        for filename in os.listdir(folder):
+            os.remove(os.path.join(folder, filename))
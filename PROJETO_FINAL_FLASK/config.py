@@ -12,7 +12,14 @@ class Config:
     # Upload configuration
     UPLOAD_FOLDER = os.path.join(os.getcwd(), 'uploads')
     DATABASE_FOLDER = os.path.join(os.getcwd(), 'database')
-    MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max upload size
+    # Uploads are ingested in batches with flat memory, so large workbooks are accepted
+    MAX_CONTENT_LENGTH = int(os.environ.get('MAX_UPLOAD_MB', 512)) * 1024 * 1024  # 512MB max upload size
+    
+    # Uploads processed at the same time by the background job pool
+    JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 1))
+    
+    # Memory for the loaded datasets of the catalog; the least recently used ones are evicted past it
+    DATASET_MEMORY_MB = int(os.environ.get('DATASET_MEMORY_MB', 1024))
     
     # Ensure directories exist
     @staticmethod
@@ -6,6 +6,16 @@ import datetime
 import os
 import logging
 import re
+import openpyxl
+from storage import (
+    DATABASE_FOLDER, DatasetWriter, write_dataset, read_dataset, read_dataset_metadata, dataset_exists, legacy_exists,
+    import_legacy_json, current_version, snapshot_folder, iter_dataset_batches, split_rows, read_dataset_columns
+)
+from aggregates import CountCube, cube_dimensions
+from text_index import TextIndex, TEXT_COLUMN
+from fatec_comum.ages import add_age_columns
+from fatec_comum.schema import question_categories, apply_categories, question_column, date_columns, parse_dates
+from metrics import timed, DATE_VALUES_COERCED
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -17,6 +27,48 @@ def create_directories():
     os.makedirs('./database', exist_ok=True)
     os.makedirs('./uploads', exist_ok=True)
 
+# Versão das regras de padronização gravada junto com os dados.
+# Incrementar sempre que standardize_values mudar e rodar a migração
+# (flask --app app migrate-standardization) para atualizar a base salva.
+STANDARDIZATION_VERSION = 1
+STANDARDIZATION_METADATA_KEY = 'standardization_version'
+
+# Função para aplicar uma transformação apenas aos valores distintos de uma coluna
+def map_unique_values(series, func):
+    """
+    Apply a Series transformation to the distinct values of a column only
+    
+    The column is factorized, func runs once over the unique values (missing
+    values included) and the results are mapped back through the integer
+    codes. Survey columns have a few hundred distinct values at most, so this
+    is much cheaper than transforming every row while giving the same output.
+    
+    Args:
+        series (pd.Series): Column to transform
+        func (callable): Function that receives and returns a pd.Series
+    
+    Returns:
+        pd.Series: Transformed column with the original index
+    """
+    codes, uniques = pd.factorize(series, use_na_sentinel=False)
+    mapped = func(pd.Series(uniques)).take(codes)
+    mapped.index = series.index
+    mapped.name = series.name
+    return mapped
+
+def _standardize_column_values(values, standard_values, is_city):
+    """Standardize the values of one column (title case, mapping and city names)"""
+    # First, normalize by title case and remove excess whitespace
+    values = values.astype(str).str.strip().str.title()
+    
+    # Then apply specific standardization
+    values = values.replace(standard_values)
+    
+    # General standardization for any city name
+    if is_city:
+        values = values.apply(lambda x: standardize_city_name(x) if pd.notnull(x) else x)
+    return values
+
 # Função para padronizar valores
 def standardize_values(df):
     """
@@ -57,36 +109,32 @@ def standardize_values(df):
         }
 
         # Log the dataframe before standardization
-        logger.info(f"DataFrame before standardization: {len(df)} rows")
+        logger.debug(f"DataFrame before standardization: {len(df)} rows")
+        
+        # For columns with city names, apply a more general standardization
+        city_columns = ['Em qual cidade você reside?']
         
         # Apply standardization to specified columns
         for col, standard_values in standardization_dict.items():
             if col in df.columns:
-                # First, normalize by title case and remove excess whitespace
-                df[col] = df[col].astype(str).str.strip().str.title()
-                
-                # Then apply specific standardization
-                df[col] = df[col].replace(standard_values)
+                # Normalize each distinct value once instead of every row
+                df[col] = map_unique_values(
+                    df[col],
+                    lambda values: _standardize_column_values(values, standard_values, col in city_columns)
+                )
                 
                 # Log the unique values for debugging
-                unique_vals = df[col].unique()
-                logger.info(f"Unique values for {col} after standardization: {unique_vals}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"Unique values for {col} after standardization: {df[col].unique()}")
         
-        # For columns with city names, apply a more general standardization
-        city_columns = ['Em qual cidade você reside?']
-        for col in city_columns:
-            if col in df.columns:
-                # General standardization for any city name
-                df[col] = df[col].apply(lambda x: standardize_city_name(x) if pd.notnull(x) else x)
-                
         # Log some stats after standardization
-        if 'Em qual cidade você reside?' in df.columns:
+        if logger.isEnabledFor(logging.DEBUG) and 'Em qual cidade você reside?' in df.columns:
             franca_count = (df['Em qual cidade você reside?'] == 'Franca').sum()
-            logger.info(f"Count of 'Franca' after standardization: {franca_count}")
+            logger.debug(f"Count of 'Franca' after standardization: {franca_count}")
             
             # Get top cities for debugging
             top_cities = df['Em qual cidade você reside?'].value_counts().head(10)
-            logger.info(f"Top cities: {top_cities.to_dict()}")
+            logger.debug(f"Top cities: {top_cities.to_dict()}")
         
         return df
     
@@ -119,96 +167,547 @@ def standardize_city_name(city_name):
     
     return ' '.join(result)
 
-# Função para processar o arquivo Excel enviado
-def process_excel_file(uploaded_file):
+# Número de linhas lidas, padronizadas e gravadas por vez durante a importação
+INGEST_BATCH_SIZE = 5000
+
+# Colunas que podem identificar uma resposta ao adicionar/atualizar respostas
+UPSERT_KEYS = {
+    'ID': 'ID',
+    'RA': 'Informe o número do seu RA:'
+}
+
+# Função para identificar as colunas de data
+def get_date_columns(columns):
+    """Return the date columns (questions declared as datetime in schema.json)"""
+    return list(date_columns(columns))
+
+# Função para converter as colunas de data
+def convert_date_columns(df, coerced=None):
     """
-    Process the uploaded Excel file and create the necessary files
+    Convert the declared date columns to datetime, parsed with their declared formats
+    
+    Values that match none of the formats of their column become NaT (see
+    schema.parse_dates); they are logged and counted in the metrics.
+    
+    Args:
+        df (pd.DataFrame): DataFrame with data
+        coerced (dict): Optional column -> count accumulator of the values
+            coerced to NaT (e.g. across the batches of an import)
+    
+    Returns:
+        pd.DataFrame: The same DataFrame
     """
-    try:
-        logger.info(f"Processing file: {uploaded_file}")
-        
-        # Read the Excel file
+    for col, formats in date_columns(df.columns).items():
+        df[col], count = parse_dates(df[col], formats)
+        if count:
+            logger.warning(f"{count} values of '{col}' match no declared date format and were stored as missing")
+            DATE_VALUES_COERCED.inc(count, column=col)
+            if coerced is not None:
+                coerced[col] = coerced.get(col, 0) + count
+    return df
+
+# Função para descrever as datas que não puderam ser lidas
+def coerced_dates_message(coerced):
+    """Message suffix with the number of unreadable dates per column ('' if none)"""
+    if not coerced:
+        return ""
+    details = ", ".join(f"{col}: {count}" for col, count in coerced.items())
+    return f" {sum(coerced.values())} datas fora do formato esperado ficaram vazias ({details})."
+
+def _cell_to_str(value):
+    """Convert an Excel cell value to the string pd.read_excel(dtype=str) would produce"""
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    value = str(value)
+    return value if value != '' else None
+
+def _unique_headers(header_row):
+    """Name empty headers and deduplicate repeated ones like pandas does"""
+    headers = []
+    seen = {}
+    for i, name in enumerate(header_row):
+        name = f"Unnamed: {i}" if name is None else str(name)
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        headers.append(name)
+    return headers
+
+# Função para ler o Excel em lotes
+def iter_excel_batches(uploaded_file, batch_size=INGEST_BATCH_SIZE):
+    """
+    Read an Excel file in batches of rows with bounded memory
+    
+    .xlsx files are streamed with a read-only openpyxl workbook, so only one
+    batch is held in memory at a time. Other formats (.xls) are read whole
+    by pandas and then split into batches.
+    
+    Args:
+        uploaded_file (str): Path of the Excel file
+        batch_size (int): Number of rows per batch
+    
+    Yields:
+        pd.DataFrame: Batch of rows with every value as a string (or None)
+    """
+    if not str(uploaded_file).lower().endswith('.xlsx'):
         excel_data = pd.read_excel(uploaded_file, dtype=str)
+        for start in range(0, len(excel_data), batch_size):
+            yield excel_data.iloc[start:start + batch_size].reset_index(drop=True)
+        return
+    
+    workbook = openpyxl.load_workbook(uploaded_file, read_only=True, data_only=True)
+    try:
+        worksheet = workbook.active
+        # Some exporters write a wrong sheet dimension, which truncates read-only iteration
+        worksheet.reset_dimensions()
+        rows = worksheet.iter_rows(values_only=True)
+        header_row = next(rows, None)
+        if header_row is None:
+            return
+        columns = _unique_headers(header_row)
         
-        # Standardize common values
-        excel_data = standardize_values(excel_data)
-        
-        # Convert to list of dictionaries (original structure)
-        json_data = excel_data.to_dict(orient='records')
-        
-        # Extract column names
-        columns = list(excel_data.columns)
+        batch = []
+        for row in rows:
+            values = [_cell_to_str(value) for value in row[:len(columns)]]
+            if not any(value is not None for value in values):
+                continue
+            values.extend([None] * (len(columns) - len(values)))
+            batch.append(values)
+            if len(batch) >= batch_size:
+                yield pd.DataFrame(batch, columns=columns, dtype=object)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=columns, dtype=object)
+    finally:
+        workbook.close()
+
+# Função para indexar as respostas abertas de um lote
+def _index_answers(text_index, batch):
+    """Add the open-ended answers of a batch (DataFrame or Arrow table) to the inverted index"""
+    columns = list(batch.columns) if isinstance(batch, pd.DataFrame) else batch.column_names
+    if 'ID' in columns and TEXT_COLUMN in columns:
+        if not isinstance(batch, pd.DataFrame):
+            batch = batch.select(['ID', TEXT_COLUMN]).to_pandas()
+        text_index.add(batch['ID'], batch[TEXT_COLUMN])
+
+# Função para gravar o cubo de contagens e o índice das respostas abertas junto com o snapshot
+def _snapshot_indexes(cube, text_index):
+    """
+    Callbacks that store the count cube and the inverted index with a snapshot
+    
+    Both are built along the written batches, so the file is never read
+    back. When the writer drops the rows of duplicated IDs (see
+    DatasetWriter.close), the dropped rows are removed from the cube and
+    the index is built again from the kept rows, one row group at a time.
+    
+    Args:
+        cube (CountCube): Counts of every written row
+        text_index (TextIndex): Index of every written row
+    
+    Returns:
+        tuple: (on_resolved, before_publish) callbacks for DatasetWriter.close
+    """
+    resolved_index = TextIndex(text_index.column)
+    
+    def on_resolved(kept, dropped):
+        if dropped.num_rows:
+            cube.remove(dropped.select([col for col in cube.columns if col in dropped.column_names]).to_pandas())
+        _index_answers(resolved_index, kept)
+    
+    def before_publish(writer):
+        cube.save(writer.staging_folder)
+        (resolved_index if writer.duplicates else text_index).save(writer.staging_folder)
+    
+    return on_resolved, before_publish
+
+# Função para gravar uma base já padronizada com o cubo de contagens e o índice das respostas abertas
+def write_standardized_dataset(df, database_folder=DATABASE_FOLDER):
+    """
+    Write a standardized DataFrame as a new snapshot
+    
+    The snapshot gets the same files as the ones published by an upload:
+    the data, the count cube and the inverted index of the open-ended answers.
+    
+    Args:
+        df (pd.DataFrame): Standardized rows, with native datetime columns
+        database_folder (str): Folder of the dataset
+    """
+    cube = CountCube(declared_categories(df.columns), cube_dimensions(df.columns))
+    cube.add(df)
+    text_index = TextIndex()
+    _index_answers(text_index, df)
+    on_resolved, save_indexes = _snapshot_indexes(cube, text_index)
+    
+    write_dataset(
+        df, database_folder, metadata={STANDARDIZATION_METADATA_KEY: STANDARDIZATION_VERSION},
+        before_publish=save_indexes, on_resolved=on_resolved
+    )
+
+# Função para processar o arquivo Excel enviado
+@timed('process_excel_file')
+def process_excel_file(uploaded_file, batch_size=INGEST_BATCH_SIZE, progress=None, mode='replace', key='ID',
+                       database_folder=DATABASE_FOLDER):
+    """
+    Process the uploaded Excel file and write the columnar dataset
+    
+    Rows are read, standardized and written in batches of batch_size, so
+    peak memory does not grow with the size of the workbook. The count
+    cube of the closed questions and the inverted index of the open-ended
+    answers are built batch by batch and stored with the dataset (see
+    aggregates.CountCube and text_index.TextIndex).
+    
+    Args:
+        uploaded_file (str): Path of the Excel file
+        batch_size (int): Number of rows per batch
+        progress (callable): Optional progress(stage, done, finished=False)
+            callback, called with the rows handled so far by the 'read',
+            'standardize' and 'write' stages
+        mode (str): 'replace' to replace the stored dataset, 'upsert' to
+            add the new responses and update the ones already stored
+        key (str): Column that identifies a response in upsert mode (a key
+            of UPSERT_KEYS)
+        database_folder (str): Folder of the dataset (see catalog.DatasetCatalog)
+    
+    Returns:
+        tuple: (success, message)
+    """
+    try:
+        logger.info(f"Processing file: {uploaded_file} (mode: {mode})")
         
         # Create necessary directories
         create_directories()
         
-        # Create the CSV file with headers
-        pd.DataFrame(columns=columns).to_csv('./database/colunas.csv', index=False, encoding='utf-8')
+        def report(stage, done, finished=False):
+            if progress is not None:
+                progress(stage, done, finished=finished)
         
-        # Create dictionary where the key is the ID and the value is the list of data in column order
-        resultado_json = {}
-        for item in json_data:
-            id_item = str(item.get('ID', ''))
-            if id_item:  # Only add if there's a valid ID
-                # Ensure all fields are present and in the correct order
-                dados = [item.get(coluna, '') for coluna in columns[1:]]
-                resultado_json[id_item] = dados
+        if mode == 'upsert':
+            ensure_dataset(database_folder)
+            if dataset_exists(database_folder):
+                return upsert_excel_file(uploaded_file, report, batch_size, key, database_folder)
+            logger.info("No stored dataset to update, importing the file as a new dataset")
         
-        # Save the result in a JSON file
-        with open('./database/dados.json', 'w', encoding='utf-8') as json_file:
-            json.dump(resultado_json, json_file, ensure_ascii=False, indent=4)
+        writer = None
+        cube = None
+        text_index = TextIndex()
+        coerced = {}
+        rows_read = 0
+        try:
+            for batch in iter_excel_batches(uploaded_file, batch_size):
+                rows_read += len(batch)
+                report('read', rows_read)
+                
+                # Standardize common values
+                batch = standardize_values(batch)
+                report('standardize', rows_read)
+                
+                # Only keep rows with a valid ID
+                if 'ID' in batch.columns:
+                    batch = batch[batch['ID'].notna() & (batch['ID'] != '')]
+                
+                # Store dates as native datetime columns
+                batch = convert_date_columns(batch, coerced)
+                
+                if writer is None:
+                    writer = DatasetWriter(
+                        list(batch.columns), get_date_columns(batch.columns), database_folder=database_folder,
+                        metadata={STANDARDIZATION_METADATA_KEY: STANDARDIZATION_VERSION}
+                    )
+                    cube = CountCube(declared_categories(batch.columns), cube_dimensions(batch.columns))
+                writer.write(batch)
+                cube.add(batch)
+                _index_answers(text_index, batch)
+                report('write', writer.rows)
+            
+            if writer is None:
+                return False, "Erro ao processar o arquivo: planilha sem dados"
+            
+            on_resolved, save_indexes = _snapshot_indexes(cube, text_index)
+            writer.close(before_publish=save_indexes, on_resolved=on_resolved)
+            report('read', rows_read, finished=True)
+            report('standardize', rows_read, finished=True)
+            report('write', writer.rows, finished=True)
+        except Exception:
+            if writer is not None:
+                writer.abort()
+            raise
         
-        logger.info("File processed successfully")
-        return True, "Arquivo processado com sucesso!"
+        logger.info(f"File processed successfully ({writer.rows} rows)")
+        return True, "Arquivo processado com sucesso!" + coerced_dates_message(coerced)
     
     except Exception as e:
         logger.error(f"Error processing file: {str(e)}")
         return False, f"Erro ao processar o arquivo: {str(e)}"
 
-def load_data():
+# Função para adicionar/atualizar respostas na base salva
+def upsert_excel_file(uploaded_file, report, batch_size=INGEST_BATCH_SIZE, key='ID', database_folder=DATABASE_FOLDER):
     """
-    Load processed data from CSV and JSON files
+    Merge the responses of an Excel file into the stored dataset
+    
+    Responses whose key is already stored replace the stored row and the
+    others are appended. Only the new file is standardized: stored rows are
+    copied in Arrow batches into the new snapshot, and the stored count
+    cube is updated by removing the replaced rows and adding the new ones.
+    Responses without a key are ignored (and counted in the message), and
+    the upload is rejected if a new response takes the ID of a stored
+    response with another key.
+    The inverted index of the open-ended answers is built again along the
+    copied batches and the new responses. The new responses are held in
+    memory, which suits the small late-response files this mode is meant for.
+    
+    Args:
+        uploaded_file (str): Path of the Excel file
+        report (callable): report(stage, done, finished=False) progress callback
+        batch_size (int): Number of rows per batch
+        key (str): Key of UPSERT_KEYS that identifies a response
+        database_folder (str): Folder of the dataset
+    
+    Returns:
+        tuple: (success, message)
     """
+    if key not in UPSERT_KEYS:
+        return False, f"Chave desconhecida: {key}"
+    key_column = UPSERT_KEYS[key]
+    
+    snapshot = current_version(database_folder)
+    if stored_standardization_version(snapshot, database_folder) != STANDARDIZATION_VERSION:
+        return False, (
+            "A base salva usa outra versão da padronização; "
+            "rode 'flask --app app migrate-standardization' antes de adicionar respostas"
+        )
+    
+    batches = []
+    coerced = {}
+    rows_read = 0
+    discarded = 0
+    for batch in iter_excel_batches(uploaded_file, batch_size):
+        rows_read += len(batch)
+        report('read', rows_read)
+        batch = standardize_values(batch)
+        report('standardize', rows_read)
+        if 'ID' in batch.columns:
+            with_id = batch['ID'].notna() & (batch['ID'] != '')
+            discarded += int((~with_id).sum())
+            batch = batch[with_id]
+        batches.append(convert_date_columns(batch, coerced))
+    report('read', rows_read, finished=True)
+    report('standardize', rows_read, finished=True)
+    
+    if not batches:
+        return False, "Erro ao processar o arquivo: planilha sem dados"
+    new_rows = pd.concat(batches, ignore_index=True)
+    if key_column not in new_rows.columns:
+        return False, f"Erro ao processar o arquivo: coluna '{key_column}' não encontrada"
+    # Responses without a key cannot be matched to a stored one
+    keys = new_rows[key_column].astype(str).str.strip()
+    keyed = new_rows[key_column].notna() & (keys != '')
+    discarded += int((~keyed).sum())
+    if discarded:
+        logger.warning(f"{discarded} responses without ID or {key_column} ignored")
+    # Keys are compared stripped, so ' RA010' and 'RA010' are the same response
+    new_rows, keys = new_rows[keyed], keys[keyed]
+    new_rows = new_rows[~keys.duplicated(keep='last')]
+    new_keys = keys[new_rows.index].tolist()
+    new_ids = new_rows['ID'].astype(str).str.strip().tolist() if key_column != 'ID' and 'ID' in new_rows.columns else []
+    
+    # Stored columns first, then any column that only the new file has
+    stored_columns = read_dataset_columns(database_folder, version=snapshot)
+    columns = stored_columns + [col for col in new_rows.columns if col not in stored_columns]
+    dimensions = cube_dimensions(columns)
+    stored_cube = CountCube.load(snapshot_folder(database_folder, version=snapshot))
+    if stored_cube is not None and stored_cube.dimensions != dimensions:
+        stored_cube = None
+    cube = CountCube(
+        declared_categories(columns), dimensions,
+        values=stored_cube.categories if stored_cube is not None else None,
+        cells=stored_cube.cells if stored_cube is not None else None
+    )
+    
+    writer = DatasetWriter(
+        columns, get_date_columns(columns), database_folder=database_folder, key=key_column,
+        metadata={STANDARDIZATION_METADATA_KEY: STANDARDIZATION_VERSION}
+    )
+    text_index = TextIndex()
+    updated_keys = set()
+    replaced_rows = 0
+    clashing_ids = set()
     try:
-        # Load column names from CSV
-        cols = pd.read_csv('./database/colunas.csv').columns.tolist()
-        
-        # Load data from JSON
-        with open('./database/dados.json', 'r', encoding='utf-8') as f:
-            json_data = json.load(f)
-        
-        # Build the DataFrame
-        data = []
-        for id_item, valores in json_data.items():
-            if len(valores) == len(cols[1:]):  # Check data consistency
-                row = {cols[0]: id_item}
-                for i, col in enumerate(cols[1:]):
-                    row[col] = valores[i]
-                data.append(row)
-        
-        df = pd.DataFrame(data)
-        
-        # Sort columns according to the original CSV
-        df = df[cols]
-        
-        # Convert specific data types
-        date_cols = [col for col in df.columns if 'data' in col.lower()]
-        for col in date_cols:
-            df[col] = pd.to_datetime(df[col], errors='coerce')
-        
-        # Calculate ages for birth date columns
-        for col in date_cols:
-            if 'nascimento' in col.lower():
-                df[f'Idade ({col})'] = df[col].apply(
-                    lambda x: (datetime.datetime.now() - x).days // 365 if pd.notnull(x) else np.nan
-                )
+        for table in iter_dataset_batches(database_folder, version=snapshot, batch_size=batch_size):
+            # Stored rows are copied as they are; only the ones matching a new response are replaced
+            kept, matched = split_rows(table, key_column, new_keys)
+            if new_ids:
+                # A new response cannot take the ID of a stored response that it does not replace
+                clashing_ids.update(split_rows(kept, 'ID', new_ids)[1].column('ID').to_pylist())
+            writer.write_table(kept, dedupe=False)
+            _index_answers(text_index, kept)
+            updated_keys.update(matched.column(key_column).to_pylist())
+            replaced_rows += matched.num_rows
+            if stored_cube is None:
+                # Snapshots written without a (compatible) cube are counted once here
+                cube.add(kept.select([col for col in cube.columns if col in kept.column_names]).to_pandas())
+            elif matched.num_rows:
+                cube.remove(matched.select([col for col in cube.columns if col in matched.column_names]).to_pandas())
+            report('write', writer.rows)
+        
+        if clashing_ids:
+            writer.abort()
+            clashing = ', '.join(sorted(clashing_ids)[:10])
+            logger.error(f"Upsert rejected: IDs {clashing} belong to stored responses with another {key_column}")
+            return False, (
+                f"Erro ao processar o arquivo: os IDs {clashing} já pertencem a outras respostas salvas "
+                f"(com outro valor de '{key_column}')"
+            )
+        
+        writer.write(new_rows.reindex(columns=columns))
+        cube.add(new_rows)
+        _index_answers(text_index, new_rows)
+        
+        on_resolved, save_indexes = _snapshot_indexes(cube, text_index)
+        writer.close(before_publish=save_indexes, on_resolved=on_resolved)
+        report('write', writer.rows, finished=True)
+    except Exception:
+        writer.abort()
+        raise
+    
+    if replaced_rows > len(updated_keys):
+        logger.warning(
+            f"{replaced_rows} stored rows shared the {len(updated_keys)} updated keys ({key_column}) "
+            "and were replaced by one response each"
+        )
+    added = len(new_rows) - len(updated_keys)
+    logger.info(
+        f"Dataset updated: {added} responses added, {len(updated_keys)} updated, "
+        f"{discarded} ignored ({writer.rows} rows)"
+    )
+    missing = "'ID'" if key_column == 'ID' else f"ID ou sem '{key_column}'"
+    ignored = f" {discarded} respostas sem {missing} foram ignoradas." if discarded else ""
+    return True, (
+        f"{added} respostas adicionadas e {len(updated_keys)} atualizadas ({writer.rows} no total)"
+        + ignored + coerced_dates_message(coerced)
+    )
+
+# Função para ler a versão de padronização da base salva
+def stored_standardization_version(snapshot=None, database_folder=DATABASE_FOLDER):
+    """
+    Return the standardization version recorded with the stored dataset
+    
+    Args:
+        snapshot (str): Dataset snapshot to inspect (the published one if None)
+        database_folder (str): Folder of the dataset
+    
+    Returns:
+        int: Version, or 0 for data written before versions were recorded
+    """
+    try:
+        return int(read_dataset_metadata(database_folder, version=snapshot).get(STANDARDIZATION_METADATA_KEY, 0))
+    except ValueError:
+        return 0
+
+# Função para migrar a base legada (JSON) para o armazenamento colunar
+def ensure_dataset(database_folder=DATABASE_FOLDER):
+    """
+    Migrate a legacy JSON dataset to the columnar store if needed
+    
+    The legacy files carry no standardization version, so they are
+    standardized with the current rules while being imported.
+    """
+    if not dataset_exists(database_folder) and legacy_exists(database_folder):
+        logger.info("Importing legacy JSON dataset into the columnar store")
+        df = convert_date_columns(standardize_values(import_legacy_json(database_folder)))
+        write_standardized_dataset(df, database_folder)
+
+# Função para reaplicar a padronização à base salva
+def migrate_standardization(force=False, database_folder=DATABASE_FOLDER):
+    """
+    Re-standardize the stored dataset with the current rules
+    
+    This is the only place where stored data is standardized again; it is
+    meant to be run explicitly after STANDARDIZATION_VERSION is bumped.
+    
+    Args:
+        force (bool): Rewrite the dataset even if its version is current
+        database_folder (str): Folder of the dataset
+    
+    Returns:
+        tuple: (success, message)
+    """
+    try:
+        ensure_dataset(database_folder)
+        version = stored_standardization_version(database_folder=database_folder)
+        if version == STANDARDIZATION_VERSION and not force:
+            return True, f"Base já está na versão de padronização {version}"
+        
+        df = standardize_values(read_dataset(database_folder))
+        write_standardized_dataset(df, database_folder)
+        logger.info(f"Dataset migrated from standardization version {version} to {STANDARDIZATION_VERSION}")
+        return True, f"Base migrada da versão {version} para a versão {STANDARDIZATION_VERSION}"
+    
+    except Exception as e:
+        logger.error(f"Error migrating standardization: {str(e)}")
+        return False, f"Erro ao migrar a base: {str(e)}"
+
+# Função para obter as alternativas declaradas já padronizadas
+def declared_categories(columns):
+    """
+    Return the declared options of the closed questions in a header
+    
+    Options go through standardize_values, so they match the stored
+    (standardized) answers of columns such as course and city.
+    
+    Args:
+        columns (iterable): Column names
+    
+    Returns:
+        dict: Column name -> list of options in form order
+    """
+    categories = question_categories(columns)
+    for col, options in categories.items():
+        standardized = standardize_values(pd.DataFrame({col: pd.Series(options, dtype=object)}))[col]
+        categories[col] = list(dict.fromkeys(standardized))
+    return categories
+
+@timed('load_data')
+def load_data(database_folder=DATABASE_FOLDER):
+    """
+    Load processed data from the columnar dataset
+    
+    Data is standardized once at ingest and stored with its standardization
+    version, so loading does not standardize it again. Every read is pinned
+    to the snapshot published when the load starts (kept in
+    df.attrs['snapshot'], with the folder in df.attrs['database_folder']),
+    even if an upload publishes a new one meanwhile.
+    
+    Args:
+        database_folder (str): Folder of the dataset
+    """
+    try:
+        ensure_dataset(database_folder)
+        snapshot = current_version(database_folder)
+        df = read_dataset(database_folder, version=snapshot)
+        df.attrs['snapshot'] = snapshot
+        df.attrs['database_folder'] = database_folder
+        
+        version = stored_standardization_version(snapshot, database_folder)
+        if version != STANDARDIZATION_VERSION:
+            logger.warning(
+                f"Stored data uses standardization version {version} (current: {STANDARDIZATION_VERSION}); "
+                "run 'flask --app app migrate-standardization' to update it"
+            )
+        
+        # Ages (at the survey completion time) and age bins of the birth date columns
+        birth_column = question_column(df.columns, 'nascimento')
+        add_age_columns(df, [birth_column] if birth_column is not None else [])
+        
+        # Closed-answer questions become categoricals in form order
+        apply_categories(df, declared_categories(df.columns))
         
         # Log some data stats for debugging
         logger.info(f"Loaded data with {len(df)} rows and {len(df.columns)} columns")
         
-        # Apply standardization again to ensure consistency
-        df = standardize_values(df)
-        
         return df.set_index("ID") if "ID" in df.columns else df
     
     except Exception as e:
@@ -216,8 +715,8 @@ def load_data():
         raise
 
 # Função para verificar se os dados estão prontos
-def check_data_ready():
+def check_data_ready(database_folder=DATABASE_FOLDER):
     """
-    Check if the necessary data files exist
+    Check if a processed dataset exists (columnar or legacy JSON)
     """
-    return os.path.exists('./database/colunas.csv') and os.path.exists('./database/dados.json')
+    return dataset_exists(database_folder) or legacy_exists(database_folder)
@@ -0,0 +1,276 @@
+import os
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+from metrics import DATASET_CACHE_REQUESTS, DATASET_EVICTIONS
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+def structure_nbytes(value):
+    """Memory reported by a derived structure (its nbytes, 0 if it has none)"""
+    return int(getattr(value, 'nbytes', 0) or 0)
+
+
+class DatasetCache:
+    """
+    Process-wide cache of the loaded dataset
+
+    The DataFrame is kept in memory and reused while the database files are
+    unchanged. Each lookup compares a cheap fingerprint (mtime and size of
+    every file); when it changes, the file contents are hashed so that a
+    rewrite with identical bytes keeps the cached frame. All state changes
+    happen under a lock, so concurrent requests in a threaded server share a
+    single load.
+
+    The cached DataFrame is shared between requests and must be treated as
+    read-only by callers.
+    """
+
+    def __init__(self, loader, files, on_resize=None):
+        """
+        Args:
+            loader (callable): Function that loads and returns the DataFrame
+            files (callable): Function returning the paths that back the dataset
+            on_resize (callable): Optional on_resize(cache) callback, called
+                once the lock is released whenever the memory of the cache may
+                have grown (after a (re)load, when a derived structure is
+                built and on every get_with_derived)
+        """
+        self._loader = loader
+        self._files = files
+        self._on_resize = on_resize
+        self._lock = threading.RLock()
+        self._df = None
+        self._nbytes = 0
+        self._stat = None
+        self._digest = None
+        self._derived = {}
+
+    @property
+    def lock(self):
+        """Lock held while the cache is loaded or invalidated"""
+        return self._lock
+
+    @property
+    def loaded(self):
+        """Whether a DataFrame is currently held in memory"""
+        return self._df is not None
+
+    @property
+    def nbytes(self):
+        """
+        Memory used by the cached DataFrame and its derived structures
+
+        Structures are measured when asked (see structure_nbytes), so caches
+        that grow after they are built, such as the column codes of the
+        bitmap index, are counted too.
+
+        Returns:
+            int: Bytes (0 when nothing is loaded)
+        """
+        if self._df is None:
+            return 0
+        return self._nbytes + sum(structure_nbytes(value) for value in list(self._derived.values()))
+
+    def _resized(self):
+        if self._on_resize is not None:
+            self._on_resize(self)
+
+    def _stat_fingerprint(self):
+        """Return (path, mtime, size) for every existing dataset file"""
+        fingerprint = []
+        for path in self._files():
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            fingerprint.append((path, st.st_mtime_ns, st.st_size))
+        return tuple(fingerprint)
+
+    @staticmethod
+    def _content_digest(stat):
+        """Hash the contents of the files listed in a stat fingerprint"""
+        digest = hashlib.sha1()
+        for path, _, _ in stat:
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                    digest.update(chunk)
+        return digest.hexdigest()
+
+    def get(self):
+        """
+        Return the cached DataFrame, reloading it if the files changed
+
+        Returns:
+            pd.DataFrame: Dataset returned by the loader
+        """
+        stat = self._stat_fingerprint()
+        with self._lock:
+            if self._df is not None and stat == self._stat:
+                DATASET_CACHE_REQUESTS.inc(result='hit')
+                return self._df
+
+            digest = self._content_digest(stat)
+            if self._df is not None and digest == self._digest:
+                logger.info("Dataset files touched but unchanged, keeping cached data")
+                DATASET_CACHE_REQUESTS.inc(result='revalidated')
+                self._stat = stat
+                return self._df
+
+            logger.info("Dataset cache miss, loading data")
+            DATASET_CACHE_REQUESTS.inc(result='miss')
+            df = self._loader()
+            self._df, self._stat, self._digest = df, stat, digest
+            self._nbytes = int(df.memory_usage(deep=True).sum())
+            self._derived = {}
+
+        self._resized()
+        return df
+
+    def get_derived(self, name, builder, df=None):
+        """
+        Return a structure derived from the cached DataFrame, building it once
+
+        Derived structures (e.g. indexes) are dropped together with the
+        DataFrame when the dataset is reloaded or invalidated. The check and
+        the build happen under the lock, and a structure is only stored for
+        the DataFrame it was built from: if df is no longer the cached frame
+        (the dataset was reloaded meanwhile), it is built for df and not kept.
+
+        Args:
+            name (str): Name of the derived structure
+            builder (callable): Function that receives the DataFrame and builds it
+            df (pd.DataFrame): Frame returned by get (the current one if None)
+
+        Returns:
+            Any: Value returned by the builder for df
+        """
+        if df is None:
+            df = self.get()
+        with self._lock:
+            if self._df is not df:
+                logger.info(f"Building derived data for a replaced load: {name}")
+                return builder(df)
+            if name in self._derived:
+                return self._derived[name]
+            logger.info(f"Building derived data: {name}")
+            value = self._derived[name] = builder(df)
+
+        self._resized()
+        return value
+
+    def get_with_derived(self, builders):
+        """
+        Return the cached DataFrame together with structures derived from it
+
+        All the structures come from the same load as the returned frame, so
+        a request never mixes a DataFrame with indexes of another load.
+
+        Args:
+            builders (dict): Name -> builder (see get_derived)
+
+        Returns:
+            tuple: (DataFrame, dict name -> derived structure)
+        """
+        df = self.get()
+        derived = {name: self.get_derived(name, builder, df) for name, builder in builders.items()}
+        # Structures such as the bitmap index keep caches that grow while requests are answered
+        self._resized()
+        return df, derived
+
+    def invalidate(self):
+        """Drop the cached DataFrame so the next lookup reloads it"""
+        with self._lock:
+            self._df = None
+            self._stat = None
+            self._digest = None
+            self._derived = {}
+            logger.info("Dataset cache invalidated")
+
+
+class DatasetPool:
+    """
+    Memory-bounded LRU of the loaded datasets of the catalog
+
+    Each dataset gets its own DatasetCache. When a load or a derived
+    structure brings the memory of the resident datasets (DataFrames plus
+    their indexes, cube and caches) over max_bytes, the least recently used
+    datasets are invalidated (their derived structures go with them) until
+    the budget is met again; the dataset just loaded is never evicted, so
+    a single dataset larger than the budget still loads. Evicted datasets
+    are reloaded from their files on the next request, without a restart.
+    """
+
+    def __init__(self, loader, files, max_bytes):
+        """
+        Args:
+            loader (callable): loader(database_folder) returning the DataFrame
+            files (callable): files(database_folder) returning the dataset paths
+            max_bytes (int): Memory budget of the resident datasets
+        """
+        self._loader = loader
+        self._files = files
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._caches = OrderedDict()
+
+    def cache(self, dataset_id, database_folder):
+        """
+        Return the cache of a dataset and mark it as the most recently used
+
+        Args:
+            dataset_id (str): Dataset id in the catalog
+            database_folder (str): Folder of the dataset
+
+        Returns:
+            DatasetCache: Cache of the dataset (loaded on its first get)
+        """
+        with self._lock:
+            cache = self._caches.get(dataset_id)
+            if cache is None:
+                cache = DatasetCache(
+                    lambda: self._loader(database_folder),
+                    lambda: self._files(database_folder),
+                    on_resize=lambda resized: self._evict(keep=resized)
+                )
+                self._caches[dataset_id] = cache
+            self._caches.move_to_end(dataset_id)
+            return cache
+
+    def _evict(self, keep):
+        """Invalidate least recently used datasets until the budget is met"""
+        with self._lock:
+            total = sum(cache.nbytes for cache in self._caches.values())
+            victims = []
+            for dataset_id, cache in self._caches.items():
+                if total <= self.max_bytes:
+                    break
+                if cache is not keep and cache.loaded:
+                    total -= cache.nbytes
+                    victims.append((dataset_id, cache, cache.nbytes))
+
+        for dataset_id, cache, nbytes in victims:
+            cache.invalidate()
+            DATASET_EVICTIONS.inc(dataset=dataset_id)
+            logger.info(f"Dataset {dataset_id} evicted from memory ({nbytes} bytes, budget {self.max_bytes})")
+
+    def discard(self, dataset_id):
+        """Drop a dataset from the pool (e.g. after it is removed from the catalog)"""
+        with self._lock:
+            cache = self._caches.pop(dataset_id, None)
+        if cache is not None:
+            cache.invalidate()
+
+    def residency(self):
+        """
+        Return the memory used by each resident dataset
+
+        Returns:
+            dict: Dataset id -> bytes, least recently used first
+        """
+        with self._lock:
+            return {dataset_id: cache.nbytes for dataset_id, cache in self._caches.items() if cache.loaded}
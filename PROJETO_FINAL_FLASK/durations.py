@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+
+from fatec_comum.schema import question_column
+
+# Limites (em minutos) das faixas de tempo de resposta; a última faixa é aberta
+DURATION_BINS = (0, 5, 10, 15, 20, 30, 45, 60)
+
+# Quantis do tempo de resposta informados nas estatísticas
+DURATION_QUANTILES = {'p25': 0.25, 'mediana': 0.5, 'p75': 0.75, 'p90': 0.9}
+
+
+def response_durations(df):
+    """
+    Time each respondent took to answer the survey, in minutes
+
+    Completion minus start time ('Hora de conclusão' - 'Hora de início',
+    found through the schema), over the native datetime columns stored at
+    ingest. Rows without both times, or finished before they started, are
+    left out.
+
+    Args:
+        df (pd.DataFrame): DataFrame (or filtered view) with data
+
+    Returns:
+        pd.Series: Durations in minutes (empty if a time column is missing)
+    """
+    start_column = question_column(df.columns, 'inicio')
+    end_column = question_column(df.columns, 'conclusao')
+    if start_column is None or end_column is None:
+        return pd.Series(dtype='float64')
+    start = pd.to_datetime(df[start_column], errors='coerce')
+    end = pd.to_datetime(df[end_column], errors='coerce')
+    minutes = (end - start).dt.total_seconds() / 60
+    return minutes[minutes.notna() & (minutes >= 0)]
+
+
+def duration_stats(durations):
+    """
+    Summary statistics of the response durations
+
+    Args:
+        durations (pd.Series): Durations in minutes (see response_durations)
+
+    Returns:
+        dict: Number of timed responses and mean, quantiles (DURATION_QUANTILES),
+        minimum and maximum in minutes (None without durations)
+    """
+    stats = {'respostas': int(len(durations))}
+    values = durations.to_numpy(dtype=np.float64)
+    empty = len(values) == 0
+    stats['media'] = None if empty else round(float(values.mean()), 2)
+    for name, quantile in DURATION_QUANTILES.items():
+        stats[name] = None if empty else round(float(np.quantile(values, quantile)), 2)
+    stats['minimo'] = None if empty else round(float(values.min()), 2)
+    stats['maximo'] = None if empty else round(float(values.max()), 2)
+    return stats
+
+
+def duration_bin_counts(durations, bins=DURATION_BINS):
+    """
+    Number of responses per duration range ('0-5 min', ..., '60+ min')
+
+    Returns:
+        pd.Series: Count per range label, empty ranges included
+    """
+    edges = list(bins) + [np.inf]
+    labels = [f"{low}-{high} min" for low, high in zip(bins[:-1], bins[1:])] + [f"{bins[-1]}+ min"]
+    ranges = pd.cut(durations, edges, right=False, labels=labels)
+    return ranges.value_counts(sort=False).reindex(labels, fill_value=0).astype('int64')
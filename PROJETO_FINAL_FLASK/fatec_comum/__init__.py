@@ -0,0 +1,9 @@
+"""
+Módulos compartilhados pelos três apps do repositório (schema do questionário, idades e tokenizador)
+
+O app Flask importa o pacote normalmente, pois ele fica na pasta do app. Os
+projetos em Streamlit (main.py na raiz e ProjetoAtualizado/) carregam o
+pacote pelo caminho do __init__.py, sem colocar a pasta do app Flask no
+sys.path, então os módulos dela (data_processing, app...) nunca se
+confundem com os deles.
+"""
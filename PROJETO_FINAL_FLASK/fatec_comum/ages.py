@@ -0,0 +1,153 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+from .schema import question_column, date_columns, parse_dates
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Data de referência das idades: quando o estudante concluiu o questionário (id em schema.json)
+REFERENCE_QUESTION = 'conclusao'
+
+# Largura das faixas etárias (anos)
+AGE_BIN_WIDTH = 5
+
+# Idades fora deste intervalo são datas de nascimento inválidas
+MAX_AGE = 120
+
+
+def age_columns(birth_column):
+    """Names of the age and age-bin columns derived from a birth date column"""
+    return f"Idade ({birth_column})", f"Faixa etária ({birth_column})"
+
+
+def declared_dates(series):
+    """
+    Dates of a column read with the formats declared for it in the schema
+
+    Columns already converted (see schema.parse_dates) are returned as they
+    are; nothing is inferred, so a column without declared formats has no
+    dates.
+
+    Returns:
+        pd.Series: datetime64 column with the same index
+    """
+    formats = date_columns([series.name]).get(series.name, ()) if series.name is not None else ()
+    return parse_dates(series, formats)[0]
+
+
+def reference_dates(df):
+    """
+    Reference date of each row for the age computation
+
+    Ages are measured at the moment each respondent completed the survey.
+    Rows without a completion time (and every row when the column is
+    missing) get no reference, and so no age, instead of today's date:
+    ages must not drift as time goes by. They are logged as a warning.
+
+    Returns:
+        pd.Series: datetime64 reference per row (same index as df), NaT
+        where there is no completion time
+    """
+    column = question_column(df.columns, REFERENCE_QUESTION)
+    if column is None:
+        logger.warning("No survey completion column: ages are left empty")
+        return pd.Series(pd.NaT, index=df.index, dtype='datetime64[ns]')
+    reference = declared_dates(df[column])
+    missing = int(reference.isna().sum())
+    if missing:
+        logger.warning(f"{missing} rows without a valid '{column}': their ages are left empty")
+    return reference
+
+
+def exact_ages(birth_dates, reference):
+    """
+    Completed years between birth dates and reference dates, vectorized
+
+    A year counts once its anniversary has passed (month and day compared
+    as month * 100 + day), instead of the days // 365 approximation.
+
+    Args:
+        birth_dates (pd.Series): Birth dates (read with the declared formats,
+            see declared_dates)
+        reference (pd.Series): Reference dates, aligned with birth_dates
+
+    Returns:
+        pd.Series: Ages as floats, NaN for missing or impossible birth dates
+        and for rows without a reference date
+    """
+    birth = declared_dates(birth_dates)
+    before_birthday = (reference.dt.month * 100 + reference.dt.day) < (birth.dt.month * 100 + birth.dt.day)
+    ages = (reference.dt.year - birth.dt.year - before_birthday.astype(int)).astype(float)
+    return ages.where(birth.notna() & reference.notna() & (ages >= 0) & (ages < MAX_AGE))
+
+
+def age_bins(ages, width=AGE_BIN_WIDTH):
+    """
+    Group ages into bins of width years ('15-19', '20-24', ...)
+
+    Returns:
+        pd.Series: Ordered categorical with every bin between the youngest
+        and the oldest age, including empty ones, so histograms of filtered
+        rows keep the same axis
+    """
+    starts = (ages // width) * width
+    valid = starts.dropna()
+    if valid.empty:
+        return pd.Series(pd.Categorical([None] * len(ages), categories=[], ordered=True), index=ages.index)
+    bounds = np.arange(int(valid.min()), int(valid.max()) + 1, width)
+    labels = [f"{start}-{start + width - 1}" for start in bounds]
+    codes = np.where(starts.notna(), (starts.fillna(bounds[0]) - bounds[0]) // width, -1).astype(int)
+    return pd.Series(pd.Categorical.from_codes(codes, categories=labels, ordered=True), index=ages.index)
+
+
+def add_age_columns(df, birth_columns=None):
+    """
+    Add the age and age-bin columns of the birth date columns (in place)
+
+    Args:
+        df (pd.DataFrame): DataFrame with data
+        birth_columns (list): Birth date columns (headers containing
+            'nascimento' if None)
+
+    Returns:
+        pd.DataFrame: The same DataFrame
+    """
+    if birth_columns is None:
+        birth_columns = [col for col in df.columns if 'nascimento' in str(col).lower()]
+    if not birth_columns:
+        return df
+    reference = reference_dates(df)
+    for col in birth_columns:
+        age_col, bin_col = age_columns(col)
+        df[age_col] = exact_ages(df[col], reference)
+        df[bin_col] = age_bins(df[age_col])
+    return df
+
+
+def age_bin_counts(df, birth_column, counts=None):
+    """
+    Number of respondents per age bin, in bin order
+
+    Uses the precomputed bin column (see add_age_columns) when present,
+    otherwise computes the ages of this DataFrame.
+
+    Args:
+        df (pd.DataFrame): DataFrame with data
+        birth_column (str): Birth date column
+        counts (callable): Optional counts(df, column) returning the counts of
+            the bin column (e.g. a cached or indexed counter)
+
+    Returns:
+        pd.Series: Count per bin label, empty bins included
+    """
+    _, bin_col = age_columns(birth_column)
+    if bin_col in df.columns:
+        bins = df[bin_col]
+    else:
+        bins = age_bins(exact_ages(df[birth_column], reference_dates(df)))
+    labels = list(bins.cat.categories)
+    values = counts(df, bin_col) if counts is not None and bin_col in df.columns else bins.value_counts(sort=False)
+    return pd.Series(values, dtype='int64').reindex(labels, fill_value=0)
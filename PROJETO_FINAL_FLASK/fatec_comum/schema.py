@@ -0,0 +1,303 @@
+import os
+import json
+import logging
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Registro das perguntas do questionário (arquivos_de_trabalho/Perguntas e Alternativas.txt):
+# id, cabeçalho, apelidos, tipo, formato de data, alternativas e separador das múltiplas escolhas
+SCHEMA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schema.json')
+
+# Tipos de coluna aceitos no registro
+DTYPES = ('string', 'category', 'multi_select', 'datetime', 'text')
+
+
+class Question:
+    """One question (column) of the survey as declared in the schema file"""
+
+    def __init__(self, id, header, dtype='string', aliases=(), format=None, options=None, delimiter=None):
+        """
+        Args:
+            id (str): Stable identifier used by the code (e.g. 'periodo')
+            header (str): Canonical header of the form export
+            dtype (str): One of DTYPES
+            aliases (iterable): Other headers of the same question (older exports)
+            format (str or list): Format(s) of datetime questions, tried in
+                order (strptime formats or 'ISO8601')
+            options (list): Declared options in form order
+            delimiter (str): Separator of the options of multi-select questions
+        """
+        if dtype not in DTYPES:
+            raise ValueError(f"Tipo desconhecido para a pergunta '{id}': {dtype}")
+        self.id = id
+        self.header = header
+        self.dtype = dtype
+        self.aliases = tuple(aliases)
+        self.formats = (format,) if isinstance(format, str) else tuple(format or ())
+        self.options = list(options) if options is not None else None
+        self.delimiter = delimiter
+
+    @property
+    def headers(self):
+        """Canonical header followed by the aliases"""
+        return (self.header,) + self.aliases
+
+    def __repr__(self):
+        return f"Question({self.id!r}, {self.dtype!r})"
+
+
+class SurveySchema:
+    """
+    Registry of the questions of the survey
+
+    Headers are matched once per header list (cached): a column is the
+    canonical header or an alias of a question, possibly followed by the
+    '*' the form adds to required questions. Loaders read the declared
+    types (dates parsed with their format, closed questions as
+    categoricals) and chart generators find their columns by question id
+    instead of probing header variants.
+
+    Grid questions (one column per item with the same options) are declared
+    once in the file and expanded here into one question per item, with
+    ids '<grid>.<item>' and the grid suffix ('2', '3') appended to the
+    headers.
+    """
+
+    def __init__(self, questions, version=1):
+        """
+        Args:
+            questions (list): Question objects
+            version (int): Version of the schema file
+        """
+        self.version = version
+        self.questions = {}
+        self._by_header = {}
+        for question in questions:
+            if question.id in self.questions:
+                raise ValueError(f"Pergunta repetida no schema: {question.id}")
+            self.questions[question.id] = question
+            for header in question.headers:
+                self._by_header.setdefault(header, question)
+        self._resolved = {}
+
+    @classmethod
+    def load(cls, path=SCHEMA_FILE):
+        """
+        Read a schema file
+
+        Returns:
+            SurveySchema: Registry with the questions and the expanded grids
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        questions = [Question(**entry) for entry in data.get('questions', [])]
+        for grid in data.get('grids', []):
+            suffix = grid.get('suffix', '')
+            for item in grid['items']:
+                questions.append(Question(
+                    f"{grid['id']}.{item['id']}", f"{item['header']}{suffix}", 'category',
+                    aliases=[f"{alias}{suffix}" for alias in item.get('aliases', [])],
+                    options=grid['options']
+                ))
+        return cls(questions, version=data.get('version', 1))
+
+    def question(self, question_id):
+        """Question with the given id (KeyError if it is not declared)"""
+        return self.questions[question_id]
+
+    def match(self, header):
+        """Question of a header (trailing '*' of required questions ignored), or None"""
+        header = str(header)
+        return self._by_header.get(header, self._by_header.get(header.rstrip('*')))
+
+    def resolve(self, columns):
+        """
+        Match the columns of a header against the registry
+
+        Args:
+            columns (iterable): Column names
+
+        Returns:
+            dict: Question id -> column name, for the declared questions
+            present (the first matching column wins)
+        """
+        key = tuple(columns)
+        resolved = self._resolved.get(key)
+        if resolved is None:
+            resolved = {}
+            for col in key:
+                question = self.match(col)
+                if question is not None:
+                    resolved.setdefault(question.id, col)
+            self._resolved[key] = resolved
+        return resolved
+
+    def column(self, columns, question_id):
+        """Column of a question in a header, or None if it is missing"""
+        return self.resolve(columns).get(question_id)
+
+    def columns_of_type(self, columns, dtype):
+        """
+        Columns of the questions declared with a type
+
+        Returns:
+            dict: Column name -> Question, in column order
+        """
+        return {
+            col: self.questions[question_id]
+            for question_id, col in self.resolve(columns).items()
+            if self.questions[question_id].dtype == dtype
+        }
+
+
+@lru_cache(maxsize=None)
+def get_schema():
+    """Registry loaded from SCHEMA_FILE (read once per process)"""
+    schema = SurveySchema.load()
+    logger.info(f"Schema version {schema.version} loaded with {len(schema.questions)} questions")
+    return schema
+
+# Função para encontrar a coluna de uma pergunta
+def question_column(columns, question_id):
+    """
+    Find the column of a question in a header
+
+    Args:
+        columns (iterable): Column names (e.g. df.columns)
+        question_id (str): Question id in the schema (e.g. 'periodo')
+
+    Returns:
+        str: Column name, or None if the question is not in the header
+    """
+    return get_schema().column(columns, question_id)
+
+# Função para listar as colunas de data declaradas
+def date_columns(columns):
+    """
+    Return the datetime columns of a header with their declared formats
+
+    Returns:
+        dict: Column name -> tuple of formats, in the order they are tried
+    """
+    return {col: question.formats for col, question in get_schema().columns_of_type(columns, 'datetime').items()}
+
+# Função para listar as colunas de múltipla escolha declaradas
+def multi_select_columns(columns):
+    """
+    Return the multi-select columns of a header with their option separators
+
+    Returns:
+        dict: Column name -> separator of the marked options
+    """
+    return {col: question.delimiter for col, question in get_schema().columns_of_type(columns, 'multi_select').items()}
+
+# Função para obter as alternativas das perguntas fechadas
+def question_categories(columns):
+    """
+    Return the declared options of the closed questions present in a header
+
+    Args:
+        columns (iterable): Column names
+
+    Returns:
+        dict: Column name -> list of options in form order
+    """
+    return {col: list(question.options) for col, question in get_schema().columns_of_type(columns, 'category').items()}
+
+
+def parse_dates(series, formats=()):
+    """
+    Convert a column of date strings to datetime64 with the declared formats
+
+    Only the distinct values are parsed, each format in a single vectorized
+    pd.to_datetime call over the values the previous formats left unparsed.
+    Nothing is inferred: a value that matches no declared format becomes
+    NaT and is counted, instead of being silently read with the day and
+    month swapped.
+
+    Args:
+        series (pd.Series): Column with date strings (or datetimes)
+        formats (iterable): Declared formats, tried in order (see Question)
+
+    Returns:
+        tuple: (datetime64 column with the same index and name, number of
+        non-blank values coerced to NaT)
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series, 0
+
+    codes, uniques = pd.factorize(series)
+    texts = pd.Series([str(value).strip() for value in uniques], dtype=object)
+    parsed = pd.Series(pd.NaT, index=texts.index, dtype='datetime64[ns]')
+    for date_format in formats:
+        missing = parsed.isna() & (texts != '')
+        if not missing.any():
+            break
+        parsed[missing] = pd.to_datetime(texts[missing], format=date_format, errors='coerce')
+
+    # The extra NaT at the end keeps missing values (code -1) missing
+    values = np.append(parsed.to_numpy(), np.datetime64('NaT', 'ns'))
+    result = pd.Series(values[codes], index=series.index, name=series.name)
+    unparsed = np.append((parsed.isna() & (texts != '')).to_numpy(), False)
+    return result, int(unparsed[codes].sum())
+
+
+def to_categorical(series, categories):
+    """
+    Convert an answer column to a pandas Categorical
+
+    Answers are stripped (including non-breaking spaces) and blank answers
+    become missing. The categories are the declared options followed by any
+    other observed answer, in order of first appearance, so no data is lost
+    when the form changes. The work is done on the distinct values and the
+    integer codes only.
+
+    Args:
+        series (pd.Series): Column with string answers
+        categories (list): Declared options in form order
+
+    Returns:
+        pd.Series: Categorical column with the same index and name
+    """
+    codes, uniques = pd.factorize(series)
+    stripped = [str(value).strip() for value in uniques]
+
+    categories = list(dict.fromkeys(categories))
+    positions = {value: i for i, value in enumerate(categories)}
+    for value in stripped:
+        if value and value not in positions:
+            positions[value] = len(categories)
+            categories.append(value)
+
+    # The extra -1 at the end keeps missing values (code -1) missing
+    lookup = np.array([positions[value] if value else -1 for value in stripped] + [-1], dtype=np.int64)
+    return pd.Series(
+        pd.Categorical.from_codes(lookup[codes], categories=categories),
+        index=series.index,
+        name=series.name
+    )
+
+
+def apply_categories(df, categories):
+    """
+    Convert the closed-answer columns of a DataFrame to Categoricals in place
+
+    Args:
+        df (pd.DataFrame): DataFrame with data
+        categories (dict): Column name -> declared options (see question_categories)
+
+    Returns:
+        pd.DataFrame: The same DataFrame
+    """
+    for col, options in categories.items():
+        if col in df.columns:
+            df[col] = to_categorical(df[col], options)
+
+    logger.info(f"{len(categories)} closed-answer columns loaded as categorical")
+    return df
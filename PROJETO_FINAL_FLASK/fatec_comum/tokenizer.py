@@ -0,0 +1,185 @@
+import re
+import unicodedata
+from collections import Counter
+from itertools import chain
+
+import pandas as pd
+
+# Incrementar quando as regras (acentos, stopwords, radicais) mudarem
+TOKENIZER_VERSION = 1
+
+# Separador das respostas no texto único da coluna (removido das próprias respostas)
+_RECORD_SEPARATOR = '\x1e'
+
+# Palavras (só letras)
+_WORD_PATTERN = re.compile(r'[^\W\d_]+')
+
+# Letras acentuadas -> letra sem acento (á -> a, ç -> c, ...)
+_FOLD_TABLE = {
+    code: unicodedata.normalize('NFKD', chr(code))[0]
+    for code in range(0xC0, 0x250)
+    if unicodedata.normalize('NFKD', chr(code))[0].isascii() and chr(code).isalpha()
+}
+
+# Palavras vazias do português (sem acento), mais expressões comuns nas respostas do questionário
+STOPWORDS = frozenset("""
+a ao aos aquela aquelas aquele aqueles aquilo as ate com como da das de dela delas dele deles depois do dos
+e ela elas ele eles em entre era eram eramos essa essas esse esses esta estamos estao estas estava estavam
+estavamos este esteja estejam estejamos estes esteve estive estivemos estiver estivera estiveram estiveramos
+estiverem estivermos estivesse estivessem estivessemos estou eu foi fomos for fora foram foramos forem formos
+fosse fossem fossemos fui ha haja hajam hajamos hao havemos havia hei houve houvemos houver houvera
+houveram houveramos houverao houverei houverem houveremos houveria houveriam houveriamos houvermos houvesse
+houvessem houvessemos isso isto ja lhe lhes mais mas me mesmo meu meus minha minhas muito na nao nas nem no
+nos nossa nossas nosso nossos num numa o os ou para pela pelas pelo pelos por qual quando que quem sao se
+seja sejam sejamos sem ser sera serao serei seremos seria seriam seriamos seu seus so somos sou sua suas
+tambem te tem temos tenha tenham tenhamos tenho ter tera terao terei teremos teria teriam teriamos teu teus
+teve tinha tinham tinhamos tive tivemos tiver tivera tiveram tiveramos tiverem tivermos tivesse tivessem
+tivessemos tu tua tuas um uma umas uns voce voces vos
+quero queria gostaria pretendo sempre ainda pois porque entao assim bem sobre apos desde cada todo toda
+todos todas outro outra outros outras onde algum alguma alguns algumas muita muitas muitos vai vou ir
+fazer faco poder pode posso estar
+""".split())
+
+
+def fold_accents(text):
+    """Remove the accents of a text (minha história -> minha historia)"""
+    return text.translate(_FOLD_TABLE)
+
+
+def stem(word):
+    """
+    Light Portuguese stemmer: reduce a folded word to its singular form
+
+    Only plural endings are handled (sonhos -> sonho, profissionais ->
+    profissional, viagens -> viagem, professores -> professor), so stems
+    stay readable words. Words of up to 3 letters are kept as they are.
+    """
+    if len(word) <= 3:
+        return word
+    if word.endswith(('oes', 'aes')):
+        return word[:-3] + 'ao'
+    if word.endswith(('ais', 'eis')) and len(word) > 4:
+        # mais, pais and seis are not plurals of -al/-el words
+        return word[:-2] + 'l'
+    if word.endswith('ns'):
+        return word[:-2] + 'm'
+    if word.endswith(('res', 'zes', 'ses')) and word[-4] in 'aeiou':
+        # lugares -> lugar, vezes -> vez, meses -> mes (but livres, interesses -> livre, interesse)
+        return word[:-2]
+    if word.endswith('s') and word[-2] in 'aeo':
+        return word[:-1]
+    return word
+
+
+class Tokenizer:
+    """
+    Batch tokenizer for Portuguese answers
+
+    A whole column is lowercased at once (answers joined by a separator)
+    and split with one compiled pattern. Words are counted before they are
+    analyzed, so each distinct word goes through accent folding, light
+    stemming and the stopword check once. Counts are kept per term (stem)
+    and shown with the most frequent spelling of the term (sonhos, sonho
+    -> 'sonho').
+    """
+
+    def __init__(self, stopwords=STOPWORDS, min_length=3):
+        """
+        Args:
+            stopwords (iterable): Words left out of the counts (without accents)
+            min_length (int): Minimum number of letters of a counted term
+        """
+        self.stopwords = frozenset(stopwords)
+        self.min_length = min_length
+        self._stop_terms = frozenset(stem(word) for word in self.stopwords)
+        self._terms = {}
+
+    def words(self, texts):
+        """
+        Split answers into lowercase words in one pass over the column
+
+        Args:
+            texts (iterable): Answers (missing or non-text answers count as empty)
+
+        Returns:
+            list: Words of each answer, in order
+        """
+        texts = [text.replace(_RECORD_SEPARATOR, ' ') if isinstance(text, str) else '' for text in texts]
+        if not texts:
+            return []
+        return [_WORD_PATTERN.findall(text) for text in _RECORD_SEPARATOR.join(texts).lower().split(_RECORD_SEPARATOR)]
+
+    def term(self, word):
+        """Term (folded stem) of a lowercase word, analyzed once per distinct word"""
+        term = self._terms.get(word)
+        if term is None:
+            term = self._terms[word] = stem(fold_accents(word))
+        return term
+
+    def is_content(self, term):
+        """Check if a term is counted (not a stopword and long enough)"""
+        return len(term) >= self.min_length and term not in self._stop_terms
+
+    def tokenize(self, texts):
+        """
+        Terms of each answer, without stopwords
+
+        Returns:
+            list: Terms of each answer, in order
+        """
+        return [
+            [term for term in map(self.term, words) if self.is_content(term)]
+            for words in self.words(texts)
+        ]
+
+    def ngram_counts(self, texts, n=1):
+        """
+        Count the terms (n=1) or sequences of n terms of a column
+
+        Sequences are formed after the stopwords are removed and never cross
+        two answers.
+
+        Args:
+            texts (iterable): Answers
+            n (int or tuple): Sequence length, or several lengths (e.g. (2, 3))
+
+        Returns:
+            pd.Series: Occurrences, most frequent first (ties in order of
+            first appearance), indexed by the most frequent spelling of each term
+        """
+        lengths = (n,) if isinstance(n, int) else tuple(n)
+        answers = self.words(texts)
+        word_counts = Counter(chain.from_iterable(answers))
+
+        # Distinct words -> counted term (None for stopwords); spellings -> most frequent one
+        content = {}
+        labels = {}
+        for word, count in word_counts.items():
+            term = self.term(word)
+            content[word] = term if self.is_content(term) else None
+            if content[word] is not None and count > labels.get(term, ('', 0))[1]:
+                labels[term] = (word, count)
+
+        counts = Counter()
+        for length in lengths:
+            if length == 1:
+                for word, count in word_counts.items():
+                    if content[word] is not None:
+                        counts[(content[word],)] += count
+                continue
+            for words in answers:
+                terms = [term for term in map(content.__getitem__, words) if term is not None]
+                counts.update(zip(*(terms[i:] for i in range(length))))
+
+        labels = {term: word for term, (word, _) in labels.items()}
+        result = pd.Series(
+            list(counts.values()),
+            index=pd.Index([' '.join(labels[term] for term in gram) for gram in counts], dtype=object),
+            dtype='int64',
+            name='count'
+        )
+        return result.sort_values(ascending=False, kind='stable')
+
+    def frequencies(self, texts):
+        """Term frequencies for WordCloud.generate_from_frequencies ({spelling: count})"""
+        return self.ngram_counts(texts).to_dict()
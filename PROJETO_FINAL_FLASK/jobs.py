@@ -0,0 +1,166 @@
+import uuid
+import logging
+import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Etapas do processamento de um upload, na ordem em que acontecem
+UPLOAD_STAGES = ('read', 'standardize', 'write', 'precompute')
+
+# Quantidade de jobs concluídos mantidos para consulta
+MAX_FINISHED_JOBS = 50
+
+
+def _now():
+    return datetime.datetime.now().isoformat(timespec='seconds')
+
+
+class Job:
+    """
+    State of one background job
+
+    Progress is tracked per stage: each stage has a status (pending,
+    running, done), the number of items processed and, when known, the
+    total. The job function receives the job and reports progress through
+    update(); its return value must be a (success, message) tuple. Problems
+    that do not fail the job are recorded with warn().
+    """
+
+    def __init__(self, name, stages):
+        """
+        Args:
+            name (str): Description of the job (e.g. the uploaded file name)
+            stages (tuple): Names of the stages, in order
+        """
+        self.id = uuid.uuid4().hex
+        self.name = name
+        self.status = 'queued'
+        self.message = None
+        self.warnings = []
+        self.created_at = _now()
+        self.finished_at = None
+        self.stages = {stage: {'status': 'pending', 'done': 0, 'total': None} for stage in stages}
+        self._lock = threading.Lock()
+
+    def update(self, stage, done=None, total=None, finished=False):
+        """
+        Record the progress of a stage
+
+        Stages may run at the same time (uploads are read, standardized and
+        written batch by batch), so a stage stays running until it is
+        reported as finished.
+
+        Args:
+            stage (str): Stage name
+            done (int): Items processed so far
+            total (int): Total number of items, if known
+            finished (bool): Mark the stage as done
+        """
+        with self._lock:
+            state = self.stages[stage]
+            state['status'] = 'done' if finished else 'running'
+            if done is not None:
+                state['done'] = done
+            if total is not None:
+                state['total'] = total
+
+    def warn(self, message):
+        """Record a problem that does not fail the job (shown with its result)"""
+        with self._lock:
+            self.warnings.append(message)
+
+    def progress(self):
+        """Fraction of the stages already done (0 to 1)"""
+        with self._lock:
+            done = sum(state['status'] == 'done' for state in self.stages.values())
+        return done / len(self.stages) if self.stages else 1.0
+
+    def to_dict(self):
+        """Return the job state as a JSON-serializable dictionary"""
+        progress = self.progress()
+        with self._lock:
+            return {
+                'id': self.id,
+                'name': self.name,
+                'status': self.status,
+                'message': self.message,
+                'warnings': list(self.warnings),
+                'created_at': self.created_at,
+                'finished_at': self.finished_at,
+                'progress': round(progress, 2),
+                'stages': {name: dict(state) for name, state in self.stages.items()}
+            }
+
+    def _finish(self, status, message):
+        with self._lock:
+            self.status = status
+            self.message = message
+            self.finished_at = _now()
+            if status == 'done':
+                for state in self.stages.values():
+                    state['status'] = 'done'
+
+
+class JobQueue:
+    """
+    Local queue of background jobs
+
+    Jobs run in a thread pool inside the web process, so no external broker
+    is needed. Job state lives in memory: it is shared by every request of
+    the process and lost on restart. Only the most recent finished jobs are
+    kept.
+    """
+
+    def __init__(self, max_workers=1):
+        """
+        Args:
+            max_workers (int): Number of jobs that can run at the same time
+        """
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self._lock = threading.Lock()
+        self._jobs = {}
+
+    def submit(self, name, func, *args, stages=UPLOAD_STAGES, **kwargs):
+        """
+        Enqueue a job
+
+        Args:
+            name (str): Description of the job
+            func (callable): Called as func(job, *args, **kwargs); must
+                return a (success, message) tuple
+            stages (tuple): Names of the stages reported by func
+
+        Returns:
+            Job: The queued job
+        """
+        job = Job(name, stages)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        self._executor.submit(self._run, job, func, args, kwargs)
+        logger.info(f"Queued job {job.id} ({name})")
+        return job
+
+    def get(self, job_id):
+        """Return a job by id (None if unknown)"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job, func, args, kwargs):
+        job.status = 'running'
+        try:
+            success, message = func(job, *args, **kwargs)
+        except Exception as e:
+            logger.error(f"Job {job.id} failed: {str(e)}")
+            success, message = False, str(e)
+        job._finish('done' if success else 'failed', message)
+        logger.info(f"Job {job.id} finished with status {job.status}")
+
+    def _prune(self):
+        """Drop the oldest finished jobs beyond MAX_FINISHED_JOBS"""
+        finished = [job for job in self._jobs.values() if job.finished_at is not None]
+        for job in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job.id]
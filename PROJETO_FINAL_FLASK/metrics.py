@@ -0,0 +1,253 @@
+import time
+import logging
+import inspect
+import functools
+import threading
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Limites (em segundos) dos histogramas de tempo
+TIME_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+# Limites (em bytes) dos histogramas de tamanho dos payloads
+BYTES_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+_registry = []
+_context = threading.local()
+
+
+def _escape(value):
+    """Escape a label value for the Prometheus text format"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_number(value):
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Base class of the metrics kept in the process-wide registry"""
+
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        """
+        Args:
+            name (str): Metric name
+            documentation (str): Text of the HELP line
+            labelnames (tuple): Names of the labels of each sample
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+        _registry.append(self)
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def clear(self):
+        """Drop every recorded sample"""
+        with self._lock:
+            self._values = {}
+
+    def render(self):
+        """Return the metric in the Prometheus text exposition format"""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+            lines.extend(self._render_samples(items))
+        return '\n'.join(lines)
+
+
+class Counter(_Metric):
+    """Monotonic counter"""
+
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        """Increment the counter of a label set"""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _render_samples(self, items):
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_number(value)}"
+            for key, value in items
+        ]
+
+
+class Histogram(_Metric):
+    """Histogram with cumulative buckets, sum and count"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=TIME_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+
+    def observe(self, value, **labels):
+        """Record one observation for a label set"""
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state['buckets'][i] += 1
+                    break
+            state['sum'] += value
+            state['count'] += 1
+
+    def _render_samples(self, items):
+        lines = []
+        for key, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, state['buckets']):
+                cumulative += count
+                le = f'le="{_format_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_number(state['sum'])}")
+            lines.append(f"{self.name}_count{labels} {state['count']}")
+        return lines
+
+
+# Métricas da aplicação
+HTTP_REQUEST_SECONDS = Histogram(
+    'http_request_duration_seconds', 'Time spent answering HTTP requests.', ('endpoint', 'method', 'status')
+)
+FUNCTION_SECONDS = Histogram(
+    'function_duration_seconds', 'Time spent in instrumented data functions.', ('function',)
+)
+SECTION_SECONDS = Histogram(
+    'section_render_duration_seconds', 'Time spent generating the charts of a dashboard section.', ('section',)
+)
+CHART_SECONDS = Histogram(
+    'chart_render_duration_seconds', 'Time spent in each chart builder call.', ('section', 'builder', 'chart')
+)
+CHART_ERRORS = Counter(
+    'chart_render_errors_total', 'Chart builders or section generators that raised.', ('section', 'builder')
+)
+PAYLOAD_BYTES = Histogram(
+    'chart_payload_bytes', 'Size of the serialized section payloads.', ('section',), buckets=BYTES_BUCKETS
+)
+SERIALIZED_BYTES = Counter(
+    'chart_serialized_bytes_total', 'Bytes of chart JSON serialized.', ('section',)
+)
+DATASET_CACHE_REQUESTS = Counter(
+    'dataset_cache_requests_total', 'Lookups of the in-memory dataset by result (hit, revalidated, miss).', ('result',)
+)
+DATASET_EVICTIONS = Counter(
+    'dataset_evictions_total', 'Datasets dropped from memory to keep the residency budget.', ('dataset',)
+)
+CHART_CACHE_REQUESTS = Counter(
+    'chart_cache_requests_total', 'Section payload lookups by result (hit, miss, filtered).', ('result',)
+)
+DATE_VALUES_COERCED = Counter(
+    'date_values_coerced_total', 'Date values that matched no declared format and were stored as missing.', ('column',)
+)
+
+
+def render_metrics():
+    """
+    Render every registered metric
+
+    Returns:
+        str: Prometheus text exposition format
+    """
+    return '\n'.join(metric.render() for metric in _registry) + '\n'
+
+
+def timed(name):
+    """
+    Decorator that records the duration of a function in FUNCTION_SECONDS
+
+    Args:
+        name (str): Value of the 'function' label
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                FUNCTION_SECONDS.observe(time.perf_counter() - start, function=name)
+        return wrapper
+    return decorator
+
+
+def timed_section(section):
+    """
+    Decorator for the generate_*_charts functions
+
+    Records the section duration and makes the section name available to
+    the chart builders called while it runs (see timed_chart).
+
+    Args:
+        section (str): Section name
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            previous = getattr(_context, 'section', None)
+            _context.section = section
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                CHART_ERRORS.inc(section=section, builder=func.__name__)
+                raise
+            finally:
+                SECTION_SECONDS.observe(time.perf_counter() - start, section=section)
+                _context.section = previous
+        return wrapper
+    return decorator
+
+
+def timed_chart(func):
+    """
+    Decorator for the create_* chart builders
+
+    The chart is identified by the builder 'title' argument (or the analyzed
+    column when there is no title) and by the section being generated.
+    """
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        section = getattr(_context, 'section', None) or 'none'
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            CHART_ERRORS.inc(section=section, builder=func.__name__)
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+        try:
+            bound = signature.bind_partial(*args, **kwargs).arguments
+            chart = bound.get('title') or bound.get('column') or bound.get('estado_column') or func.__name__
+        except TypeError:
+            chart = func.__name__
+        CHART_SECONDS.observe(elapsed, section=section, builder=func.__name__, chart=chart)
+        return result
+    return wrapper
@@ -0,0 +1,210 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+from fatec_comum.schema import multi_select_columns
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Perguntas de múltipla escolha (dtype 'multi_select' em schema.json): as opções
+# marcadas vêm juntas em um único texto.
+# Separador padrão das opções no export do Forms; exports antigos separavam por vírgula
+OPTION_SEPARATOR = ';'
+LEGACY_SEPARATOR = ','
+
+# Linhas por bloco no cálculo das coocorrências
+CO_OCCURRENCE_CHUNK = 65536
+
+
+def split_options(series, separator=OPTION_SEPARATOR):
+    """
+    Explode a multi-select column into (row, option) pairs
+
+    Only the distinct answers are split: respondents who marked the same
+    options share one parse. Options are stripped, empty ones (the trailing
+    separator) are dropped and an option repeated in an answer counts once.
+    Answers are split on the declared separator, or on LEGACY_SEPARATOR
+    when the column never uses it.
+
+    Args:
+        series (pd.Series): Column with the joined answers
+        separator (str): Separator of the marked options
+
+    Returns:
+        tuple: (options, rows, codes) with the options in order of first
+        appearance and, for every marked option, its row position and option code
+    """
+    codes, uniques = pd.factorize(series)
+    texts = [str(value) for value in uniques]
+    if not any(separator in text for text in texts):
+        separator = LEGACY_SEPARATOR
+
+    positions = {}
+    parsed = []
+    for text in texts:
+        marked = dict.fromkeys(option.strip() for option in text.split(separator))
+        marked.pop('', None)
+        parsed.append([positions.setdefault(option, len(positions)) for option in marked])
+
+    # Options of each distinct answer laid out back to back (answer -> offset, length)
+    lengths = np.array([len(answer) for answer in parsed] + [0], dtype=np.int64)
+    offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    flat = np.array([code for answer in parsed for code in answer], dtype=np.int64)
+
+    # Every row takes the options of its answer (code -1, missing answers, maps to the empty slot)
+    row_lengths = lengths[codes]
+    rows = np.repeat(np.arange(len(codes), dtype=np.int64), row_lengths)
+    starts = np.repeat(offsets[codes] - (np.cumsum(row_lengths) - row_lengths), row_lengths)
+    option_codes = flat[starts + np.arange(len(rows), dtype=np.int64)]
+
+    # Codes follow the first row that marks each option (as a Counter over the rows would)
+    options = np.array(list(positions), dtype=object)
+    first_seen = pd.unique(option_codes)
+    remap = np.empty(len(options), dtype=np.int64)
+    remap[first_seen] = np.arange(len(first_seen))
+    return options[first_seen].tolist(), rows, remap[option_codes]
+
+
+class OptionMatrix:
+    """
+    Sparse boolean indicator matrix (option x respondent) of a multi-select column
+
+    The matrix is kept in compressed sparse row form: row i lists, sorted,
+    the positions of the respondents who marked option i. Option
+    frequencies are row sums, filtered counts weight the entries with a row
+    mask, and co-occurrences are the product of the matrix by its
+    transpose, so charts never split the answers again.
+    """
+
+    def __init__(self, series, separator=None):
+        """
+        Args:
+            series (pd.Series): Column with the joined answers
+            separator (str): Separator of the marked options (the one
+                declared in the schema for the column if None)
+        """
+        if separator is None:
+            separator = multi_select_columns([series.name]).get(series.name) or OPTION_SEPARATOR
+        self.column = series.name
+        self.n_rows = len(series)
+        self.options, rows, codes = split_options(series, separator)
+
+        order = np.argsort(codes, kind='stable')
+        self.indices = rows[order]
+        self.indptr = np.concatenate(([0], np.cumsum(np.bincount(codes, minlength=len(self.options)))))
+        self._entry_options = codes[order]
+
+    @property
+    def nbytes(self):
+        """Memory of the sparse matrix arrays"""
+        return self.indices.nbytes + self.indptr.nbytes + self._entry_options.nbytes
+
+    def counts(self, mask=None):
+        """
+        Count the respondents who marked each option
+
+        Args:
+            mask (np.ndarray): Boolean mask of the selected rows (all rows if None)
+
+        Returns:
+            pd.Series: Counts of the options marked at least once, most
+            frequent first (ties in order of first appearance)
+        """
+        if mask is None:
+            counts = np.diff(self.indptr)
+        else:
+            counts = np.bincount(self._entry_options, weights=mask[self.indices], minlength=len(self.options))
+            counts = counts.astype(np.int64)
+        result = pd.Series(
+            counts,
+            index=pd.Index(self.options, dtype=object, name=self.column),
+            dtype='int64',
+            name='count'
+        )
+        result = result[result > 0]
+        return result.sort_values(ascending=False, kind='stable')
+
+    def respondents(self, mask=None):
+        """Number of (selected) respondents who marked at least one option"""
+        marked = np.zeros(self.n_rows, dtype=bool)
+        marked[self.indices] = True
+        if mask is not None:
+            marked &= mask
+        return int(marked.sum())
+
+    def co_occurrence(self, mask=None):
+        """
+        Count, for every pair of options, the respondents who marked both
+
+        The indicator matrix is densified block by block of rows
+        (CO_OCCURRENCE_CHUNK), keeping memory bounded, and each block adds
+        its product by its transpose. The diagonal holds the option counts.
+
+        Args:
+            mask (np.ndarray): Boolean mask of the selected rows (all rows if None)
+
+        Returns:
+            pd.DataFrame: Symmetric table of counts, options in order of first appearance
+        """
+        n_options = len(self.options)
+        entries = np.ones(len(self.indices), dtype=bool) if mask is None else mask[self.indices]
+        order = np.argsort(self.indices[entries], kind='stable')
+        rows = self.indices[entries][order]
+        options = self._entry_options[entries][order]
+
+        table = np.zeros((n_options, n_options), dtype=np.int64)
+        for start in range(0, self.n_rows, CO_OCCURRENCE_CHUNK):
+            size = min(CO_OCCURRENCE_CHUNK, self.n_rows - start)
+            first, last = np.searchsorted(rows, [start, start + size])
+            if first == last:
+                continue
+            block = np.zeros((n_options, size), dtype=np.float64)
+            block[options[first:last], rows[first:last] - start] = 1
+            table += np.rint(block @ block.T).astype(np.int64)
+
+        index = pd.Index(self.options, dtype=object, name=self.column)
+        return pd.DataFrame(table, index=index, columns=index.copy())
+
+
+class MultiSelectIndex:
+    """
+    Option matrices of the multi-select columns of a dataset
+
+    Built once per loaded dataset (see DatasetCache.get_derived); every
+    chart and filter reuses the exploded answers.
+    """
+
+    def __init__(self, df, columns=None):
+        """
+        Args:
+            df (pd.DataFrame): DataFrame with data
+            columns (dict): Multi-select column -> option separator (the
+                multi-select questions declared in the schema if None;
+                missing columns are skipped)
+        """
+        if columns is None:
+            columns = multi_select_columns(df.columns)
+        self.matrices = {}
+        for column, separator in columns.items():
+            if column in df.columns:
+                self.matrices[column] = OptionMatrix(df[column], separator)
+        logger.info(f"Multi-select index built for {len(self.matrices)} columns and {len(df)} rows")
+
+    @property
+    def nbytes(self):
+        """Memory of the option matrices"""
+        return sum(matrix.nbytes for matrix in self.matrices.values())
+
+    def is_indexed(self, column):
+        """Check if a column has an option matrix"""
+        return column in self.matrices
+
+    def option_counts(self, column, mask=None):
+        """Option counts of a column (see OptionMatrix.counts)"""
+        return self.matrices[column].counts(mask)
+
+    def co_occurrence(self, column, mask=None):
+        """Option co-occurrences of a column (see OptionMatrix.co_occurrence)"""
+        return self.matrices[column].co_occurrence(mask)
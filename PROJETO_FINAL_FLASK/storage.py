@@ -0,0 +1,584 @@
+import os
+import json
+import time
+import uuid
+import shutil
+import logging
+import threading
+import contextlib
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Localização dos arquivos da base de dados
+DATABASE_FOLDER = './database'
+DATASET_FILE = 'dados.parquet'
+
+# Cada gravação cria uma versão nova em snapshots/<versão>/ e CURRENT aponta
+# para a versão publicada; as versões antigas são removidas depois de KEEP_SNAPSHOTS
+SNAPSHOTS_FOLDER = 'snapshots'
+CURRENT_FILE = 'CURRENT'
+LOCK_FILE = '.lock'
+STAGING_SUFFIX = '.tmp'
+RESOLVED_SUFFIX = '.resolved'
+KEEP_SNAPSHOTS = 3
+
+# Formato legado (mantido apenas para importação/exportação)
+LEGACY_COLUMNS_FILE = 'colunas.csv'
+LEGACY_DATA_FILE = 'dados.json'
+
+_snapshot_lock = threading.RLock()
+
+
+@contextlib.contextmanager
+def snapshot_lock(database_folder=DATABASE_FOLDER):
+    """
+    Serialize changes to the published snapshot
+
+    Held while CURRENT is swapped, old snapshots are pruned or the dataset
+    is deleted. Threads of this process share a lock and other processes
+    are excluded with an advisory lock file where fcntl is available.
+    Readers never take it.
+    """
+    with _snapshot_lock:
+        if fcntl is None:
+            yield
+            return
+        os.makedirs(database_folder, exist_ok=True)
+        with open(os.path.join(database_folder, LOCK_FILE), 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def snapshots_folder(database_folder=DATABASE_FOLDER):
+    """Return the folder that holds one subfolder per dataset version"""
+    return os.path.join(database_folder, SNAPSHOTS_FOLDER)
+
+
+def current_version(database_folder=DATABASE_FOLDER):
+    """
+    Return the published dataset version
+
+    Returns:
+        str: Version name, or None if no snapshot was published
+    """
+    try:
+        with open(os.path.join(database_folder, CURRENT_FILE), 'r', encoding='utf-8') as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def dataset_path(database_folder=DATABASE_FOLDER, version=None):
+    """
+    Return the path of the columnar dataset file
+
+    Args:
+        database_folder (str): Folder where the dataset is stored
+        version (str): Snapshot version (the published one if None)
+
+    Returns:
+        str: Path inside the snapshot, or the flat database/dados.parquet
+        written before snapshots existed
+    """
+    version = version or current_version(database_folder)
+    if version is None:
+        return os.path.join(database_folder, DATASET_FILE)
+    return os.path.join(snapshots_folder(database_folder), version, DATASET_FILE)
+
+
+def snapshot_folder(database_folder=DATABASE_FOLDER, version=None):
+    """
+    Return the folder of a snapshot (the published one if version is None)
+
+    Returns:
+        str: Folder path, or None if no snapshot was published
+    """
+    version = version or current_version(database_folder)
+    if version is None:
+        return None
+    return os.path.join(snapshots_folder(database_folder), version)
+
+
+def _new_version():
+    """Name of a new snapshot (sortable by creation time)"""
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+
+def publish_snapshot(staging_folder, version, database_folder=DATABASE_FOLDER):
+    """
+    Make a fully written snapshot the current dataset
+
+    The staging folder is renamed to its final name and CURRENT is replaced
+    atomically, so readers see either the previous version or the new one.
+
+    Args:
+        staging_folder (str): Folder with the snapshot files
+        version (str): Version name
+        database_folder (str): Folder where the dataset is stored
+    """
+    with snapshot_lock(database_folder):
+        os.replace(staging_folder, os.path.join(snapshots_folder(database_folder), version))
+        tmp_path = os.path.join(database_folder, f"{CURRENT_FILE}{STAGING_SUFFIX}")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(version)
+        os.replace(tmp_path, os.path.join(database_folder, CURRENT_FILE))
+
+        # The dataset now lives in the snapshot; drop the pre-snapshot file
+        flat_path = os.path.join(database_folder, DATASET_FILE)
+        if os.path.exists(flat_path):
+            os.remove(flat_path)
+        prune_snapshots(database_folder)
+    logger.info(f"Published dataset version {version}")
+
+
+def prune_snapshots(database_folder=DATABASE_FOLDER, keep=KEEP_SNAPSHOTS):
+    """
+    Remove old snapshots, keeping the current one and the keep - 1 newest
+
+    Older versions are kept for a while so that readers that resolved them
+    just before a swap can still finish reading. Snapshots being written
+    (staging folders) are never removed.
+    """
+    folder = snapshots_folder(database_folder)
+    if not os.path.isdir(folder):
+        return
+    current = current_version(database_folder)
+    versions = sorted(name for name in os.listdir(folder) if not name.endswith(STAGING_SUFFIX))
+    for version in versions[:max(0, len(versions) - keep)]:
+        if version != current:
+            shutil.rmtree(os.path.join(folder, version), ignore_errors=True)
+
+
+def legacy_paths(database_folder=DATABASE_FOLDER):
+    """Return the paths of the legacy (colunas.csv, dados.json) pair"""
+    return (
+        os.path.join(database_folder, LEGACY_COLUMNS_FILE),
+        os.path.join(database_folder, LEGACY_DATA_FILE)
+    )
+
+
+def dataset_files(database_folder=DATABASE_FOLDER):
+    """Return every file that backs the stored dataset"""
+    return [
+        os.path.join(database_folder, CURRENT_FILE), dataset_path(database_folder)
+    ] + list(legacy_paths(database_folder))
+
+
+def dataset_exists(database_folder=DATABASE_FOLDER):
+    """Check if the columnar dataset has been written"""
+    return os.path.exists(dataset_path(database_folder))
+
+
+def legacy_exists(database_folder=DATABASE_FOLDER):
+    """Check if a legacy JSON dataset is available for import"""
+    return all(os.path.exists(path) for path in legacy_paths(database_folder))
+
+
+def dataset_schema(columns, date_columns=(), metadata=None):
+    """
+    Build the Arrow schema of the dataset
+
+    Args:
+        columns (list): Column names in file order
+        date_columns (iterable): Columns stored as timestamps
+        metadata (dict): Key/value pairs stored in the file footer
+
+    Returns:
+        pa.Schema: Schema with timestamp date columns and string columns otherwise
+    """
+    date_columns = set(date_columns)
+    return pa.schema([
+        pa.field(str(col), pa.timestamp('us') if col in date_columns else pa.string())
+        for col in columns
+    ], metadata={str(k): str(v) for k, v in (metadata or {}).items()})
+
+
+def _arrow_table(df, schema=None):
+    """
+    Convert a DataFrame into an Arrow table with explicit column types
+
+    Datetime columns are kept as timestamps and every other column is stored
+    as a string column, which Parquet dictionary-encodes on disk.
+
+    Args:
+        df (pd.DataFrame): DataFrame with data
+        schema (pa.Schema): Target schema (inferred from the dtypes if None)
+
+    Returns:
+        pa.Table: Arrow table with the same column order as the DataFrame
+    """
+    if schema is None:
+        date_columns = [col for col in df.columns if pd.api.types.is_datetime64_any_dtype(df[col])]
+        schema = dataset_schema(df.columns, date_columns)
+
+    arrays = []
+    for field in schema:
+        series = df[field.name]
+        if pa.types.is_timestamp(field.type):
+            array = pa.array(pd.to_datetime(series, errors='coerce'), from_pandas=True).cast(field.type)
+        else:
+            values = series.astype(object).where(series.notna(), None)
+            array = pa.array(
+                [v if v is None else str(v) for v in values], type=field.type
+            )
+        arrays.append(array)
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+class DatasetWriter:
+    """
+    Incremental writer of the columnar dataset
+
+    Batches are appended as Parquet row groups to a new snapshot folder,
+    which is published (see publish_snapshot) only when the writer is
+    closed successfully. Rows are keyed by ID; if an ID appears more than
+    once the last occurrence is kept, as in the legacy JSON dictionary.
+    Rows with a missing or blank key are always kept. Only the position of
+    each key is kept in memory: the replaced rows are dropped when the
+    writer is closed, by rewriting the file one row group at a time.
+    """
+
+    def __init__(self, columns, date_columns=(), database_folder=DATABASE_FOLDER, key='ID', metadata=None):
+        """
+        Args:
+            columns (list): Column names in file order
+            date_columns (iterable): Columns stored as timestamps
+            database_folder (str): Folder where the dataset is written
+            key (str): Column that identifies a row
+            metadata (dict): Key/value pairs stored in the file footer
+        """
+        self.database_folder = database_folder
+        self.version = _new_version()
+        self.staging_folder = os.path.join(snapshots_folder(database_folder), f"{self.version}{STAGING_SUFFIX}")
+        os.makedirs(self.staging_folder)
+        self.schema = dataset_schema(columns, date_columns, metadata)
+        self.path = os.path.join(self.staging_folder, DATASET_FILE)
+        self.key = key if key in columns else None
+        self.rows = 0
+        self.duplicates = 0
+        self._positions = {}
+        self._keyless = []
+        self._string_columns = [f.name for f in self.schema if pa.types.is_string(f.type)]
+        self._writer = pq.ParquetWriter(
+            self.path, self.schema, use_dictionary=self._string_columns, compression='snappy'
+        )
+
+    def write(self, df):
+        """
+        Append a batch of rows
+
+        Args:
+            df (pd.DataFrame): Batch with the writer columns
+        """
+        if df.empty:
+            return
+        if self.key:
+            self._track_keys(df[self.key].tolist())
+        self._writer.write_table(_arrow_table(df, self.schema))
+        self.rows += len(df)
+
+    def _track_keys(self, keys):
+        """Record the position of each keyed row, counting repeated keys"""
+        for offset, id_item in enumerate(keys):
+            if id_item is None or pd.isna(id_item) or not str(id_item).strip():
+                # Rows without a key cannot repeat one and are never dropped
+                self._keyless.append(self.rows + offset)
+                continue
+            id_item = str(id_item).strip()
+            if id_item in self._positions:
+                self.duplicates += 1
+            self._positions[id_item] = self.rows + offset
+
+    def write_table(self, table, dedupe=True):
+        """
+        Append rows that are already in Arrow format (e.g. from another snapshot)
+
+        Columns missing from the table are written as nulls.
+
+        Args:
+            table (pa.Table): Rows with a subset of the writer columns
+            dedupe (bool): If False, the rows are kept as they are, even if
+                their keys repeat (e.g. rows copied from the stored snapshot)
+        """
+        if table.num_rows == 0:
+            return
+        arrays = [
+            table.column(field.name).cast(field.type) if field.name in table.column_names
+            else pa.nulls(table.num_rows, field.type)
+            for field in self.schema
+        ]
+        table = pa.Table.from_arrays(arrays, schema=self.schema)
+        if self.key and dedupe:
+            self._track_keys(table.column(self.key).to_pylist())
+        else:
+            self._keyless.extend(range(self.rows, self.rows + table.num_rows))
+        self._writer.write_table(table)
+        self.rows += table.num_rows
+
+    def _drop_replaced_rows(self, on_resolved=None):
+        """
+        Rewrite the file without the rows whose key appears again later
+
+        The rows are filtered one row group at a time with a mask of the kept
+        positions, so memory does not grow with the size of the file.
+
+        Args:
+            on_resolved (callable): Called with (kept, dropped) Arrow tables
+                for every row group, e.g. to update counts built along the batches
+        """
+        keep = np.zeros(self.rows, dtype=bool)
+        keep[np.fromiter(self._positions.values(), dtype=np.int64, count=len(self._positions))] = True
+        keep[np.asarray(self._keyless, dtype=np.int64)] = True
+
+        resolved_path = f"{self.path}{RESOLVED_SUFFIX}"
+        start = 0
+        rows = 0
+        with pq.ParquetFile(self.path) as source, pq.ParquetWriter(
+            resolved_path, self.schema, use_dictionary=self._string_columns, compression='snappy'
+        ) as writer:
+            for i in range(source.num_row_groups):
+                table = source.read_row_group(i)
+                mask = pa.array(keep[start:start + table.num_rows])
+                start += table.num_rows
+                kept = table.filter(mask)
+                writer.write_table(kept)
+                rows += kept.num_rows
+                if on_resolved is not None:
+                    on_resolved(kept, table.filter(pc.invert(mask)))
+        os.replace(resolved_path, self.path)
+        self.rows = rows
+
+    def close(self, before_publish=None, on_resolved=None):
+        """
+        Finish the file and publish the snapshot as the current dataset
+
+        Args:
+            before_publish (callable): Called with the writer once the data
+                file is final, to add derived files to the snapshot folder
+            on_resolved (callable): Called with (kept, dropped) Arrow tables
+                for every row group when rows of repeated keys are dropped
+                (see _drop_replaced_rows)
+        """
+        self._writer.close()
+        if self.duplicates:
+            logger.warning(f"{self.duplicates} duplicated IDs found, keeping the last occurrence")
+            self._drop_replaced_rows(on_resolved)
+        if before_publish is not None:
+            before_publish(self)
+        publish_snapshot(self.staging_folder, self.version, self.database_folder)
+        logger.info(f"Dataset written with {self.rows} rows and {len(self.schema)} columns")
+
+    def abort(self):
+        """Discard the partially written snapshot"""
+        self._writer.close()
+        shutil.rmtree(self.staging_folder, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+def write_dataset(df, database_folder=DATABASE_FOLDER, metadata=None, before_publish=None, on_resolved=None):
+    """
+    Write the dataset to the columnar store
+
+    Args:
+        df (pd.DataFrame): DataFrame with data (index is not stored)
+        database_folder (str): Folder where the dataset is written
+        metadata (dict): Key/value pairs stored in the file footer
+        before_publish (callable): Called with the writer once the data file
+            is final, to add derived files to the snapshot (see DatasetWriter.close)
+        on_resolved (callable): Called for the rows kept and dropped when
+            duplicated IDs are resolved (see DatasetWriter.close)
+    """
+    date_columns = [col for col in df.columns if pd.api.types.is_datetime64_any_dtype(df[col])]
+    writer = DatasetWriter(list(df.columns), date_columns, database_folder, metadata=metadata)
+    try:
+        writer.write(df)
+        writer.close(before_publish=before_publish, on_resolved=on_resolved)
+    except Exception:
+        writer.abort()
+        raise
+
+
+def read_dataset(database_folder=DATABASE_FOLDER, columns=None, version=None):
+    """
+    Read the dataset from the columnar store
+
+    Args:
+        database_folder (str): Folder where the dataset is stored
+        columns (list): Columns to read (all columns if None)
+        version (str): Snapshot to read (the published one if None)
+
+    Returns:
+        pd.DataFrame: Dataset with the original column order
+    """
+    table = pq.read_table(dataset_path(database_folder, version), columns=columns)
+    return table.to_pandas()
+
+
+def iter_dataset_batches(database_folder=DATABASE_FOLDER, version=None, batch_size=65536):
+    """
+    Read the dataset in Arrow batches with bounded memory
+
+    Args:
+        database_folder (str): Folder where the dataset is stored
+        version (str): Snapshot to read (the published one if None)
+        batch_size (int): Maximum number of rows per batch
+
+    Yields:
+        pa.Table: Batch of rows
+    """
+    parquet_file = pq.ParquetFile(dataset_path(database_folder, version))
+    for batch in parquet_file.iter_batches(batch_size=batch_size):
+        yield pa.Table.from_batches([batch])
+
+
+def split_rows(table, column, keys):
+    """
+    Split Arrow rows by whether a column value is one of keys
+
+    Args:
+        table (pa.Table): Rows to split
+        column (str): Key column (no row matches if the table lacks it)
+        keys (list): Key values, as strings
+
+    Returns:
+        tuple: (rows without a matching key, rows with a matching key)
+    """
+    if column not in table.column_names:
+        return table, table.slice(0, 0)
+    matched = pc.fill_null(pc.is_in(table.column(column), value_set=pa.array(keys, type=pa.string())), False)
+    return table.filter(pc.invert(matched)), table.filter(matched)
+
+
+def read_dataset_columns(database_folder=DATABASE_FOLDER, version=None):
+    """Return the column names of the dataset, in file order"""
+    return pq.read_schema(dataset_path(database_folder, version)).names
+
+
+def read_dataset_rows(database_folder=DATABASE_FOLDER, version=None):
+    """Return the number of rows of the dataset (read from the file footer)"""
+    return pq.ParquetFile(dataset_path(database_folder, version)).metadata.num_rows
+
+
+def read_dataset_metadata(database_folder=DATABASE_FOLDER, version=None):
+    """
+    Read the key/value metadata stored with the dataset
+
+    Args:
+        database_folder (str): Folder where the dataset is stored
+        version (str): Snapshot to read (the published one if None)
+
+    Returns:
+        dict: Metadata as strings (empty if the file has none)
+    """
+    metadata = pq.read_schema(dataset_path(database_folder, version)).metadata or {}
+    return {k.decode('utf-8'): v.decode('utf-8') for k, v in metadata.items()}
+
+
+def delete_dataset(database_folder=DATABASE_FOLDER):
+    """
+    Remove every published snapshot and any legacy files
+
+    CURRENT is removed first, so readers stop seeing the dataset before its
+    files go away. Snapshots still being written are left to their writers.
+    """
+    with snapshot_lock(database_folder):
+        paths = [os.path.join(database_folder, CURRENT_FILE), os.path.join(database_folder, DATASET_FILE)]
+        for path in paths + list(legacy_paths(database_folder)):
+            if os.path.exists(path):
+                os.remove(path)
+
+        folder = snapshots_folder(database_folder)
+        if os.path.isdir(folder):
+            for name in os.listdir(folder):
+                if not name.endswith(STAGING_SUFFIX):
+                    shutil.rmtree(os.path.join(folder, name), ignore_errors=True)
+
+
+def import_legacy_json(database_folder=DATABASE_FOLDER):
+    """
+    Load a dataset stored in the legacy colunas.csv + dados.json format
+
+    Args:
+        database_folder (str): Folder with the legacy files
+
+    Returns:
+        pd.DataFrame: Dataset with the columns listed in colunas.csv
+    """
+    columns_path, data_path = legacy_paths(database_folder)
+
+    # Load column names from CSV
+    cols = pd.read_csv(columns_path).columns.tolist()
+
+    # Load data from JSON
+    with open(data_path, 'r', encoding='utf-8') as f:
+        json_data = json.load(f)
+
+    # Keep only rows consistent with the header
+    ids = []
+    rows = []
+    for id_item, valores in json_data.items():
+        if len(valores) == len(cols[1:]):
+            ids.append(id_item)
+            rows.append(valores)
+
+    df = pd.DataFrame(rows, columns=cols[1:], dtype=object)
+    df.insert(0, cols[0], ids)
+    df = df.replace({np.nan: None})
+
+    logger.info(f"Imported legacy dataset with {len(df)} rows")
+    return df
+
+
+def export_legacy_json(df, database_folder=DATABASE_FOLDER):
+    """
+    Write a dataset in the legacy colunas.csv + dados.json format
+
+    Args:
+        df (pd.DataFrame): DataFrame with data, 'ID' as first column or index
+        database_folder (str): Folder where the legacy files are written
+
+    Returns:
+        tuple: Paths of the written (colunas.csv, dados.json) files
+    """
+    if df.index.name == 'ID':
+        df = df.reset_index()
+
+    os.makedirs(database_folder, exist_ok=True)
+    columns_path, data_path = legacy_paths(database_folder)
+    columns = list(df.columns)
+
+    pd.DataFrame(columns=columns).to_csv(columns_path, index=False, encoding='utf-8')
+
+    resultado_json = {}
+    values = df[columns[1:]].astype(object).where(df[columns[1:]].notna(), None)
+    for id_item, dados in zip(df[columns[0]].astype(str), values.itertuples(index=False)):
+        resultado_json[id_item] = [v if v is None else str(v) for v in dados]
+
+    with open(data_path, 'w', encoding='utf-8') as json_file:
+        json.dump(resultado_json, json_file, ensure_ascii=False, indent=4)
+
+    return columns_path, data_path
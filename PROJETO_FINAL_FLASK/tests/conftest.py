@@ -0,0 +1,86 @@
+import os
+import sys
+import time
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fatec_comum.schema import get_schema  # noqa: E402
+
+RA = 'Informe o número do seu RA:'
+COURSE = get_schema().question('curso').header
+PERIOD = get_schema().question('periodo').header
+GENDER = get_schema().question('genero').header
+WORKS = get_schema().question('trabalha').header
+
+ADS = 'Análise e Desenvolvimento de Sistemas (ADS)'
+DSM = 'Desenvolvimento de Software Multiplataforma (DSM)'
+
+
+def make_responses(rows):
+    """Responses with the ID, RA and a few closed questions, one dict per row"""
+    return pd.DataFrame(rows, columns=['ID', RA, COURSE, PERIOD, GENDER, WORKS])
+
+
+def write_workbook(df, path):
+    df.to_excel(path, index=False)
+    return str(path)
+
+
+@pytest.fixture
+def database_folder(tmp_path):
+    folder = tmp_path / 'database'
+    folder.mkdir()
+    return str(folder)
+
+
+@pytest.fixture
+def responses():
+    return make_responses([
+        {'ID': 1, RA: 'RA001', COURSE: ADS, PERIOD: 'Noturno', GENDER: 'Feminino', WORKS: 'Sim'},
+        {'ID': 2, RA: 'RA002', COURSE: ADS, PERIOD: 'Matutino', GENDER: 'Masculino', WORKS: 'Não'},
+        {'ID': 3, RA: 'RA003', COURSE: DSM, PERIOD: 'Noturno', GENDER: 'Masculino', WORKS: 'Sim'},
+        {'ID': 4, RA: '', COURSE: DSM, PERIOD: 'Noturno', GENDER: 'Feminino', WORKS: 'Sim'},
+        {'ID': 5, RA: None, COURSE: ADS, PERIOD: 'Noturno', GENDER: 'Outro', WORKS: 'Não'},
+        {'ID': 6, RA: 'RA006', COURSE: 'ads', PERIOD: 'Matutino', GENDER: 'Feminino', WORKS: 'Sim'},
+        {'ID': 7, RA: 'RA007', COURSE: DSM, PERIOD: 'Matutino', GENDER: 'Masculino', WORKS: 'Não'},
+    ])
+
+
+def wait_for_job(client, job_id, timeout=30):
+    """Poll /jobs/<id> until the job is finished and return its state"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        state = client.get(f'/jobs/{job_id}').get_json()
+        if state['status'] in ('done', 'failed'):
+            return state
+        time.sleep(0.05)
+    raise AssertionError(f"Job {job_id} did not finish in {timeout}s")
+
+
+def edition(database_folder, term='2025-1', campus='Franca'):
+    """Catalog entry of a dataset folder (see catalog.DatasetCatalog)"""
+    return {'id': f"{campus.lower()}-{term}", 'campus': campus, 'term': term, 'path': database_folder}
+
+
+@pytest.fixture
+def flask_app(tmp_path, monkeypatch):
+    """The Flask app working on empty database and uploads folders under tmp_path"""
+    monkeypatch.chdir(tmp_path)
+    import app as app_module
+    from catalog import DatasetCatalog
+    from dataset_cache import DatasetPool
+    from data_processing import load_data
+    from storage import dataset_files
+
+    (tmp_path / 'database').mkdir(exist_ok=True)
+    (tmp_path / 'uploads').mkdir(exist_ok=True)
+    monkeypatch.setitem(app_module.app.config, 'UPLOAD_FOLDER', str(tmp_path / 'uploads'))
+    monkeypatch.setitem(app_module.app.config, 'TESTING', True)
+    monkeypatch.setattr(app_module, 'dataset_catalog', DatasetCatalog())
+    monkeypatch.setattr(
+        app_module, 'dataset_pool', DatasetPool(load_data, dataset_files, app_module.app.config['DATASET_MEMORY_MB'] << 20)
+    )
+    return app_module
@@ -0,0 +1,62 @@
+import logging
+
+import pandas as pd
+
+from fatec_comum.ages import add_age_columns, age_columns, age_bin_counts
+from fatec_comum.schema import get_schema
+
+BIRTH = get_schema().question('nascimento').header
+CONCLUSION = get_schema().question('conclusao').header
+
+
+def test_ages_without_completion_date_are_empty(caplog):
+    df = pd.DataFrame({
+        CONCLUSION: ['3/22/25 9:07:42', '', '22/03/2025 09:07'],
+        BIRTH: ['3/8/2000', '3/8/2000', '3/8/2000'],
+    })
+    with caplog.at_level(logging.WARNING):
+        add_age_columns(df)
+
+    age_col, _ = age_columns(BIRTH)
+    assert df[age_col].iloc[0] == 25
+    # Blank and undeclared formats are not replaced by today's date
+    assert df[age_col].iloc[1:].isna().all()
+    assert "2 rows without a valid" in caplog.text
+
+
+def test_ages_without_completion_column_are_empty(caplog):
+    df = pd.DataFrame({BIRTH: ['3/8/2000']})
+    with caplog.at_level(logging.WARNING):
+        add_age_columns(df)
+
+    age_col, bin_col = age_columns(BIRTH)
+    assert df[age_col].isna().all() and df[bin_col].isna().all()
+    assert "No survey completion column" in caplog.text
+
+
+def test_age_is_measured_at_the_completion_date():
+    df = pd.DataFrame({
+        CONCLUSION: ['2025-03-22 09:07:42'] * 4 + ['3/22/25 9:07:42'],
+        BIRTH: ['2000-03-22', '2000-03-23', '1990-01-01', '31/12/1999', '3/8/1975'],
+    })
+    add_age_columns(df)
+
+    age_col, _ = age_columns(BIRTH)
+    # Birthday on the completion day counts, the day after does not; day-first dates are not declared
+    assert df[age_col].tolist()[:3] == [25, 24, 35]
+    assert pd.isna(df[age_col].iloc[3])
+    assert df[age_col].iloc[4] == 50
+
+
+def test_bins_keep_empty_ranges_for_filtered_rows():
+    df = pd.DataFrame({
+        CONCLUSION: ['2025-03-22 09:07:42'] * 3,
+        BIRTH: ['2000-03-22', '2000-03-23', '1975-03-08'],
+    })
+    add_age_columns(df)
+
+    expected = ['20-24', '25-29', '30-34', '35-39', '40-44', '45-49', '50-54']
+    assert age_bin_counts(df, BIRTH).tolist() == [1, 1, 0, 0, 0, 0, 1]
+    filtered = age_bin_counts(df.iloc[:2], BIRTH)
+    assert filtered.index.tolist() == expected
+    assert filtered.tolist() == [1, 1, 0, 0, 0, 0, 0]
@@ -0,0 +1,57 @@
+import os
+
+from conftest import write_workbook, wait_for_job
+from storage import dataset_exists
+
+
+def upload(client, prefix, responses, tmp_path):
+    """Upload the responses into a dataset and wait for the job to finish"""
+    with open(write_workbook(responses, tmp_path / 'base.xlsx'), 'rb') as f:
+        response = client.post(f'{prefix}/upload', data={'file': (f, 'base.xlsx')}, content_type='multipart/form-data')
+    return wait_for_job(client, response.headers['Location'].rstrip('/').rsplit('/', 1)[-1])
+
+
+def test_register_and_list_datasets(flask_app):
+    client = flask_app.app.test_client()
+    response = client.post('/datasets', json={'id': 'franca-2025-1', 'campus': 'Franca', 'term': '2025-1'})
+    assert response.status_code == 201
+    assert os.path.isdir(response.get_json()['path'])
+
+    assert client.post('/datasets', json={'id': 'franca-2025-1', 'campus': 'Franca', 'term': '2025-1'}).status_code == 400
+    assert client.post('/datasets', json={'id': 'Franca!', 'campus': 'Franca', 'term': '2025-1'}).status_code == 400
+    assert client.post('/datasets', json={'id': 'franca-2025-3', 'campus': 'Franca', 'term': '2025-3'}).status_code == 400
+
+    listing = client.get('/datasets').get_json()
+    assert [entry['id'] for entry in listing['datasets']] == ['default', 'franca-2025-1']
+    assert all(entry['resident_bytes'] == 0 for entry in listing['datasets'])
+    assert listing['memory_budget_bytes'] == flask_app.dataset_pool.max_bytes
+
+
+def test_describe_default_dataset(flask_app):
+    client = flask_app.app.test_client()
+    response = client.patch('/datasets/default', json={'campus': ' Franca ', 'term': '2024-2'})
+    assert response.status_code == 200
+    assert (response.get_json()['campus'], response.get_json()['term']) == ('Franca', '2024-2')
+    assert client.patch('/datasets/default', json={'term': '24-2'}).status_code == 400
+    assert client.patch('/datasets/desconhecida', json={'term': '2024-2'}).status_code == 404
+
+
+def test_datasets_are_kept_apart_and_removed(flask_app, responses, tmp_path):
+    client = flask_app.app.test_client()
+    entry = client.post('/datasets', json={'id': 'franca-2025-1', 'campus': 'Franca', 'term': '2025-1'}).get_json()
+
+    state = upload(client, '/datasets/franca-2025-1', responses, tmp_path)
+    assert state['status'] == 'done', state['message']
+    assert client.get('/datasets/franca-2025-1/get_charts?sections=visao_geral').status_code == 200
+    resident = {item['id']: item for item in client.get('/datasets').get_json()['datasets']}
+    assert resident['franca-2025-1']['rows'] == len(responses)
+    assert resident['franca-2025-1']['resident_bytes'] > 0
+    # The default dataset got nothing
+    assert resident['default']['resident_bytes'] == 0
+    assert not dataset_exists('database')
+
+    assert client.delete('/datasets/default').status_code == 400
+    assert client.delete('/datasets/franca-2025-1').get_json() == {'removed': 'franca-2025-1'}
+    assert not os.path.exists(entry['path'])
+    assert 'franca-2025-1' not in flask_app.dataset_pool.residency()
+    assert client.get('/datasets/franca-2025-1/get_charts').status_code == 404
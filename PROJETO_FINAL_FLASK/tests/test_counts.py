@@ -0,0 +1,43 @@
+import pytest
+
+from conftest import PERIOD, GENDER, WORKS, write_workbook
+from aggregates import CountCube
+from bitmap_index import BitmapIndex, FilteredFrame
+from storage import snapshot_folder
+from data_processing import process_excel_file, load_data
+
+FILTERS = [
+    {},
+    {'curso': ['ADS']},
+    {'curso': ['Sistemas']},
+    {'curso': ['Sistemas', 'DSM'], 'genero': ['Feminino']},
+    {'periodo': ['Noturno'], 'genero': ['Feminino', 'Outro']},
+    {'curso': ['XYZ']},
+]
+
+
+@pytest.fixture
+def loaded(database_folder, responses, tmp_path):
+    ok, message = process_excel_file(write_workbook(responses, tmp_path / 'base.xlsx'), database_folder=database_folder)
+    assert ok, message
+    df = load_data(database_folder)
+    return df, BitmapIndex(df), CountCube.load(snapshot_folder(database_folder))
+
+
+@pytest.mark.parametrize('filters', FILTERS)
+@pytest.mark.parametrize('column', [PERIOD, GENDER, WORKS])
+def test_cube_bitmap_and_rows_agree(loaded, filters, column):
+    df, index, cube = loaded
+    resolved = {name: [v for query in queries for v in index.resolve_values(name, query)] for name, queries in filters.items()}
+
+    mask = True
+    for name, values in resolved.items():
+        mask = mask & df[index.columns[name]].isin(values)
+    rows = df[mask] if filters else df
+    expected = rows[column].astype(str).str.strip().value_counts()
+    expected = expected[expected > 0].to_dict()
+
+    filtered = FilteredFrame(df, index, index.filter(filters))
+    assert len(filtered) == len(rows)
+    assert filtered.column_counts(column).to_dict() == expected
+    assert cube.series(column, resolved or None).to_dict() == expected
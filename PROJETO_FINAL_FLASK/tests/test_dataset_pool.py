@@ -0,0 +1,62 @@
+from conftest import RA
+from bitmap_index import BitmapIndex
+from dataset_cache import DatasetPool
+
+
+class Block:
+    """Derived structure of a fixed size"""
+
+    def __init__(self, nbytes):
+        self.nbytes = nbytes
+
+
+def make_pool(frames, max_bytes):
+    pool = DatasetPool(lambda folder: frames[folder], lambda folder: [], max_bytes)
+    return pool, {name: pool.cache(name, name) for name in frames}
+
+
+def test_pool_evicts_least_recently_used(responses):
+    frames = {name: responses.copy() for name in 'abc'}
+    frame_bytes = int(responses.memory_usage(deep=True).sum())
+    pool = DatasetPool(lambda folder: frames[folder], lambda folder: [], 2 * frame_bytes)
+    # Each request marks its dataset as used (as the app does) before reading it
+    pool.cache('a', 'a').get()
+    pool.cache('b', 'b').get()
+    pool.cache('a', 'a').get()
+    pool.cache('c', 'c').get()
+    assert list(pool.residency()) == ['a', 'c']
+
+    # Evicted datasets load again on the next request
+    assert pool.cache('b', 'b').get() is frames['b']
+    assert list(pool.residency()) == ['c', 'b']
+
+
+def test_pool_counts_derived_structures(responses):
+    frames = {'a': responses.copy(), 'b': responses.copy()}
+    frame_bytes = int(responses.memory_usage(deep=True).sum())
+    pool, caches = make_pool(frames, max_bytes=3 * frame_bytes)
+    caches['a'].get()
+    caches['b'].get()
+    assert set(pool.residency()) == {'a', 'b'}
+
+    # The structure alone fits in the budget, but not with both frames
+    caches['b'].get_derived('index', lambda df: Block(frame_bytes + 1))
+    assert pool.residency() == {'b': 2 * frame_bytes + 1}
+
+
+def test_pool_counts_bitmap_codes_built_by_requests(responses):
+    frames = {'a': responses.copy(), 'b': responses.copy()}
+    pool, caches = make_pool(frames, max_bytes=10 ** 9)
+    caches['a'].get()
+    df, derived = caches['b'].get_with_derived({'bitmap_index': BitmapIndex})
+    before = caches['b'].nbytes
+
+    index = derived['bitmap_index']
+    # Counts of a column without bitmaps keep its codes in the index
+    index.value_counts(RA, index.all_rows(), df[RA])
+    assert caches['b'].nbytes > before
+
+    # The next request finds the grown index over the budget and evicts the other dataset
+    pool.max_bytes = caches['b'].nbytes
+    caches['b'].get_with_derived({'bitmap_index': BitmapIndex})
+    assert list(pool.residency()) == ['b']
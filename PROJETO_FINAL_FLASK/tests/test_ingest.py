@@ -0,0 +1,82 @@
+import os
+
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from conftest import RA, PERIOD, ADS, DSM, COURSE, GENDER, WORKS, make_responses, write_workbook
+from aggregates import CountCube
+from storage import DatasetWriter, dataset_exists, dataset_path, iter_dataset_batches, read_dataset, snapshot_folder
+from text_index import TextIndex, TEXT_COLUMN
+from data_processing import iter_excel_batches, process_excel_file
+
+
+def responses_with_repeated_ids():
+    """Responses where IDs 1 and 3 are answered again in later batches"""
+    df = make_responses([
+        {'ID': 1, RA: 'RA001', COURSE: ADS, PERIOD: 'Noturno', GENDER: 'Feminino', WORKS: 'Sim'},
+        {'ID': 2, RA: 'RA002', COURSE: ADS, PERIOD: 'Matutino', GENDER: 'Masculino', WORKS: 'Não'},
+        {'ID': 3, RA: 'RA003', COURSE: DSM, PERIOD: 'Noturno', GENDER: 'Masculino', WORKS: 'Sim'},
+        {'ID': 1, RA: 'RA001', COURSE: ADS, PERIOD: 'Matutino', GENDER: 'Feminino', WORKS: 'Não'},
+        {'ID': 4, RA: 'RA004', COURSE: DSM, PERIOD: 'Noturno', GENDER: 'Outro', WORKS: 'Sim'},
+        {'ID': 3, RA: 'RA003', COURSE: DSM, PERIOD: 'Matutino', GENDER: 'Masculino', WORKS: 'Não'},
+        {'ID': 5, RA: 'RA005', COURSE: ADS, PERIOD: 'Noturno', GENDER: 'Feminino', WORKS: 'Sim'},
+    ])
+    df[TEXT_COLUMN] = [
+        'Quero trabalhar com tecnologia', 'Sonho em viajar', 'Minha família', 'Quero ser professora',
+        'Formar e crescer', 'Sonhos de carreira', 'Estudar sempre'
+    ]
+    return df
+
+
+def test_repeated_ids_are_resolved_by_row_group(database_folder, tmp_path):
+    df = responses_with_repeated_ids()
+    ok, message = process_excel_file(
+        write_workbook(df, tmp_path / 'base.xlsx'), batch_size=2, database_folder=database_folder
+    )
+    assert ok, message
+
+    # Batches stay separate row groups, without the replaced rows
+    assert pq.ParquetFile(dataset_path(database_folder)).num_row_groups == 4
+    stored = read_dataset(database_folder)
+    assert stored['ID'].tolist() == ['2', '1', '4', '3', '5']
+    assert stored[PERIOD].tolist() == ['Matutino', 'Matutino', 'Noturno', 'Matutino', 'Noturno']
+
+    # The cube and the text index built along the batches match the final rows
+    cube = CountCube.load(snapshot_folder(database_folder))
+    assert cube.series(PERIOD).to_dict() == {'Matutino': 3, 'Noturno': 2}
+    assert cube.series(WORKS).to_dict() == {'Não': 3, 'Sim': 2}
+    index = TextIndex.load(snapshot_folder(database_folder))
+    assert index.term_counts().to_dict() == TextIndex.build(stored).term_counts().to_dict()
+    assert [respondent for respondent, _ in index.search('professora')] == ['1']
+    assert index.search('tecnologia') == []
+
+
+def test_excel_is_read_in_bounded_batches(responses, tmp_path):
+    df = pd.concat([responses.iloc[:3], pd.DataFrame([[None] * len(responses.columns)], columns=responses.columns),
+                    responses.iloc[3:]], ignore_index=True)
+    batches = list(iter_excel_batches(write_workbook(df, tmp_path / 'base.xlsx'), batch_size=3))
+
+    # The blank row is skipped and every value is read as text
+    assert [len(batch) for batch in batches] == [3, 3, 1]
+    assert pd.concat(batches)['ID'].tolist() == [str(i) for i in range(1, 8)]
+    assert batches[1][RA].tolist() == [None, None, 'RA006']
+
+
+def test_writer_publishes_only_when_closed(database_folder, responses):
+    columns = list(responses.columns)
+    with DatasetWriter(columns, database_folder=database_folder) as writer:
+        for start in range(0, len(responses), 3):
+            writer.write(responses.iloc[start:start + 3])
+        assert not dataset_exists(database_folder)
+
+    # Each batch is a row group, streamed back in bounded batches
+    assert pq.ParquetFile(dataset_path(database_folder)).num_row_groups == 3
+    assert [len(batch) for batch in iter_dataset_batches(database_folder, batch_size=2)] == [2, 2, 2, 1]
+
+    with pytest.raises(RuntimeError):
+        with DatasetWriter(columns, database_folder=database_folder) as writer:
+            writer.write(responses.iloc[:3])
+            raise RuntimeError('falha na leitura')
+    assert not os.path.exists(writer.staging_folder)
+    assert read_dataset(database_folder)['ID'].tolist() == [str(i) for i in range(1, 8)]
@@ -0,0 +1,70 @@
+import os
+
+from conftest import write_workbook, wait_for_job
+from jobs import Job, JobQueue, UPLOAD_STAGES
+from storage import dataset_exists
+
+
+def test_upload_succeeds_when_precompute_fails(flask_app, responses, tmp_path, monkeypatch):
+    def broken_precompute(*args, **kwargs):
+        raise RuntimeError('sem memória')
+
+    monkeypatch.setattr(flask_app, 'precompute_charts', broken_precompute)
+    upload_path = write_workbook(responses, tmp_path / 'uploads' / 'base.xlsx')
+    job = Job('base.xlsx', UPLOAD_STAGES)
+
+    success, message = flask_app.process_upload(job, upload_path)
+
+    assert success, message
+    assert dataset_exists('./database')
+    assert not os.path.exists(upload_path)
+    assert job.to_dict()['warnings'] == [
+        "Os gráficos não foram pré-calculados; eles serão gerados ao abrir o dashboard"
+    ]
+    # The dashboard builds the charts on demand
+    response = flask_app.app.test_client().get('/get_charts?sections=visao_geral')
+    assert response.status_code == 200
+    assert 'visao_geral' in response.get_json()
+
+
+def test_queue_reports_progress_and_result():
+    def work(job, total):
+        for done in range(1, total + 1):
+            job.update('read', done=done, total=total)
+        job.update('read', finished=True)
+        return True, 'ok'
+
+    queue = JobQueue()
+    job = queue.submit('teste', work, 3, stages=('read', 'write'))
+    queue._executor.shutdown(wait=True)
+
+    state = queue.get(job.id).to_dict()
+    assert state['status'] == 'done' and state['message'] == 'ok'
+    assert state['progress'] == 1.0
+    assert state['stages']['read'] == {'status': 'done', 'done': 3, 'total': 3}
+
+
+def test_queue_marks_raising_jobs_as_failed():
+    def broken(job):
+        raise RuntimeError('arquivo corrompido')
+
+    queue = JobQueue()
+    job = queue.submit('teste', broken)
+    queue._executor.shutdown(wait=True)
+
+    assert job.status == 'failed' and job.message == 'arquivo corrompido'
+    assert queue.get('desconhecido') is None
+
+
+def test_upload_is_followed_through_the_jobs_api(flask_app, responses, tmp_path):
+    client = flask_app.app.test_client()
+    with open(write_workbook(responses, tmp_path / 'base.xlsx'), 'rb') as f:
+        response = client.post('/upload', data={'file': (f, 'base.xlsx')}, content_type='multipart/form-data')
+    assert response.status_code == 302
+    job_id = response.headers['Location'].rstrip('/').rsplit('/', 1)[-1]
+
+    state = wait_for_job(client, job_id)
+    assert state['status'] == 'done', state['message']
+    assert state['name'] == 'base.xlsx'
+    assert all(stage['status'] == 'done' for stage in state['stages'].values())
+    assert client.get('/jobs/desconhecido').status_code == 404
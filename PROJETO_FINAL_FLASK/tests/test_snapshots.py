@@ -0,0 +1,41 @@
+import os
+
+from conftest import PERIOD, edition
+from aggregates import CountCube, CUBE_FILE
+from storage import DatasetWriter, export_legacy_json, read_dataset, snapshot_folder
+from text_index import TEXT_INDEX_FILE
+from data_processing import standardize_values, migrate_standardization
+from trends import question_trend
+
+
+def assert_snapshot_complete(database_folder):
+    folder = snapshot_folder(database_folder)
+    assert os.path.exists(os.path.join(folder, CUBE_FILE))
+    assert os.path.exists(os.path.join(folder, TEXT_INDEX_FILE))
+    assert CountCube.load(folder) is not None
+
+
+def test_migrate_publishes_cube_for_trends(database_folder, responses):
+    # Snapshot written before the standardization version and the cube were stored
+    with DatasetWriter(list(responses.columns), database_folder=database_folder) as writer:
+        writer.write(responses.astype({'ID': str}))
+
+    ok, message = migrate_standardization(database_folder=database_folder)
+    assert ok, message
+    assert_snapshot_complete(database_folder)
+
+    trend = question_trend([edition(database_folder)], 'periodo')
+    expected = standardize_values(responses)[PERIOD].value_counts()
+    assert trend.loc['2025-1'].to_dict() == expected.to_dict()
+
+
+def test_legacy_import_publishes_cube_for_trends(database_folder, responses):
+    export_legacy_json(responses.astype({'ID': str}), database_folder)
+
+    ok, message = migrate_standardization(database_folder=database_folder)
+    assert ok, message
+    assert_snapshot_complete(database_folder)
+    assert len(read_dataset(database_folder)) == len(responses)
+
+    trend = question_trend([edition(database_folder)], 'periodo', filters={'curso': ['Sistemas']})
+    assert trend.loc['2025-1'].to_dict() == {'Matutino': 1, 'Noturno': 2}
@@ -0,0 +1,45 @@
+import pytest
+
+from text_index import TextIndex
+
+ANSWERS = {
+    1: 'Quero ajudar minha família e empreender',
+    2: 'Meu sonho é a pós-graduação',
+    3: 'Minhas famílias',
+    4: 'Empreendedorismo é meu sonho, minha família',
+    5: 'Família, minha prioridade',
+}
+
+
+@pytest.fixture
+def index():
+    text_index = TextIndex('sonhos')
+    text_index.add(ANSWERS.keys(), ANSWERS.values())
+    return text_index
+
+
+def test_phrase_needs_the_words_in_sequence(index):
+    # Plurals and accents do not matter, the order of the words does
+    assert [respondent for respondent, _ in index.search('"minha família"')] == ['1', '3', '4']
+    assert index.search('"família minha"') == [('5', 1)]
+
+
+def test_prefix_expands_to_every_term(index):
+    assert index.expand_prefix('empreend') == ['empreendedorismo', 'empreender']
+    assert [respondent for respondent, _ in index.search('Empreend*')] == ['1', '4']
+
+
+def test_clauses_must_all_match(index):
+    assert index.search('familia sonho') == [('4', 2)]
+    assert index.search('pós-graduação') == [('2', 1)]
+    assert index.search('família', ids=[3, 5]) == [('3', 1), ('5', 1)]
+    with pytest.raises(ValueError):
+        index.search(' ... ')
+
+
+def test_loaded_index_answers_the_same(index, tmp_path):
+    index.save(tmp_path)
+    loaded = TextIndex.load(tmp_path)
+    for query in ('"minha família"', 'empreend*', 'sonho'):
+        assert loaded.search(query) == index.search(query)
+    assert loaded.term_counts().to_dict() == index.term_counts().to_dict()
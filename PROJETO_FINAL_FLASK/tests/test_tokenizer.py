@@ -0,0 +1,29 @@
+import pytest
+
+from fatec_comum.tokenizer import Tokenizer
+
+
+@pytest.mark.parametrize('word, term', [
+    ('sonhos', 'sonho'),
+    ('país', 'pais'),
+    ('ações', 'acao'),
+    ('profissões', 'profissao'),
+    ('jovens', 'jovem'),
+    ('animais', 'animal'),
+    ('papéis', 'papel'),
+    ('lápis', 'lapis'),
+])
+def test_terms_are_folded_singulars(word, term):
+    assert Tokenizer().term(word) == term
+
+
+def test_stopwords_are_left_out_of_the_counts():
+    tokenizer = Tokenizer()
+    assert tokenizer.tokenize(['Meus sonhos são viajar e ter uma casa']) == [['sonho', 'viajar', 'casa']]
+    # Singular and plural count together, shown with the most frequent spelling
+    assert tokenizer.frequencies(['Sonhos, sonho, sonhos', 'de da do']) == {'sonhos': 3}
+
+
+def test_ngrams_skip_stopwords_but_not_answers():
+    counts = Tokenizer().ngram_counts(['quero viajar pelo mundo', 'viajar pelo mundo é meu sonho'], n=(2, 3))
+    assert counts.to_dict() == {'viajar mundo': 2, 'mundo sonho': 1, 'viajar mundo sonho': 1}
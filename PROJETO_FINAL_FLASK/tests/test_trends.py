@@ -0,0 +1,29 @@
+import pytest
+
+from conftest import edition, write_workbook
+from storage import delete_dataset
+from data_processing import process_excel_file
+from trends import question_trend
+
+
+def test_trend_filters_match_like_dashboard(database_folder, responses, tmp_path):
+    ok, message = process_excel_file(write_workbook(responses, tmp_path / 'base.xlsx'), database_folder=database_folder)
+    assert ok, message
+    datasets = [edition(database_folder)]
+
+    assert question_trend(datasets, 'periodo', filters={'curso': ['ads']}).equals(
+        question_trend(datasets, 'periodo', filters={'curso': ['ADS', 'XYZ']})
+    )
+    with pytest.raises(ValueError):
+        question_trend(datasets, 'periodo', filters={'curso': ['XYZ']})
+    with pytest.raises(ValueError):
+        question_trend(datasets, 'periodo', filters={'cidade': ['Franca']})
+
+    # Terms keep their row when the filters leave no answers
+    trend = question_trend(datasets, 'periodo', filters={'curso': ['DSM'], 'genero': ['Outro']})
+    assert trend.index.tolist() == ['2025-1']
+    assert trend.to_numpy().sum() == 0
+
+    # Editions without a published snapshot are left out
+    delete_dataset(database_folder)
+    assert question_trend(datasets, 'periodo').empty
@@ -0,0 +1,116 @@
+import pandas as pd
+import pyarrow as pa
+
+from conftest import RA, PERIOD, ADS, DSM, COURSE, GENDER, WORKS, make_responses, write_workbook
+from storage import DatasetWriter, read_dataset
+from data_processing import process_excel_file, load_data
+
+
+def test_writer_keeps_keyless_rows_and_last_duplicate(database_folder):
+    df = pd.DataFrame({'ID': ['1', '2', '', None, '1', ' 2 '], 'value': ['a', 'b', 'c', 'd', 'e', 'f']})
+    with DatasetWriter(list(df.columns), database_folder=database_folder) as writer:
+        writer.write(df.iloc[:3])
+        writer.write(df.iloc[3:])
+
+    stored = read_dataset(database_folder)
+    assert writer.duplicates == 2
+    assert stored['value'].tolist() == ['c', 'd', 'e', 'f']
+
+
+def test_writer_keeps_copied_rows_without_dedupe(database_folder):
+    table = pa.table({'ID': ['1', '1', None], 'value': ['a', 'b', 'c']})
+    with DatasetWriter(['ID', 'value'], database_folder=database_folder) as writer:
+        writer.write_table(table, dedupe=False)
+        writer.write(pd.DataFrame({'ID': ['2', '2'], 'value': ['d', 'e']}))
+
+    assert read_dataset(database_folder)['value'].tolist() == ['a', 'b', 'c', 'e']
+
+
+def test_upsert_keeps_stored_rows_with_blank_ra(database_folder, responses, tmp_path):
+    ok, message = process_excel_file(write_workbook(responses, tmp_path / 'base.xlsx'), database_folder=database_folder)
+    assert ok, message
+
+    late = make_responses([
+        {'ID': 8, RA: 'RA008', COURSE: DSM, PERIOD: 'Noturno', GENDER: 'Feminino', WORKS: 'Sim'},
+    ])
+    ok, message = process_excel_file(
+        write_workbook(late, tmp_path / 'late.xlsx'), mode='upsert', key='RA', database_folder=database_folder
+    )
+    assert ok, message
+    assert message.startswith('1 respostas adicionadas e 0 atualizadas (8 no total)')
+    stored = read_dataset(database_folder)
+    assert len(stored) == 8
+    assert stored['ID'].astype(str).tolist().count('4') == 1
+    assert stored['ID'].astype(str).tolist().count('5') == 1
+
+    # The same file again updates the response instead of adding it
+    ok, message = process_excel_file(
+        write_workbook(late, tmp_path / 'late.xlsx'), mode='upsert', key='RA', database_folder=database_folder
+    )
+    assert ok, message
+    assert message.startswith('0 respostas adicionadas e 1 atualizadas (8 no total)')
+
+
+def test_upsert_with_blank_and_duplicate_keys(database_folder, responses, tmp_path):
+    # Two stored responses share RA006
+    responses.loc[responses['ID'] == 7, RA] = 'RA006'
+    ok, message = process_excel_file(write_workbook(responses, tmp_path / 'base.xlsx'), database_folder=database_folder)
+    assert ok, message
+
+    late = make_responses([
+        {'ID': 2, RA: 'RA002', COURSE: ADS, PERIOD: 'Noturno', GENDER: 'Masculino', WORKS: 'Sim'},
+        {'ID': 9, RA: '', COURSE: ADS, PERIOD: 'Noturno', GENDER: 'Masculino', WORKS: 'Sim'},
+        {'ID': 10, RA: 'RA010', COURSE: DSM, PERIOD: 'Matutino', GENDER: 'Feminino', WORKS: 'Não'},
+        {'ID': 11, RA: 'RA010', COURSE: DSM, PERIOD: 'Noturno', GENDER: 'Feminino', WORKS: 'Não'},
+    ])
+    ok, message = process_excel_file(
+        write_workbook(late, tmp_path / 'late.xlsx'), mode='upsert', key='RA', database_folder=database_folder
+    )
+    assert ok, message
+    assert message.startswith('1 respostas adicionadas e 1 atualizadas (8 no total)')
+    assert "1 respostas sem ID ou sem 'Informe o número do seu RA:' foram ignoradas" in message
+
+    stored = read_dataset(database_folder).set_index('ID')
+    stored.index = stored.index.astype(str)
+    # Stored rows without a key and rows sharing a key are left alone
+    assert set(stored.index) == {'1', '2', '3', '4', '5', '6', '7', '11'}
+    assert stored.loc['2', PERIOD] == 'Noturno'
+    # The last response of a repeated key wins
+    assert stored.loc['11', PERIOD] == 'Noturno'
+    # Responses without a key are not added
+    assert '9' not in stored.index
+    assert sorted(ra for ra in stored[RA].dropna() if ra.strip()) == ['RA001', 'RA002', 'RA003', 'RA006', 'RA006', 'RA010']
+
+
+def test_upsert_dedupes_stripped_keys(database_folder, responses, tmp_path):
+    ok, message = process_excel_file(write_workbook(responses, tmp_path / 'base.xlsx'), database_folder=database_folder)
+    assert ok, message
+
+    late = make_responses([
+        {'ID': 10, RA: ' RA010', COURSE: DSM, PERIOD: 'Matutino', GENDER: 'Feminino', WORKS: 'Não'},
+        {'ID': 11, RA: 'RA010 ', COURSE: DSM, PERIOD: 'Noturno', GENDER: 'Feminino', WORKS: 'Não'},
+    ])
+    ok, message = process_excel_file(
+        write_workbook(late, tmp_path / 'late.xlsx'), mode='upsert', key='RA', database_folder=database_folder
+    )
+    assert ok, message
+    assert message.startswith('1 respostas adicionadas e 0 atualizadas (8 no total)')
+    assert 'ignoradas' not in message
+
+
+def test_upsert_rejects_id_of_another_response(database_folder, responses, tmp_path):
+    ok, message = process_excel_file(write_workbook(responses, tmp_path / 'base.xlsx'), database_folder=database_folder)
+    assert ok, message
+
+    # ID 1 is stored with RA001
+    late = make_responses([
+        {'ID': 1, RA: 'RA009', COURSE: DSM, PERIOD: 'Noturno', GENDER: 'Feminino', WORKS: 'Sim'},
+    ])
+    ok, message = process_excel_file(
+        write_workbook(late, tmp_path / 'late.xlsx'), mode='upsert', key='RA', database_folder=database_folder
+    )
+    assert not ok
+    assert 'os IDs 1 já pertencem a outras respostas salvas' in message
+    df = load_data(database_folder)
+    assert len(df) == len(responses)
+    assert df.index.is_unique
@@ -0,0 +1,330 @@
+import os
+import re
+import sys
+import json
+import logging
+
+import numpy as np
+import pandas as pd
+
+from fatec_comum.tokenizer import Tokenizer, TOKENIZER_VERSION, fold_accents
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Pergunta aberta indexada para a busca e a contagem de palavras
+TEXT_COLUMN = 'Escreva algumas linhas sobre sua história e seus sonhos de vida'
+
+# Arquivo com o índice invertido gravado dentro de cada snapshot da base
+TEXT_INDEX_FILE = 'text_index.json'
+
+# Palavras de uma consulta: frases entre aspas ou termos soltos (prefixos terminam em *)
+_QUERY_PATTERN = re.compile(r'"([^"]*)"|(\S+)')
+
+
+class TextIndex:
+    """
+    Inverted index of the words of an open-ended question
+
+    Words are reduced to terms by the Portuguese tokenizer (lowercase,
+    without accents, singular: Sonhos, sonho -> 'sonho'). Every term has a
+    posting list with the respondents (by ID) whose answer contains it and
+    the positions where it appears. Stopwords are indexed too, so phrases
+    keep their positions, but left out of the term counts. Postings are
+    kept in flat arrays, compressed sparse row style: term_ptr delimits the
+    postings of each term and post_ptr the positions of each posting. Term
+    counts are sums over the postings (restricted to some respondents by a
+    mask over the documents), phrases are matched on consecutive positions
+    and prefixes on the sorted vocabulary.
+
+    Terms are numbered in order of first appearance, so ties in the term
+    counts keep that order, as a Counter over the answers would.
+    """
+
+    def __init__(self, column=TEXT_COLUMN):
+        """
+        Args:
+            column (str): Name of the indexed column
+        """
+        self.column = column
+        self.tokenizer = Tokenizer()
+        self.documents = []
+        self._doc_ids = {}
+        self._postings = {}
+        self._spellings = {}
+        self._arrays = None
+        self._nbytes = None
+
+    @property
+    def nbytes(self):
+        """Approximate memory of the postings and of the term and document lookups"""
+        if self._nbytes is None:
+            arrays = self._freeze()
+            size = sum(value.nbytes for value in arrays.values() if isinstance(value, np.ndarray))
+            size += sum(sys.getsizeof(term) for term in arrays['terms']) + sys.getsizeof(arrays['term_ids'])
+            size += sum(sys.getsizeof(label) for label in arrays['labels'])
+            size += sum(sys.getsizeof(respondent) for respondent in self.documents) + sys.getsizeof(self._doc_ids)
+            # Postings of an index built with add are kept next to the packed arrays
+            size += sum(
+                sys.getsizeof(docs) + sum(sys.getsizeof(positions) for positions in docs.values())
+                for docs in self._postings.values()
+            )
+            self._nbytes = size
+        return self._nbytes
+
+    def add(self, ids, texts):
+        """
+        Index a batch of answers
+
+        Answers of an ID that is already indexed are ignored; when a file
+        has duplicated IDs the index is built again from the rows kept by
+        the writer (see data_processing._snapshot_indexes).
+
+        Args:
+            ids (iterable): Respondent IDs
+            texts (iterable): Answers, in the same order
+        """
+        ids = list(ids)
+        for respondent, words in zip(ids, self.tokenizer.words(texts)):
+            if not words or pd.isna(respondent):
+                continue
+            respondent = str(respondent)
+            if respondent in self._doc_ids:
+                continue
+            doc = self._doc_ids[respondent] = len(self.documents)
+            self.documents.append(respondent)
+            for position, word in enumerate(words):
+                term = self.tokenizer.term(word)
+                self._postings.setdefault(term, {}).setdefault(doc, []).append(position)
+                spellings = self._spellings.setdefault(term, {})
+                spellings[word] = spellings.get(word, 0) + 1
+        self._arrays = None
+        self._nbytes = None
+
+    @classmethod
+    def build(cls, df, column=TEXT_COLUMN, id_column='ID'):
+        """
+        Index the answers of a DataFrame (IDs from id_column or the index)
+
+        Returns:
+            TextIndex: Index of the column (empty if the column is missing)
+        """
+        index = cls(column)
+        if column in df.columns:
+            ids = df[id_column] if id_column in df.columns else df.index
+            index.add(ids, df[column])
+        return index
+
+    def _freeze(self):
+        """Pack the postings into flat arrays (done once after the last add)"""
+        if self._arrays is not None:
+            return self._arrays
+        terms = list(self._postings)
+        term_ptr = [0]
+        post_doc, post_ptr, positions = [], [0], []
+        for term in terms:
+            for doc, term_positions in self._postings[term].items():
+                post_doc.append(doc)
+                positions.extend(term_positions)
+                post_ptr.append(len(positions))
+            term_ptr.append(len(post_doc))
+        self._arrays = self._pack(
+            terms,
+            # Terms are shown with their most frequent spelling
+            [max(self._spellings[term].items(), key=lambda item: item[1])[0] for term in terms],
+            term_ptr, post_doc, post_ptr, positions
+        )
+        return self._arrays
+
+    def _pack(self, terms, labels, term_ptr, post_doc, post_ptr, positions):
+        """Arrays of the packed postings, plus the lookups used by the queries"""
+        return {
+            'terms': terms,
+            'labels': labels,
+            'content': np.array([self.tokenizer.is_content(term) for term in terms], dtype=bool),
+            'term_ids': {term: i for i, term in enumerate(terms)},
+            'sorted_terms': np.array(sorted(terms), dtype=object),
+            'term_ptr': np.array(term_ptr, dtype=np.int64),
+            'post_doc': np.array(post_doc, dtype=np.int64),
+            'post_ptr': np.array(post_ptr, dtype=np.int64),
+            'positions': np.array(positions, dtype=np.int64)
+        }
+
+    def document_mask(self, ids):
+        """
+        Boolean mask over the indexed documents
+
+        Args:
+            ids (iterable): Respondent IDs to select
+
+        Returns:
+            np.ndarray: True for the documents of the given IDs
+        """
+        mask = np.zeros(len(self.documents), dtype=bool)
+        docs = [self._doc_ids[str(respondent)] for respondent in ids if str(respondent) in self._doc_ids]
+        mask[docs] = True
+        return mask
+
+    def term_counts(self, mask=None):
+        """
+        Count the occurrences of every term, stopwords left out
+
+        Args:
+            mask (np.ndarray): Documents to count (see document_mask); all if None
+
+        Returns:
+            pd.Series: Occurrences per term, indexed by its most frequent
+            spelling, most frequent first (ties in order of first
+            appearance), terms that do not occur left out
+        """
+        arrays = self._freeze()
+        occurrences = np.diff(arrays['post_ptr'])
+        if mask is not None:
+            occurrences = occurrences * mask[arrays['post_doc']]
+        post_term = np.repeat(np.arange(len(arrays['terms'])), np.diff(arrays['term_ptr']))
+        counts = np.bincount(post_term, weights=occurrences, minlength=len(arrays['terms'])).astype(np.int64)
+        result = pd.Series(counts, index=pd.Index(arrays['labels'], dtype=object, name=self.column), name='count')
+        result = result[(result > 0) & arrays['content']]
+        return result.sort_values(ascending=False, kind='stable')
+
+    def _term_postings(self, term):
+        """Documents and positions of a term: {doc: np.ndarray of positions}"""
+        arrays = self._freeze()
+        term_id = arrays['term_ids'].get(term)
+        if term_id is None:
+            return {}
+        start, end = arrays['term_ptr'][term_id], arrays['term_ptr'][term_id + 1]
+        post_ptr = arrays['post_ptr']
+        return {
+            int(arrays['post_doc'][i]): arrays['positions'][post_ptr[i]:post_ptr[i + 1]]
+            for i in range(start, end)
+        }
+
+    def expand_prefix(self, prefix):
+        """Indexed terms starting with a prefix, in alphabetical order"""
+        sorted_terms = self._freeze()['sorted_terms']
+        start = np.searchsorted(sorted_terms, prefix, side='left')
+        end = np.searchsorted(sorted_terms, prefix + '\uffff', side='left')
+        return sorted_terms[start:end].tolist()
+
+    def _terms(self, text):
+        """Terms of the words of a query text, in order"""
+        return [self.tokenizer.term(word) for word in self.tokenizer.words([text])[0]]
+
+    def _match_word(self, word):
+        """{doc: hits} of a word, or of every term it prefixes if it ends with * (None if empty)"""
+        if word.endswith('*'):
+            prefix = fold_accents(''.join(self.tokenizer.words([word[:-1]])[0]))
+            if not prefix:
+                return None
+            terms = self.expand_prefix(prefix)
+        else:
+            terms = self._terms(word)
+            if len(terms) != 1:
+                # Punctuation only (skipped) or joined words such as 'pós-graduação' (a phrase)
+                return self._match_phrase(word)
+        hits = {}
+        for term in terms:
+            for doc, positions in self._term_postings(term).items():
+                hits[doc] = hits.get(doc, 0) + len(positions)
+        return hits
+
+    def _match_phrase(self, phrase):
+        """{doc: hits} of the documents with the words of a phrase in sequence (None if empty)"""
+        terms = self._terms(phrase)
+        if not terms:
+            return None
+        postings = [self._term_postings(term) for term in terms]
+        docs = set(postings[0])
+        for term_postings in postings[1:]:
+            docs &= set(term_postings)
+        hits = {}
+        for doc in docs:
+            # Phrase starts: positions of the first word followed by every other word at its offset
+            starts = postings[0][doc]
+            for offset, term_postings in enumerate(postings[1:], start=1):
+                starts = starts[np.isin(starts + offset, term_postings[doc])]
+            if len(starts):
+                hits[doc] = len(starts)
+        return hits
+
+    def search(self, query, ids=None, limit=None):
+        """
+        Find the answers matching a query
+
+        The query is a list of clauses that must all match: words, prefixes
+        ending with * (e.g. 'empreend*') and phrases between double quotes
+        (e.g. '"minha família"'). Words go through the same tokenizer as the
+        answers, so accents and plurals do not matter; prefixes are matched
+        against the terms without accents.
+
+        Args:
+            query (str): Query string
+            ids (iterable): Only search the answers of these respondents (all if None)
+            limit (int): Maximum number of results (all if None)
+
+        Returns:
+            list: (respondent ID, hits) pairs, most hits first (ties in index order)
+        """
+        clauses = []
+        for phrase, word in _QUERY_PATTERN.findall(query):
+            matches = self._match_phrase(phrase) if phrase else self._match_word(word)
+            if matches is not None:
+                clauses.append(matches)
+        if not clauses:
+            raise ValueError("Consulta vazia")
+
+        docs = set(clauses[0])
+        for matches in clauses[1:]:
+            docs &= set(matches)
+        if ids is not None:
+            docs &= set(np.flatnonzero(self.document_mask(ids)).tolist())
+        ranked = sorted(docs, key=lambda doc: (-sum(matches[doc] for matches in clauses), doc))
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [(self.documents[doc], sum(matches[doc] for matches in clauses)) for doc in ranked]
+
+    def save(self, folder):
+        """Write the index to TEXT_INDEX_FILE inside a snapshot folder"""
+        arrays = self._freeze()
+        data = {
+            'column': self.column,
+            'tokenizer': TOKENIZER_VERSION,
+            'documents': self.documents,
+            'terms': arrays['terms'],
+            'labels': arrays['labels'],
+            'term_ptr': arrays['term_ptr'].tolist(),
+            'post_doc': arrays['post_doc'].tolist(),
+            'post_ptr': arrays['post_ptr'].tolist(),
+            'positions': arrays['positions'].tolist()
+        }
+        with open(os.path.join(folder, TEXT_INDEX_FILE), 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+
+    @classmethod
+    def load(cls, folder):
+        """
+        Read the index stored in a snapshot folder
+
+        The stored postings are already packed: a loaded index is queried,
+        not extended with add.
+
+        Returns:
+            TextIndex: Stored index, or None if the snapshot has none or it
+            was built with another version of the tokenizer
+        """
+        try:
+            with open(os.path.join(folder, TEXT_INDEX_FILE), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        if data.get('tokenizer') != TOKENIZER_VERSION:
+            return None
+
+        index = cls(data['column'])
+        index.documents = data['documents']
+        index._doc_ids = {respondent: doc for doc, respondent in enumerate(index.documents)}
+        index._arrays = index._pack(
+            data['terms'], data['labels'], data['term_ptr'], data['post_doc'], data['post_ptr'], data['positions']
+        )
+        return index
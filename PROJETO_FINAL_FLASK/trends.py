@@ -0,0 +1,179 @@
+import logging
+from functools import lru_cache
+
+import pandas as pd
+
+from aggregates import CountCube, CUBE_DIMENSIONS
+from bitmap_index import FILTER_COLUMNS, match_values
+from storage import current_version, snapshot_folder
+from fatec_comum.schema import get_schema
+from data_processing import standardize_values, declared_categories
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=64)
+def _load_cube(folder, version):
+    """Count cube of a snapshot (snapshots never change, so each is read once)"""
+    return CountCube.load(snapshot_folder(folder, version=version))
+
+
+@lru_cache(maxsize=1024)
+def _aligned_labels(header, labels):
+    """
+    Map the labels of a question to the current standardized form
+
+    Editions stored with older standardization rules (or older form
+    wording) are aligned by running their labels through standardize_values
+    under the canonical header of the question.
+
+    Returns:
+        dict: Stored label -> aligned label
+    """
+    standardized = standardize_values(pd.DataFrame({header: pd.Series(labels, dtype=object)}))[header]
+    return {label: str(value).strip() for label, value in zip(labels, standardized)}
+
+
+def edition_cubes(datasets):
+    """
+    Load the stored count cube of each survey edition
+
+    Only cube.json of the published snapshot is read: no row of any
+    edition is loaded. Editions without a term or without a stored cube
+    are skipped.
+
+    Args:
+        datasets (list): Catalog entries (see catalog.DatasetCatalog.list)
+
+    Returns:
+        list: (entry, CountCube) pairs ordered by term and campus
+    """
+    cubes = []
+    for entry in datasets:
+        if not entry.get('term'):
+            continue
+        version = current_version(entry['path'])
+        cube = _load_cube(entry['path'], version) if version else None
+        if cube is None:
+            logger.warning(f"Dataset {entry['id']} has no stored count cube, left out of the trends")
+            continue
+        cubes.append((entry, cube))
+    return sorted(cubes, key=lambda item: (item[0]['term'], item[0]['campus'] or '', item[0]['id']))
+
+
+def _edition_counts(cube, question_id, filters, matched=None):
+    """
+    Aligned answer counts of a question in one edition
+
+    Filter values are matched against the aligned labels of the edition
+    as the dashboard filters are (see bitmap_index.match_values).
+
+    Args:
+        cube (CountCube): Stored cube of the edition
+        question_id (str): Question id in the schema
+        filters (dict): Cube dimension -> query strings (OR within a filter)
+        matched (set): Receives the (dimension, query) pairs that matched
+            some label of the edition
+
+    Returns:
+        dict: Aligned answer -> count (None if the edition did not count the question)
+    """
+    schema = get_schema()
+    column = schema.resolve(cube.cells).get(question_id)
+    if column is None:
+        return None
+    header = schema.question(question_id).header
+    answers = _aligned_labels(header, tuple(cube.values[column]))
+
+    # Dimension values are aligned too, so filters match across editions
+    positions = []
+    for name, accepted in (filters or {}).items():
+        if name not in cube.dimensions:
+            return None
+        dimension_header = schema.question(FILTER_COLUMNS[name]).header
+        labels = tuple(dict.fromkeys(key[list(cube.dimensions).index(name) + 1] for key in cube.cells[column]))
+        aligned = _aligned_labels(dimension_header, labels)
+        distinct = list(dict.fromkeys(aligned.values()))
+        selected = set()
+        for query in accepted:
+            values = set(match_values(distinct, query))
+            if values and matched is not None:
+                matched.add((name, query))
+            selected.update(label for label, value in aligned.items() if value in values)
+        positions.append((list(cube.dimensions).index(name) + 1, selected))
+
+    counts = {}
+    for key, count in cube.cells[column].items():
+        if all(key[position] in matching for position, matching in positions):
+            answer = answers[key[0]]
+            counts[answer] = counts.get(answer, 0) + count
+    return counts
+
+
+# Função para calcular a série histórica de uma pergunta
+def question_trend(datasets, question_id, filters=None, campus=None):
+    """
+    Count the answers of a closed question in every stored survey edition
+
+    Editions of the same term (several campuses) are summed. Answers are
+    aligned across editions through the standardization rules, and follow
+    the declared options of the question, then other answers by total count.
+
+    Args:
+        datasets (list): Catalog entries
+        question_id (str): Question id in the schema (e.g. 'periodo', 'bens.notebook')
+        filters (dict): Cube dimension (see aggregates.CUBE_DIMENSIONS) -> accepted values
+        campus (str): Only the editions of this campus (all campuses if None)
+
+    Returns:
+        pd.DataFrame: Counts with one row per term and one column per answer
+
+    Raises:
+        KeyError: If the question is not declared in the schema
+        ValueError: If a filter is not a cube dimension, or one of its
+            values matches no answer in any edition
+    """
+    question = get_schema().question(question_id)
+    unknown = [name for name in (filters or {}) if name not in CUBE_DIMENSIONS]
+    if unknown:
+        raise ValueError(f"Filtro indisponível para as tendências: {', '.join(unknown)}")
+
+    rows = {}
+    matched = set()
+    for entry, cube in edition_cubes(datasets):
+        if campus is not None and (entry['campus'] or '').casefold() != campus.casefold():
+            continue
+        counts = _edition_counts(cube, question_id, filters, matched)
+        if counts is None:
+            continue
+        term = rows.setdefault(entry['term'], {})
+        for answer, count in counts.items():
+            term[answer] = term.get(answer, 0) + count
+
+    # A filter matches when any of its values (OR) matches an answer of some edition
+    unmatched = [
+        f"{name}={'|'.join(queries)}" for name, queries in (filters or {}).items()
+        if not any((name, query) in matched for query in queries)
+    ]
+    if rows and unmatched:
+        raise ValueError(f"Filtro sem correspondência nas edições: {', '.join(unmatched)}")
+
+    # Terms keep their row even when the filters leave no answers
+    trend = pd.DataFrame.from_dict(rows, orient='index').reindex(sorted(rows)).fillna(0).astype('int64')
+    trend.index.name = 'term'
+    declared = declared_categories([question.header]).get(question.header, [])
+    others = trend.sum().sort_values(ascending=False, kind='stable').index
+    order = [answer for answer in declared if answer in trend.columns]
+    return trend[order + [answer for answer in others if answer not in order]]
+
+
+def trend_shares(trend):
+    """
+    Share (%) of each answer among the answers of each term
+
+    Returns:
+        pd.DataFrame: Percentages with the same shape as the counts
+    """
+    totals = trend.sum(axis=1)
+    return trend.div(totals.where(totals > 0), axis=0).mul(100).round(1)
@@ -1,27 +1,22 @@
 import pandas as pd
 import numpy as np
 import json
-from collections import Counter
-import re
 import logging
 import datetime
+from metrics import timed_chart, timed_section
+from multiselect import OptionMatrix
+from text_index import TextIndex
+from fatec_comum.tokenizer import Tokenizer
+from fatec_comum.ages import age_bin_counts
+from durations import response_durations, duration_stats, duration_bin_counts
+from trends import trend_shares
+from fatec_comum.schema import question_column, multi_select_columns
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 
-# Helper function to clean text (for word clouds and text analysis)
-def clean_text(text):
-    """Clean text for word cloud and analysis"""
-    if not isinstance(text, str):
-        return ""
-    
-    # Remove special characters and extra spaces
-    text = re.sub(r'[^\w\s]', ' ', text)
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text.lower()
-
 # Helper function to standardize values in a Series
 def standardize_series(series):
     """
@@ -31,8 +26,239 @@ def standardize_series(series):
         return series.astype(str).str.strip()
     return series
 
+# Helper function to count the values of a column
+def count_values(df, column, standardize=True):
+    """
+    Count the values of a column, most frequent first
+
+    Filtered views (bitmap_index.FilteredFrame) answer from their bitmap
+    index; a regular DataFrame is counted directly. Categorical columns only
+    report the categories that occur.
+
+    Args:
+        df (pd.DataFrame): DataFrame (or filtered view) with data
+        column (str): Name of column to count
+        standardize (bool): If True, strips the values before counting
+
+    Returns:
+        pd.Series: Counts indexed by value
+    """
+    if hasattr(df, 'column_counts'):
+        return df.column_counts(column, standardize)
+    series = df[column]
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Count over the integer codes; unused categories are dropped and ties keep the form order
+        counts = series.value_counts(sort=False)
+        counts = counts[counts > 0].sort_values(ascending=False, kind='stable')
+        counts.index = pd.Index(counts.index.astype(object), name=counts.index.name)
+        return counts
+    if standardize:
+        series = standardize_series(series)
+    return series.value_counts()
+
+# Helper function to count the options of a multi-select column
+def count_options(df, column):
+    """
+    Count the options marked in a multi-select column, most frequent first
+
+    Views built with the multi-select index of the dataset (see SharedCounts)
+    answer from its option matrices; otherwise the column is exploded here.
+
+    Args:
+        df (pd.DataFrame): DataFrame (or filtered view) with data
+        column (str): Name of the multi-select column
+
+    Returns:
+        pd.Series: Respondents per option
+    """
+    if hasattr(df, 'option_counts'):
+        return df.option_counts(column)
+    return OptionMatrix(df[column]).counts()
+
+# Helper function to count the pairs of options marked together
+def count_co_occurrence(df, column):
+    """
+    Count, for every pair of options of a multi-select column, the respondents who marked both
+
+    Args:
+        df (pd.DataFrame): DataFrame (or filtered view) with data
+        column (str): Name of the multi-select column
+
+    Returns:
+        pd.DataFrame: Symmetric option x option table (option counts on the diagonal)
+    """
+    if hasattr(df, 'option_co_occurrence'):
+        return df.option_co_occurrence(column)
+    return OptionMatrix(df[column]).co_occurrence()
+
+# Helper function to count the words of an open-ended column
+def count_terms(df, column):
+    """
+    Count the words of the answers of an open-ended column, most frequent first
+
+    Views built with the inverted index of the dataset (see SharedCounts)
+    read the counts from its posting lists; otherwise the answers are
+    indexed here.
+
+    Args:
+        df (pd.DataFrame): DataFrame (or filtered view) with data
+        column (str): Name of the open-ended column
+
+    Returns:
+        pd.Series: Occurrences per word
+    """
+    if hasattr(df, 'term_counts'):
+        return df.term_counts(column)
+    series = df[column]
+    index = TextIndex(column)
+    index.add(series.index, series)
+    return index.term_counts()
+
+# Função para contar as respostas de um bloco de perguntas em grade (escala Likert)
+def count_grid(df, columns, levels=None):
+    """
+    Count the answers of a block of grid columns in one vectorized pass
+    
+    Every column is factorized once (categoricals already are) and read in
+    a single bincount over its integer codes; the counts of its distinct
+    answers are then mapped to the levels. Each answer is visited once,
+    instead of one comparison scan per level and column.
+    
+    Args:
+        df (pd.DataFrame): DataFrame (or filtered view) with data
+        columns (list): Grid columns (missing ones are skipped)
+        levels (list): Answers to count, in order; other answers are
+            ignored. If None, every observed answer is counted, sorted.
+    
+    Returns:
+        pd.DataFrame: Counts with one row per level and one column per item
+    """
+    columns = [col for col in columns if col in df.columns]
+    factorized = []
+    for col in columns:
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            factorized.append((series.cat.codes.to_numpy(), series.cat.categories))
+        else:
+            factorized.append(pd.factorize(series))
+    if levels is None:
+        levels = sorted({value for _, uniques in factorized for value in uniques}, key=str)
+    levels = list(levels)
+    positions = {level: i for i, level in enumerate(levels)}
+    
+    table = np.zeros((len(levels), len(columns)), dtype=np.int64)
+    for j, (column_codes, uniques) in enumerate(factorized):
+        # Rows per distinct answer (slot 0 collects missing answers), then answers -> levels
+        occurrences = np.bincount(column_codes + 1, minlength=len(uniques) + 1)
+        lookup = np.array([0] + [positions.get(value, -1) + 1 for value in uniques], dtype=np.int64)
+        table[:, j] = np.bincount(lookup, weights=occurrences, minlength=len(levels) + 1)[1:]
+    return pd.DataFrame(table, index=pd.Index(levels, dtype=object), columns=columns)
+
+# Visão do DataFrame que reaproveita contagens entre gráficos e seções
+class SharedCounts:
+    """
+    Wrap a DataFrame (or filtered view) and memoize count_values
+
+    Sections that chart the same column (course, gender, work...) share one
+    count when they are generated together. The memoized Series are shared
+    between builders and must not be modified.
+
+    A view of the count cube stored with the dataset (aggregates.CubeView)
+    can be given, restricted to the same rows as the DataFrame; it answers
+    the categorical columns without counting them again. The multi-select
+    index of the whole dataset (multiselect.MultiSelectIndex) answers the
+    option counts, restricted to the rows of a filtered view by its mask,
+    and its inverted index of the open-ended answers (text_index.TextIndex)
+    answers the word counts.
+    """
+
+    def __init__(self, df, aggregates=None, options=None, text_index=None):
+        self._df = df
+        self._aggregates = aggregates
+        self._options = options
+        self._text_index = text_index
+        self._counts = {}
+
+    @property
+    def columns(self):
+        return self._df.columns
+
+    def __len__(self):
+        return len(self._df)
+
+    @property
+    def empty(self):
+        return len(self) == 0
+
+    @property
+    def attrs(self):
+        return getattr(self._df, 'attrs', {})
+
+    def __getitem__(self, key):
+        return self._df[key]
+
+    def column_counts(self, column, standardize=True):
+        """Value counts of a column, computed once per wrapper"""
+        key = (column, standardize)
+        if key not in self._counts:
+            counts = None
+            if self._aggregates is not None and isinstance(self._df[column].dtype, pd.CategoricalDtype):
+                counts = self._aggregates.series(column)
+            if counts is None:
+                counts = count_values(self._df, column, standardize)
+            self._counts[key] = counts
+        return self._counts[key]
+
+    def _row_mask(self):
+        """Boolean mask of the rows of a filtered view, or None for the whole dataset"""
+        # Filtered views (bitmap_index.FilteredFrame) expose their rows as a boolean mask
+        mask = getattr(self._df, 'mask', None)
+        return mask if isinstance(mask, np.ndarray) else None
+
+    def _option_mask(self, column):
+        """Row mask for the multi-select index (None for all rows), or False if not indexed"""
+        if self._options is None or not self._options.is_indexed(column):
+            return False
+        return self._row_mask()
+
+    def option_counts(self, column):
+        """Option counts of a multi-select column, computed once per wrapper"""
+        key = (column, 'options')
+        if key not in self._counts:
+            mask = self._option_mask(column)
+            if mask is False:
+                self._counts[key] = OptionMatrix(self._df[column]).counts()
+            else:
+                self._counts[key] = self._options.option_counts(column, mask)
+        return self._counts[key]
+
+    def option_co_occurrence(self, column):
+        """Option co-occurrences of a multi-select column"""
+        mask = self._option_mask(column)
+        if mask is False:
+            return OptionMatrix(self._df[column]).co_occurrence()
+        return self._options.co_occurrence(column, mask)
+
+    def term_counts(self, column):
+        """Word counts of an open-ended column, computed once per wrapper"""
+        key = (column, 'terms')
+        if key not in self._counts:
+            if self._text_index is None or self._text_index.column != column:
+                series = self._df[column]
+                index = TextIndex(column)
+                index.add(series.index, series)
+                self._counts[key] = index.term_counts()
+            elif self._row_mask() is None:
+                self._counts[key] = self._text_index.term_counts()
+            else:
+                # Respondents of the filtered view (the dataset is indexed by ID)
+                mask = self._text_index.document_mask(self._df[column].index)
+                self._counts[key] = self._text_index.term_counts(mask)
+        return self._counts[key]
+
 # Função para criar gráfico de barras com Highcharts
-def create_bar_chart(df, column, title, color_seq='Viridis', horizontal=True):
+@timed_chart
+def create_bar_chart(df, column, title, color_seq='Viridis', horizontal=True, multiple=None):
     """
     Creates a bar chart configuration for Highcharts
     
@@ -42,6 +268,8 @@ def create_bar_chart(df, column, title, color_seq='Viridis', horizontal=True):
         title (str): Chart title
         color_seq (str): Color sequence (not directly used in Highcharts but kept for compatibility)
         horizontal (bool): If True, creates a horizontal bar chart
+        multiple (bool): If True, the column is multi-select and each option is
+            counted (as declared in schema.json if None)
     
     Returns:
         dict: Highcharts configuration
@@ -51,12 +279,12 @@ def create_bar_chart(df, column, title, color_seq='Viridis', horizontal=True):
             logger.warning(f"Column {column} not found in DataFrame")
             return None
         
-        # Make sure we're working with clean data
-        df_clean = df.copy()
-        df_clean[column] = standardize_series(df_clean[column])
+        if multiple is None:
+            multiple = column in multi_select_columns([column])
         
-        # Count unique values in the column
-        value_counts = df_clean[column].value_counts().reset_index()
+        # Count unique values in the column (or the options of a multi-select column)
+        value_counts = count_options(df, column) if multiple else count_values(df, column)
+        value_counts = value_counts.reset_index()
         value_counts.columns = [column, 'Contagem']
         
         # Log for debugging
@@ -296,6 +524,7 @@ def create_bar_chart(df, column, title, color_seq='Viridis', horizontal=True):
     
 
 # Função para criar gráfico de pizza
+@timed_chart
 def create_pie_chart(df, column, title):
     """
     Creates a pie chart configuration for Highcharts
@@ -313,12 +542,8 @@ def create_pie_chart(df, column, title):
             logger.warning(f"Column {column} not found in DataFrame")
             return None
         
-        # Make sure we're working with clean data
-        df_clean = df.copy()
-        df_clean[column] = standardize_series(df_clean[column])
-        
         # Count values
-        value_counts = df_clean[column].value_counts()
+        value_counts = count_values(df, column)
         
         # Prepare data for Highcharts
         data = []
@@ -371,10 +596,14 @@ def create_pie_chart(df, column, title):
         return None
 
 # Função para criar histograma de idade
+@timed_chart
 def create_age_histogram(df, birth_date_column, title):
     """
     Creates a histogram configuration for Highcharts based on age data
     
+    The bars are the age bins precomputed by load_data (see
+    fatec_comum.ages.add_age_columns), counted like any other column.
+    
     Args:
         df (pd.DataFrame): DataFrame with data
         birth_date_column (str): Name of column with birth date
@@ -388,33 +617,10 @@ def create_age_histogram(df, birth_date_column, title):
             logger.warning(f"Column {birth_date_column} not found in DataFrame")
             return None
         
-        # Check if we already have a calculated age column
-        idade_col = f"Idade ({birth_date_column})"
-        
-        if idade_col in df.columns:
-            # Use already calculated age column
-            idade_data = df[idade_col].dropna()
-        else:
-            # Convert birth date column to datetime
-            df[birth_date_column] = pd.to_datetime(df[birth_date_column], errors='coerce')
-            
-            # Calculate age
-            today = pd.Timestamp.now()
-            idade_data = df[birth_date_column].apply(
-                lambda x: (today - x).days // 365 if pd.notnull(x) else np.nan
-            ).dropna()
-        
-        # Convert to list for histogram binning
-        ages = idade_data.tolist()
-        
-        # Calculate histogram bins
-        min_age = int(min(ages)) if ages else 0
-        max_age = int(max(ages)) if ages else 100
-        
-        # Create histogram data
-        hist_data = np.histogram(ages, bins=range(min_age, max_age + 5, 5))
-        categories = [f"{i}-{i+4}" for i in range(min_age, max_age + 1, 5)]
-        counts = hist_data[0].tolist()
+        # Respondents per age bin (every bin of the dataset, in order)
+        bin_counts = age_bin_counts(df, birth_date_column, counts=count_values)
+        categories = bin_counts.index.tolist()
+        counts = [int(count) for count in bin_counts]
         
         # Create Highcharts configuration
         config = {
@@ -464,7 +670,84 @@ def create_age_histogram(df, birth_date_column, title):
         logger.error(f"Error creating age histogram for {birth_date_column}: {str(e)}")
         return None
 
+# Função para criar histograma do tempo de resposta
+@timed_chart
+def create_duration_histogram(df, title):
+    """
+    Creates a histogram configuration for Highcharts of the time taken to answer the survey
+    
+    Durations are completion minus start time, in minutes (see
+    durations.response_durations); the median, 90th percentile and mean
+    go in the subtitle and the full statistics in the 'stats' key.
+    
+    Args:
+        df (pd.DataFrame): DataFrame with data
+        title (str): Chart title
+    
+    Returns:
+        dict: Highcharts configuration
+    """
+    try:
+        durations = response_durations(df)
+        if durations.empty:
+            logger.warning("No response durations found in DataFrame")
+            return None
+        
+        stats = duration_stats(durations)
+        bin_counts = duration_bin_counts(durations)
+        
+        def minutes(value):
+            return f"{value:.1f}".replace('.', ',')
+        
+        # Create Highcharts configuration
+        config = {
+            'chart': {
+                'type': 'column',
+                'height': 400
+            },
+            'title': {
+                'text': title
+            },
+            'subtitle': {
+                'text': (
+                    f"Mediana: {minutes(stats['mediana'])} min · P90: {minutes(stats['p90'])} min · "
+                    f"Média: {minutes(stats['media'])} min ({stats['respostas']} respostas)"
+                )
+            },
+            'xAxis': {
+                'categories': bin_counts.index.tolist(),
+                'title': {
+                    'text': 'Tempo de resposta'
+                }
+            },
+            'yAxis': {
+                'title': {
+                    'text': 'Contagem'
+                }
+            },
+            'plotOptions': {
+                'column': {
+                    'colorByPoint': False,
+                    'color': '#34A853'
+                }
+            },
+            'series': [{
+                'name': 'Respostas',
+                'data': [int(count) for count in bin_counts]
+            }],
+            'stats': stats,
+            'credits': {
+                'enabled': False
+            }
+        }
+        
+        return config
+    except Exception as e:
+        logger.error(f"Error creating response duration histogram: {str(e)}")
+        return None
+
 # Função para criar gráfico de top N itens
+@timed_chart
 def create_top_n_chart(df, column, n=15, title=None, color='darkblue'):
     """
     Creates a bar chart configuration for Highcharts showing top N items
@@ -488,15 +771,8 @@ def create_top_n_chart(df, column, n=15, title=None, color='darkblue'):
         if title is None:
             title = f"Top {n} - {column}"
         
-        # Make sure we're working with clean data
-        df_clean = df.copy()
-        df_clean[column] = standardize_series(df_clean[column])
-        
         # Count values and get top N
-        logger.info(f"Column '{column}' data type: {df_clean[column].dtype}")
-        logger.info(f"Column '{column}' first few values: {df_clean[column].head().tolist()}")
-        
-        value_counts = df_clean[column].value_counts().head(n)
+        value_counts = count_values(df, column).head(n)
         
         # Debug info
         logger.info(f"Top values for '{column}': {value_counts.to_dict()}")
@@ -559,6 +835,7 @@ def create_top_n_chart(df, column, n=15, title=None, color='darkblue'):
         return None
 
 # Função para criar gráfico de barras empilhadas para itens de domicílio
+@timed_chart
 def create_stacked_bar(df, item_columns, title):
     """
     Creates a stacked bar chart configuration for Highcharts
@@ -579,14 +856,9 @@ def create_stacked_bar(df, item_columns, title):
             logger.warning(f"None of the columns {item_columns} found in DataFrame")
             return None
         
-        # Prepare data for visualization
-        item_data = {}
-        for col in available_columns:
-            item_data[col] = df[col].value_counts()
-        
-        # Transform data to appropriate format
-        item_df = pd.DataFrame(item_data)
-        item_df = item_df.fillna(0).T  # Transpose to have items in rows
+        # Answer x item counts in one pass; answers that never occur are dropped
+        item_df = count_grid(df, available_columns)
+        item_df = item_df[item_df.sum(axis=1) > 0].T  # Transpose to have items in rows
         
         # Prepare data for Highcharts
         categories = item_df.index.tolist()
@@ -657,6 +929,7 @@ def create_stacked_bar(df, item_columns, title):
         return None
 
 # Função para criar mapa do Brasil com estados coloridos
+@timed_chart
 def create_choropleth_map(df, estado_column, title):
     """
     Creates a map of Brazil with states colored by frequency for Highcharts
@@ -696,7 +969,7 @@ def create_choropleth_map(df, estado_column, title):
         }
         
         # Filter and process state data
-        estados_count = df[estado_column].value_counts()
+        estados_count = count_values(df, estado_column, standardize=False)
         
         # Prepare data for Highcharts
         data = []
@@ -751,6 +1024,7 @@ def create_choropleth_map(df, estado_column, title):
         return None
 
 # Função para criar gráfico de comparação (ex: escolaridade dos pais)
+@timed_chart
 def create_comparison_bar(df, columns_dict, group_by, title, colors=None):
     """
     Creates a comparison bar chart for Highcharts
@@ -778,7 +1052,7 @@ def create_comparison_bar(df, columns_dict, group_by, title, colors=None):
         series_data = {}
         
         for col, label in available_columns.items():
-            counts = df[col].value_counts()
+            counts = count_values(df, col, standardize=False)
             series_data[label] = counts
             categories.update(counts.index)
         
@@ -837,7 +1111,78 @@ def create_comparison_bar(df, columns_dict, group_by, title, colors=None):
         logger.error(f"Error creating comparison bar chart: {str(e)}")
         return None
 
+# Função para criar gráfico de linha da evolução de uma pergunta entre semestres
+@timed_chart
+def create_trend_chart(trend, title, values=None, share=True):
+    """
+    Creates a line chart configuration for Highcharts of the answers over the terms
+
+    Args:
+        trend (pd.DataFrame): Counts per term and answer (see trends.question_trend)
+        title (str): Chart title
+        values (list): Answers to plot (all of them if None)
+        share (bool): If True, plots the share (%) of each answer among the
+            answers of the term instead of the counts
+
+    Returns:
+        dict: Highcharts configuration, with the respondents of each term in
+        the 'totals' key
+    """
+    try:
+        if trend.empty:
+            logger.warning(f"No stored editions to plot for {title}")
+            return None
+
+        data = trend_shares(trend) if share else trend
+        columns = [value for value in (values or data.columns) if value in data.columns]
+        if not columns:
+            logger.warning(f"None of the answers {values} found in the editions")
+            return None
+
+        series = [{
+            'name': str(value),
+            'data': [None if pd.isna(y) else (float(y) if share else int(y)) for y in data[value]]
+        } for value in columns]
+
+        # Create Highcharts configuration
+        config = {
+            'chart': {
+                'type': 'line',
+                'height': 400
+            },
+            'title': {
+                'text': title
+            },
+            'xAxis': {
+                'categories': [str(term) for term in data.index],
+                'title': {
+                    'text': 'Semestre'
+                }
+            },
+            'yAxis': {
+                'min': 0,
+                'max': 100 if share else None,
+                'title': {
+                    'text': 'Percentual (%)' if share else 'Contagem'
+                }
+            },
+            'tooltip': {
+                'valueSuffix': '%' if share else ''
+            },
+            'series': series,
+            'totals': {str(term): int(total) for term, total in trend.sum(axis=1).items()},
+            'credits': {
+                'enabled': False
+            }
+        }
+
+        return config
+    except Exception as e:
+        logger.error(f"Error creating trend chart: {str(e)}")
+        return None
+
 # Functions to generate charts for each section
+@timed_section('visao_geral')
 def generate_visao_geral_charts(df):
     """
     Generate charts for the 'Visão Geral' section
@@ -856,7 +1201,7 @@ def generate_visao_geral_charts(df):
     )
     
     # Chart of distribution by period
-    periodo_col = 'Qual o período que cursa?*' if 'Qual o período que cursa?*' in df.columns else 'Qual o período que cursa?'
+    periodo_col = question_column(df.columns, 'periodo')
     charts['periodo'] = create_pie_chart(
         df, periodo_col, 'Distribuição por Período'
     )
@@ -867,14 +1212,19 @@ def generate_visao_geral_charts(df):
     )
     
     # Age histogram
-    data_nasc_col = 'Qual a sua data de nascimento?' if 'Qual a sua data de nascimento?' in df.columns else None
+    data_nasc_col = question_column(df.columns, 'nascimento')
     if data_nasc_col:
         charts['idade'] = create_age_histogram(
             df, data_nasc_col, 'Distribuição de Idade'
         )
     
+    # Time taken to answer the survey
+    charts['tempo_resposta'] = create_duration_histogram(
+        df, 'Tempo de Resposta do Questionário'
+    )
+    
     # Map of students by birth state
-    estado_col = 'Qual o estado você nasceu?*' if 'Qual o estado você nasceu?*' in df.columns else 'Qual o estado você nasceu?'
+    estado_col = question_column(df.columns, 'estado_nascimento')
     # if estado_col in df.columns:
     #     charts['mapa_estados'] = create_choropleth_map(
     #         df, estado_col, 'Distribuição por Estado de Nascimento'
@@ -882,6 +1232,7 @@ def generate_visao_geral_charts(df):
     
     return charts
 
+@timed_section('perfil_estudantes')
 def generate_perfil_estudantes_charts(df):
     """
     Generate charts for the 'Perfil dos Estudantes' section
@@ -914,10 +1265,11 @@ def generate_perfil_estudantes_charts(df):
         df, 'Qual é a situação do domicílio em que você reside?', 'Tipo de Domicílio'
     )
     
-    # Chart of special needs
-    if 'Você possui alguma necessidade especial?' in df.columns:
-        charts['necessidades_especiais'] = create_pie_chart(
-            df, 'Você possui alguma necessidade especial?', 'Necessidades Especiais'
+    # Chart of special needs (multi-select; the header changed between form versions)
+    necessidade_col = question_column(df.columns, 'necessidade_especial')
+    if necessidade_col:
+        charts['necessidades_especiais'] = create_bar_chart(
+            df, necessidade_col, 'Necessidades Especiais'
         )
     
     # Chart of city of residence (top 15)
@@ -928,6 +1280,7 @@ def generate_perfil_estudantes_charts(df):
     
     return charts
 
+@timed_section('socioeconomico')
 def generate_socioeconomico_charts(df):
     """
     Generate charts for the 'Informações Socioeconômicas' section
@@ -970,6 +1323,7 @@ def generate_socioeconomico_charts(df):
     
     return charts
 
+@timed_section('trabalho_formacao')
 def generate_trabalho_formacao_charts(df):
     """
     Generate charts for the 'Formação e Trabalho' section
@@ -1032,6 +1386,7 @@ def generate_trabalho_formacao_charts(df):
     
     return charts
 
+@timed_section('tecnologia')
 def generate_tecnologia_charts(df):
     """
     Generate charts for the 'Uso de Tecnologia' section
@@ -1063,18 +1418,8 @@ def generate_tecnologia_charts(df):
     if available_apps:
         # Prepare data
         levels = ['Nenhum', 'Pouco', 'Intermediário', 'Avançado']
-        series_data = []
-        
-        for level in levels:
-            data = []
-            for app in available_apps:
-                count = (df[app] == level).sum()
-                data.append(count)
-            
-            series_data.append({
-                'name': level,
-                'data': data
-            })
+        table = count_grid(df, available_apps, levels)
+        series_data = [{'name': level, 'data': table.loc[level].tolist()} for level in levels]
         
         charts['conhecimento_apps'] = {
             'chart': {
@@ -1124,20 +1469,17 @@ def generate_tecnologia_charts(df):
         "Smartphone": ['Em casa3', 'No trabalho3', 'Na escola3', 'Em outros lugares3']
     }
     
-    # Prepare device usage data
+    # Prepare device usage data ('Sim' answers of every device x location column)
     all_device_data = []
     locations = ['Em casa', 'No trabalho', 'Na escola', 'Em outros lugares']
+    yes_counts = count_grid(df, [col for cols in devices.values() for col in cols], ['Sim']).loc['Sim']
     
     for device, cols in devices.items():
         device_data = []
         
         for i, loc in enumerate(locations):
             col = cols[i] if i < len(cols) else None
-            if col and col in df.columns:
-                yes_count = (df[col] == 'Sim').sum()
-                device_data.append(yes_count)
-            else:
-                device_data.append(0)
+            device_data.append(int(yes_counts.get(col, 0)) if col else 0)
         
         all_device_data.append({
             'name': device,
@@ -1190,18 +1532,8 @@ def generate_tecnologia_charts(df):
                  'Leio e escrevo mas não falo', 'Leio, escrevo e falo razoavelmente',
                  'Leio, escrevo e falo bem']
         
-        idioma_series = []
-        
-        for level in levels:
-            data = []
-            for idioma in available_idiomas:
-                count = (df[idioma] == level).sum()
-                data.append(count)
-            
-            idioma_series.append({
-                'name': level,
-                'data': data
-            })
+        table = count_grid(df, available_idiomas, levels)
+        idioma_series = [{'name': level, 'data': table.loc[level].tolist()} for level in levels]
         
         charts['conhecimento_idiomas'] = {
             'chart': {
@@ -1249,6 +1581,7 @@ def generate_tecnologia_charts(df):
     
     return charts
 
+@timed_section('interesses_habitos')
 def generate_interesses_habitos_charts(df):
     """
     Generate charts for the 'Interesses e Hábitos' section
@@ -1283,18 +1616,8 @@ def generate_interesses_habitos_charts(df):
         # Prepare data for information sources
         frequencies = ['Nunca', 'Pouco', 'Às vezes', 'Muito', 'Sempre']
         
-        source_series = []
-        
-        for freq in frequencies:
-            data = []
-            for source in available_sources:
-                count = (df[source] == freq).sum()
-                data.append(count)
-            
-            source_series.append({
-                'name': freq,
-                'data': data
-            })
+        table = count_grid(df, available_sources, frequencies)
+        source_series = [{'name': freq, 'data': table.loc[freq].tolist()} for freq in frequencies]
         
         charts['fontes_informacao'] = {
             'chart': {
@@ -1347,20 +1670,14 @@ def generate_interesses_habitos_charts(df):
     )
     
     # Chart of cultural entertainment (column chart for multiple choice)
-    if 'Quais fontes de entretenimento cultural você usa?' in df.columns:
-        # For columns with multiple choices separated by commas
-        entertainment_options = []
-        
-        for entry in df['Quais fontes de entretenimento cultural você usa?'].dropna():
-            options = [option.strip() for option in str(entry).split(',')]
-            entertainment_options.extend(options)
-        
-        # Count occurrences and get top values
-        entertainment_counts = Counter(entertainment_options).most_common()
+    col_entretenimento = 'Quais fontes de entretenimento cultural você usa?'
+    if col_entretenimento in df.columns:
+        # Options of the multi-select answers, exploded once per dataset (see count_options)
+        entertainment_counts = count_options(df, col_entretenimento)
         
         # Prepare data for Highcharts
-        categories = [item[0] for item in entertainment_counts]
-        data = [item[1] for item in entertainment_counts]
+        categories = entertainment_counts.index.tolist()
+        data = [int(count) for count in entertainment_counts]
         
         charts['entretenimento_cultural'] = {
             'chart': {
@@ -1395,9 +1712,53 @@ def generate_interesses_habitos_charts(df):
                 'enabled': False
             }
         }
+        
+        # Pairs of entertainment sources used together (upper triangle of the co-occurrence table)
+        co_occurrence = count_co_occurrence(df, col_entretenimento)
+        rows, cols = np.triu_indices(len(co_occurrence), k=1)
+        pair_counts = co_occurrence.to_numpy()[rows, cols]
+        top_pairs = np.argsort(-pair_counts, kind='stable')[:10]
+        top_pairs = top_pairs[pair_counts[top_pairs] > 0]
+        
+        if len(top_pairs):
+            options = co_occurrence.index
+            charts['entretenimento_pares'] = {
+                'chart': {
+                    'type': 'column',
+                    'height': 400
+                },
+                'title': {
+                    'text': 'Fontes de Entretenimento Usadas em Conjunto'
+                },
+                'xAxis': {
+                    'categories': [f"{options[rows[i]]} + {options[cols[i]]}" for i in top_pairs],
+                    'title': {
+                        'text': 'Combinação'
+                    }
+                },
+                'yAxis': {
+                    'title': {
+                        'text': 'Contagem'
+                    }
+                },
+                'plotOptions': {
+                    'column': {
+                        'colorByPoint': True
+                    }
+                },
+                'series': [{
+                    'name': 'Contagem',
+                    'data': [int(pair_counts[i]) for i in top_pairs],
+                    'showInLegend': False
+                }],
+                'credits': {
+                    'enabled': False
+                }
+            }
     
     return charts
 
+@timed_section('motivacoes_expectativas')
 def generate_motivacoes_expectativas_charts(df):
     """
     Generate charts for the 'Motivações e Expectativas' section
@@ -1449,6 +1810,7 @@ def generate_motivacoes_expectativas_charts(df):
     
     return charts
 
+@timed_section('analise_texto')
 def generate_analise_texto_charts(df):
     """
     Generate charts for the 'Análise de Texto' section
@@ -1465,29 +1827,21 @@ def generate_analise_texto_charts(df):
     if texto_col in df.columns:
         # Since we can't easily create a wordcloud with Highcharts,
         # we'll just provide text examples for this section
-        respostas = df[df[texto_col].notna() & (df[texto_col] != '')][texto_col]
+        respostas = df[texto_col]
+        respostas = respostas[respostas.notna() & (respostas != '')]
         if not respostas.empty:
             # Select up to 5 random responses
             amostra = respostas.sample(min(5, len(respostas))).tolist()
             charts['respostas'] = amostra
             
-            # If we want to add a simple word frequency chart
-            # Get all words from all responses
-            all_words = []
-            for response in respostas:
-                words = clean_text(response).split()
-                # Filter out short words (less than 3 characters)
-                words = [word for word in words if len(word) > 3]
-                all_words.extend(words)
-            
-            # Count word frequencies
-            word_counts = Counter(all_words).most_common(20)
+            # Word frequencies read from the inverted index (stopwords left out, see count_terms)
+            word_counts = count_terms(df, texto_col).head(20)
             
             # Only create chart if we have words
-            if word_counts:
+            if not word_counts.empty:
                 # Prepare data for Highcharts
-                word_categories = [word[0] for word in word_counts]
-                word_freqs = [word[1] for word in word_counts]
+                word_categories = word_counts.index.tolist()
+                word_freqs = [int(count) for count in word_counts]
                 
                 charts['freq_palavras'] = {
                     'chart': {
@@ -1528,5 +1882,62 @@ def generate_analise_texto_charts(df):
                         'enabled': False
                     }
                 }
+            
+            # Most frequent expressions (sequences of 2 and 3 words, stopwords left out)
+            expression_counts = Tokenizer().ngram_counts(respostas, n=(2, 3)).head(15)
+            expression_counts = expression_counts[expression_counts > 1]
+            
+            if not expression_counts.empty:
+                charts['freq_expressoes'] = {
+                    'chart': {
+                        'type': 'column',
+                        'height': 400
+                    },
+                    'title': {
+                        'text': 'Expressões Mais Frequentes'
+                    },
+                    'xAxis': {
+                        'categories': expression_counts.index.tolist(),
+                        'title': {
+                            'text': 'Expressões'
+                        },
+                        'labels': {
+                            'rotation': -45
+                        }
+                    },
+                    'yAxis': {
+                        'title': {
+                            'text': 'Frequência'
+                        }
+                    },
+                    'plotOptions': {
+                        'column': {
+                            'colorByPoint': True,
+                            'dataLabels': {
+                                'enabled': True
+                            }
+                        }
+                    },
+                    'series': [{
+                        'name': 'Frequência',
+                        'data': [int(count) for count in expression_counts],
+                        'showInLegend': False
+                    }],
+                    'credits': {
+                        'enabled': False
+                    }
+                }
     
     return charts
+
+# Geradores de gráficos de cada seção do dashboard
+SECTION_GENERATORS = {
+    'visao_geral': generate_visao_geral_charts,
+    'perfil_estudantes': generate_perfil_estudantes_charts,
+    'socioeconomico': generate_socioeconomico_charts,
+    'trabalho_formacao': generate_trabalho_formacao_charts,
+    'tecnologia': generate_tecnologia_charts,
+    'interesses_habitos': generate_interesses_habitos_charts,
+    'motivacoes_expectativas': generate_motivacoes_expectativas_charts,
+    'analise_texto': generate_analise_texto_charts
+}
@@ -5,6 +5,19 @@ import streamlit as st
 import io
 import datetime
 import os
+import sys
+import importlib.util
+
+# Pacote compartilhado com o app Flask (ver PROJETO_FINAL_FLASK/fatec_comum/__init__.py),
+# carregado pelo caminho para que os outros módulos do app não entrem no sys.path
+if 'fatec_comum' not in sys.modules:
+    _spec = importlib.util.spec_from_file_location(
+        'fatec_comum', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'PROJETO_FINAL_FLASK', 'fatec_comum', '__init__.py')
+    )
+    sys.modules['fatec_comum'] = importlib.util.module_from_spec(_spec)
+    _spec.loader.exec_module(sys.modules['fatec_comum'])
+from fatec_comum.ages import add_age_columns
+from fatec_comum.schema import date_columns, parse_dates
 
 # Função para criar diretórios necessários caso não existam
 def create_directories():
@@ -73,17 +86,13 @@ def load_data():
         # Ordenar colunas conforme o CSV original
         df = df[cols]
         
-        # Converter tipos de dados específicos
-        date_cols = [col for col in df.columns if 'data' in col.lower()]
-        for col in date_cols:
-            df[col] = pd.to_datetime(df[col], errors='coerce')
+        # Converter as datas com os formatos declarados no schema (nada é inferido)
+        date_cols = date_columns(df.columns)
+        for col, formats in date_cols.items():
+            df[col], _ = parse_dates(df[col], formats)
         
-        # Calcular idades para colunas de data de nascimento
-        for col in date_cols:
-            if 'nascimento' in col.lower():
-                df[f'Idade ({col})'] = df[col].apply(
-                    lambda x: (datetime.datetime.now() - x).days // 365 if pd.notnull(x) else np.nan
-                )
+        # Calcular idades (na data de conclusão do questionário) e faixas etárias das datas de nascimento
+        add_age_columns(df, [col for col in date_cols if 'nascimento' in col.lower()])
         
         return df.set_index("ID")
     
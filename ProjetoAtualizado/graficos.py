@@ -5,8 +5,21 @@ import plotly.graph_objects as go
 import matplotlib.pyplot as plt
 import seaborn as sns
 from wordcloud import WordCloud
-from collections import Counter
 import datetime
+import os
+import sys
+import importlib.util
+
+# Pacote compartilhado com o app Flask (ver PROJETO_FINAL_FLASK/fatec_comum/__init__.py),
+# carregado pelo caminho para que os outros módulos do app não entrem no sys.path
+if 'fatec_comum' not in sys.modules:
+    _spec = importlib.util.spec_from_file_location(
+        'fatec_comum', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'PROJETO_FINAL_FLASK', 'fatec_comum', '__init__.py')
+    )
+    sys.modules['fatec_comum'] = importlib.util.module_from_spec(_spec)
+    _spec.loader.exec_module(sys.modules['fatec_comum'])
+from fatec_comum.tokenizer import Tokenizer
+from fatec_comum.ages import age_bin_counts
 
 # Função para criar gráfico de barras com Plotly
 def create_bar_chart(df, column, title, color_seq='Viridis', horizontal=True, height=400, width=600):
@@ -110,6 +123,9 @@ def create_age_histogram(df, birth_date_column, title, height=400, width=600):
     """
     Cria um histograma das idades calculadas a partir da data de nascimento
     
+    As barras são as faixas etárias pré-calculadas em load_data (ver
+    fatec_comum.ages.add_age_columns).
+    
     Args:
         df (pd.DataFrame): DataFrame com os dados
         birth_date_column (str): Nome da coluna com a data de nascimento
@@ -123,27 +139,15 @@ def create_age_histogram(df, birth_date_column, title, height=400, width=600):
     if birth_date_column not in df.columns:
         return None
         
-    # Verificar se já temos uma coluna de idade calculada
-    idade_col = f"Idade ({birth_date_column})"
-    
-    if idade_col in df.columns:
-        # Usar a coluna de idade já calculada
-        idade_data = df[idade_col].dropna()
-    else:
-        # Converter coluna de data de nascimento para datetime
-        df[birth_date_column] = pd.to_datetime(df[birth_date_column], errors='coerce')
-        
-        # Calcular idade
-        today = datetime.datetime.now()
-        idade_data = df[birth_date_column].apply(
-            lambda x: (today - x).days // 365 if pd.notnull(x) else np.nan
-        ).dropna()
+    # Estudantes por faixa etária (todas as faixas, em ordem)
+    faixas = age_bin_counts(df, birth_date_column)
     
     # Criar histograma
-    fig = px.histogram(
-        x=idade_data,
+    fig = px.bar(
+        x=faixas.index,
+        y=faixas.values,
         title=title,
-        labels={'x': 'Idade (anos)'},
+        labels={'x': 'Idade (anos)', 'y': 'Contagem'},
         color_discrete_sequence=['darkblue']
     )
     
@@ -210,8 +214,10 @@ def create_wordcloud(df, text_column, title, width=800, height=400):
     if text_column not in df.columns:
         return None
         
-    # Concatena todos os textos da coluna
-    all_text = ' '.join(df[text_column].dropna().astype(str))
+    # Frequência dos termos de todas as respostas (sem stopwords, singular e plural juntos)
+    frequencies = Tokenizer().frequencies(df[text_column].dropna().astype(str))
+    if not frequencies:
+        return None
     
     # Cria a nuvem de palavras
     wordcloud = WordCloud(
@@ -221,7 +227,7 @@ def create_wordcloud(df, text_column, title, width=800, height=400):
         max_words=150,
         contour_width=1,
         contour_color='steelblue'
-    ).generate(all_text)
+    ).generate_from_frequencies(frequencies)
     
     # Plota a nuvem de palavras
     fig, ax = plt.subplots(figsize=(10, 5))
@@ -462,18 +468,12 @@ def create_word_frequency(df, text_column, n=20, title=None, min_length=3):
     if title is None:
         title = f"Palavras mais frequentes - {text_column}"
     
-    # Concatena todos os textos da coluna
-    all_text = ' '.join(df[text_column].dropna().astype(str))
-    
-    # Filtra palavras pelo comprimento
-    words = [word.lower() for word in all_text.split() if len(word) > min_length]
-    
-    # Conta as palavras
-    word_counts = Counter(words).most_common(n)
+    # Conta os termos de todas as respostas em uma passada (palavras com mais de min_length letras)
+    word_counts = Tokenizer(min_length=min_length + 1).ngram_counts(df[text_column].dropna().astype(str)).head(n)
     
     fig = px.bar(
-        x=[count[1] for count in word_counts],
-        y=[count[0] for count in word_counts],
+        x=word_counts.values,
+        y=word_counts.index,
         orientation='h',
         labels={'x': 'Frequência', 'y': 'Palavra'},
         title=title,
@@ -9,6 +9,20 @@ import seaborn as sns
 from wordcloud import WordCloud
 from collections import Counter
 import datetime
+import os
+import sys
+import importlib.util
+
+# Pacote compartilhado com o app Flask (ver PROJETO_FINAL_FLASK/fatec_comum/__init__.py),
+# carregado pelo caminho para que os outros módulos do app não entrem no sys.path
+if 'fatec_comum' not in sys.modules:
+    _spec = importlib.util.spec_from_file_location(
+        'fatec_comum', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'PROJETO_FINAL_FLASK', 'fatec_comum', '__init__.py')
+    )
+    sys.modules['fatec_comum'] = importlib.util.module_from_spec(_spec)
+    _spec.loader.exec_module(sys.modules['fatec_comum'])
+from fatec_comum.tokenizer import Tokenizer
+from fatec_comum.ages import age_bin_counts
 
 # Configuração da página
 st.set_page_config(
@@ -69,21 +83,15 @@ def create_pie_chart(df, column, title):
 # Função para criar histograma de idade
 def create_age_histogram(df, birth_date_column, title):
     """Cria um histograma das idades calculadas a partir da data de nascimento"""
-    # Converter coluna de data de nascimento para datetime
-    df[birth_date_column] = pd.to_datetime(df[birth_date_column], errors='coerce')
-    
-    # Calcular idade
-    today = datetime.datetime.now()
-    df['Idade'] = df[birth_date_column].apply(
-        lambda x: (today - x).days // 365 if pd.notnull(x) else np.nan
-    )
+    # Estudantes por faixa etária, pré-calculada em load_data (ver fatec_comum.ages.add_age_columns)
+    faixas = age_bin_counts(df, birth_date_column)
     
     # Criar histograma
-    fig = px.histogram(
-        df.dropna(subset=['Idade']), 
-        x='Idade',
+    fig = px.bar(
+        x=faixas.index,
+        y=faixas.values,
         title=title,
-        labels={'Idade': 'Idade (anos)'},
+        labels={'x': 'Idade (anos)', 'y': 'Contagem'},
         color_discrete_sequence=['darkblue']
     )
     
@@ -117,9 +125,11 @@ def create_heatmap(df, columns, title):
 
 # Função para criar nuvem de palavras
 def create_wordcloud(df, text_column, title):
-    """Cria uma nuvem de palavras a partir de um texto"""
-    # Concatena todos os textos da coluna
-    all_text = ' '.join(df[text_column].dropna().astype(str))
+    """Cria uma nuvem de palavras a partir de um texto (None se as respostas não têm palavras)"""
+    # Frequência dos termos de todas as respostas (sem stopwords, singular e plural juntos)
+    frequencies = Tokenizer().frequencies(df[text_column].dropna().astype(str))
+    if not frequencies:
+        return None
     
     # Cria a nuvem de palavras
     wordcloud = WordCloud(
@@ -129,7 +139,7 @@ def create_wordcloud(df, text_column, title):
         max_words=150,
         contour_width=1,
         contour_color='steelblue'
-    ).generate(all_text)
+    ).generate_from_frequencies(frequencies)
     
     # Plota a nuvem de palavras
     fig, ax = plt.subplots(figsize=(10, 5))
@@ -630,17 +640,19 @@ def main():
                     'Escreva algumas linhas sobre sua história e seus sonhos de vida',
                     'Nuvem de Palavras - Sonhos e Histórias'
                 )
-                st.pyplot(fig)
+                if fig is not None:
+                    st.pyplot(fig)
+                else:
+                    st.warning("Não foi possível gerar a nuvem de palavras: as respostas não têm palavras além das stopwords.")
                 
             with col2:
                 st.subheader("Palavras Mais Frequentes")
-                all_text = ' '.join(df['Escreva algumas linhas sobre sua história e seus sonhos de vida'].dropna().astype(str))
-                words = [word for word in all_text.split() if len(word) > 3]
-                word_counts = Counter(words).most_common(20)
+                respostas = df['Escreva algumas linhas sobre sua história e seus sonhos de vida'].dropna().astype(str)
+                word_counts = Tokenizer().ngram_counts(respostas).head(20)
                 
                 fig = px.bar(
-                    x=[count[1] for count in word_counts],
-                    y=[count[0] for count in word_counts],
+                    x=word_counts.values,
+                    y=word_counts.index,
                     orientation='h',
                     labels={'x': 'Frequência', 'y': 'Palavra'},
                     color_discrete_sequence=['darkblue']